@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import replace
+
+from components.video_processing.encoder_profiles import resolve_profile
+from components.video_processing.ffmpeg_renderer import FfmpegRenderer
+from components.video_processing.render_scheduler import RenderScheduler
+from components.video_processing.video_postprocessing import VideoPostProcessing
+from components.video_processing.video_preprocessing import VideoPreprocessing
+from main import MAX_DURATION, load_clips
+from utils.cache_utils import cache_key, file_identity, write_json_atomic
+from utils.data_structures import (
+    BatchJob,
+    BatchResult,
+    BatchStatusEnum,
+    EncoderProfileEnum,
+    RenderBackendEnum,
+    VisionDataTypeEnum,
+)
+from utils.json_handler import pars_config
+from utils.media_index import MediaIndex
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
+logger = logging.getLogger(__name__)
+
+STATE_SUFFIX = ".render.json"  # written next to every finished output
+SUMMARY_FILE = "batch_summary.json"
+# A full resolution render holds decoded 1080x1920 frames, clips and an encoder.
+MEMORY_PER_JOB = 2 * 1024**3
+
+
+@contextmanager
+def stage(stages, name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = round(time.perf_counter() - start, 3)
+
+
+def load_jobs(source, media_dir=None, output_dir=None) -> list[BatchJob]:
+    """
+    Jobs from a directory of config JSONs or from a manifest file.
+
+    A manifest is a JSON list (or ``{"jobs": [...]}``) of objects with a
+    ``config`` and optional ``media_dir``/``output``; relative paths are resolved
+    against the manifest. Missing values fall back to ``media_dir`` and
+    ``output_dir/<config name>.mp4``.
+    """
+    if os.path.isdir(source):
+        base_dir = source
+        specs = [
+            {"config": os.path.basename(path)}
+            for path in sorted(glob.glob(os.path.join(source, "*.json")))
+            if not path.endswith((STATE_SUFFIX, SUMMARY_FILE))
+        ]
+    else:
+        base_dir = os.path.dirname(os.path.abspath(source))
+        with open(source) as f:
+            specs = json.load(f)
+        if isinstance(specs, dict):
+            specs = specs["jobs"]
+
+    jobs = []
+    for spec in specs:
+        config_path = os.path.join(base_dir, spec["config"])
+        name = os.path.splitext(os.path.basename(config_path))[0]
+        if "media_dir" in spec:
+            job_media_dir = os.path.join(base_dir, spec["media_dir"])
+        elif media_dir is not None:
+            job_media_dir = media_dir
+        else:
+            raise ValueError(f"No media_dir for {config_path}")
+        if "output" in spec:
+            output_path = os.path.join(base_dir, spec["output"])
+        else:
+            output_path = os.path.join(output_dir or ".", f"{name}.mp4")
+        jobs.append(BatchJob(name, config_path, job_media_dir, output_path))
+    return jobs
+
+
+def job_fingerprint(job: BatchJob):
+    """Hash of everything the output depends on: config, sources and encoding."""
+    with open(job.config_path) as f:
+        config = json.load(f)
+    sources = {}
+    for filename in config:
+        try:
+            sources[filename] = file_identity(os.path.join(job.media_dir, filename))
+        except OSError:
+            sources[filename] = None
+    # The thread share depends on the batch size, not on the output.
+    profile = replace(job.profile, threads=None) if job.profile else None
+    return cache_key("batch", config, sources, job.backend, profile, MAX_DURATION)
+
+
+def is_up_to_date(job: BatchJob, fingerprint):
+    try:
+        with open(job.output_path + STATE_SUFFIX) as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+    return os.path.exists(job.output_path) and state.get("fingerprint") == fingerprint
+
+
+def partial_output_path(output_path):
+    root, extension = os.path.splitext(output_path)
+    return f"{root}.part{os.getpid()}{extension}"
+
+
+def render_job(job: BatchJob) -> BatchResult:
+    """Render one job in a worker process; failures become a result."""
+    start = time.perf_counter()
+    stages = {}
+    try:
+        fingerprint = job_fingerprint(job)
+        if is_up_to_date(job, fingerprint):
+            return BatchResult(job, BatchStatusEnum.SKIPPED, stages=stages)
+
+        with stage(stages, "parse"):
+            config = pars_config(job.config_path)
+        os.makedirs(os.path.dirname(os.path.abspath(job.output_path)), exist_ok=True)
+        partial_path = partial_output_path(job.output_path)
+        try:
+            if job.backend == RenderBackendEnum.FFMPEG:
+                with stage(stages, "render"):
+                    FfmpegRenderer().render(
+                        config, job.media_dir, partial_path, MAX_DURATION, job.profile
+                    )
+            else:
+                with stage(stages, "preprocess"):
+                    clips = load_clips(
+                        VideoPreprocessing(), config, job.media_dir, job.profile.threads
+                    )
+                if clips:
+                    with stage(stages, "render"):
+                        VideoPostProcessing().final_render(
+                            partial_path, clips, job.profile
+                        )
+            if not os.path.exists(partial_path):
+                return BatchResult(
+                    job, BatchStatusEnum.EMPTY, time.perf_counter() - start, stages
+                )
+            # Only complete outputs ever get the final name.
+            os.replace(partial_path, job.output_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+        elapsed = time.perf_counter() - start
+        write_json_atomic(
+            job.output_path + STATE_SUFFIX,
+            {"fingerprint": fingerprint, "elapsed": elapsed, "stages": stages},
+        )
+        return BatchResult(job, BatchStatusEnum.RENDERED, elapsed, stages)
+    except Exception as e:
+        return BatchResult(
+            job,
+            BatchStatusEnum.FAILED,
+            time.perf_counter() - start,
+            stages,
+            error=f"{type(e).__name__}: {e}",
+        )
+
+
+class BatchRenderer:
+    """
+    Renders many configs concurrently under a CPU and memory budget.
+
+    Jobs run on a process pool sized by RenderScheduler, each job's encoder and
+    preprocessing get an equal share of the cores. All jobs share the
+    persistent media index and CFR cache, and every video is probed once up
+    front. Outputs are written under a temporary name and recorded with a
+    fingerprint, so an interrupted batch resumes where it stopped and up to
+    date outputs are skipped.
+    """
+
+    def __init__(
+        self,
+        backend=RenderBackendEnum.MOVIEPY,
+        encoder_profile=EncoderProfileEnum.PUBLISH,
+        max_jobs=None,
+        cpu_budget=None,
+        memory_budget=None,
+    ):
+        self.backend = backend
+        self.encoder_profile = encoder_profile
+        self.scheduler = RenderScheduler(
+            max_jobs,
+            cpu_budget=cpu_budget,
+            memory_budget=memory_budget,
+            memory_per_worker=MEMORY_PER_JOB,
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def warm_media_index(self, jobs):
+        """Probe the videos of every job once, workers then read the index."""
+        paths = set()
+        for job in jobs:
+            try:
+                config = pars_config(job.config_path)
+            except Exception as e:
+                self.logger.warning(f"Cannot read {job.config_path}: {e}")
+                continue
+            paths.update(
+                os.path.join(job.media_dir, filename)
+                for filename, entry in config.items()
+                if entry.type == VisionDataTypeEnum.VIDEO
+            )
+        MediaIndex().probe_all(sorted(paths))
+
+    def is_skipped(self, job: BatchJob):
+        try:
+            return is_up_to_date(job, job_fingerprint(job))
+        except OSError:
+            return False  # the worker reports the unreadable config
+
+    def run(self, jobs: list[BatchJob]):
+        """Render ``jobs`` and return the machine-readable summary."""
+        start = time.perf_counter()
+        stages = {}
+        profile = resolve_profile(self.encoder_profile)
+        jobs = [replace(job, backend=self.backend, profile=profile) for job in jobs]
+        results = [None] * len(jobs)  # in job order, filled as jobs complete
+        pending = {}  # {job position: job}
+        with stage(stages, "check"):
+            for i, job in enumerate(jobs):
+                if self.is_skipped(job):
+                    results[i] = self._report(
+                        BatchResult(job, BatchStatusEnum.SKIPPED, stages={})
+                    )
+                else:
+                    pending[i] = job
+
+        workers = self.scheduler.worker_count(len(pending)) if pending else 0
+        threads = self.scheduler.threads_per_worker(workers) if pending else 0
+        for i, job in pending.items():
+            pending[i] = replace(job, profile=replace(profile, threads=threads))
+        with stage(stages, "probe"):
+            self.warm_media_index(pending.values())
+
+        self.logger.info(
+            f"Rendering {len(pending)} of {len(jobs)} configs, {workers} at a time "
+            f"with {threads} threads each."
+        )
+        with stage(stages, "render"):
+            if workers == 1:
+                for i, job in pending.items():
+                    results[i] = self._report(render_job(job))
+            elif pending:
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                ) as pool:
+                    futures = {
+                        pool.submit(render_job, job): i for i, job in pending.items()
+                    }
+                    for future in as_completed(futures):
+                        results[futures[future]] = self._report(future.result())
+        # Workers leave the shared CFR cache alone, trim it once for the batch.
+        VideoPreprocessing().cleanup_temp_files()
+
+        return self.summary(results, workers, threads, stages, start)
+
+    def _report(self, result: BatchResult):
+        message = f"[{result.status}] {result.job.name} in {result.elapsed:.1f}s"
+        if result.error:
+            self.logger.error(f"{message}: {result.error}")
+        else:
+            self.logger.info(message)
+        return result
+
+    def summary(self, results, workers, threads, stages, start):
+        counts = {status.value: 0 for status in BatchStatusEnum}
+        for result in results:
+            counts[result.status] += 1
+        return {
+            "elapsed": round(time.perf_counter() - start, 3),
+            "workers": workers,
+            "threads_per_job": threads,
+            "backend": self.backend.value,
+            "encoder_profile": str(self.encoder_profile),
+            "stages": stages,
+            "counts": counts,
+            "jobs": [
+                {
+                    "name": result.job.name,
+                    "config": result.job.config_path,
+                    "output": result.job.output_path,
+                    "status": result.status.value,
+                    "elapsed": round(result.elapsed, 3),
+                    "stages": result.stages or {},
+                    "error": result.error,
+                }
+                for result in results
+            ],
+        }
+
+
+def arg_parser():
+    parser = argparse.ArgumentParser(
+        description="Render many reel configs in one run.",
+    )
+    parser.add_argument(
+        "source",
+        type=str,
+        help="Directory of config JSON files, or a JSON manifest of jobs.",
+    )
+    parser.add_argument(
+        "--media_dir",
+        type=str,
+        default=None,
+        help="Media dir for configs that do not name one.",
+    )
+    parser.add_argument(
+        "--output_dir",
+        type=str,
+        default="output",
+        help="Where reels without an explicit output are written.",
+    )
+    parser.add_argument(
+        "--backend",
+        type=RenderBackendEnum,
+        choices=list(RenderBackendEnum),
+        default=RenderBackendEnum.MOVIEPY,
+        help="Render backend used for every job.",
+    )
+    parser.add_argument(
+        "--encoder_profile",
+        type=EncoderProfileEnum,
+        choices=list(EncoderProfileEnum),
+        default=EncoderProfileEnum.PUBLISH,
+        help="Speed/quality preset used for every job.",
+    )
+    parser.add_argument(
+        "--max_jobs",
+        type=int,
+        default=None,
+        help="Configs rendered at once (default: from the CPU and memory budget).",
+    )
+    parser.add_argument(
+        "--cpu_budget",
+        type=int,
+        default=None,
+        help="Cores shared by all jobs (default: all).",
+    )
+    parser.add_argument(
+        "--memory_budget_gb",
+        type=float,
+        default=None,
+        help="Memory shared by all jobs (default: what is available).",
+    )
+    parser.add_argument(
+        "--summary",
+        type=str,
+        default=None,
+        help=f"Summary JSON path (default: <output_dir>/{SUMMARY_FILE}).",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = arg_parser()
+    batch_jobs = load_jobs(args.source, args.media_dir, args.output_dir)
+    renderer = BatchRenderer(
+        args.backend,
+        args.encoder_profile,
+        args.max_jobs,
+        args.cpu_budget,
+        None if args.memory_budget_gb is None else int(args.memory_budget_gb * 1024**3),
+    )
+    batch_summary = renderer.run(batch_jobs)
+    summary_path = args.summary or os.path.join(args.output_dir, SUMMARY_FILE)
+    os.makedirs(os.path.dirname(os.path.abspath(summary_path)), exist_ok=True)
+    write_json_atomic(summary_path, batch_summary)
+    logger.info(f"{batch_summary['counts']} - summary written to {summary_path}")
+    if batch_summary["counts"][BatchStatusEnum.FAILED]:
+        raise SystemExit(1)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from benchmarks.render_benchmark import generate_photo_fixtures
+from components.video_processing.video_processing_utils import format_photo_to_vertical
+from utils.data_structures import FitModeEnum
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
+logger = logging.getLogger(__name__)
+
+
+def legacy_format_photo_to_vertical(photo_path, reel_size=(1080, 1920)):
+    """Formatter the blurred-cover one replaced, kept as a reference point."""
+    img = cv2.imread(photo_path)
+    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+    # Meant as a blurred background, but blurs a black frame
+    bg = cv2.resize(img_rgb * 0, reel_size)
+    bg = cv2.GaussianBlur(bg, (51, 51), 0)
+
+    foreground = Image.fromarray(img_rgb)
+    foreground.thumbnail(reel_size, Image.Resampling.LANCZOS)
+
+    fg_w, fg_h = foreground.size
+    bg_pil = Image.fromarray(bg)
+    offset = ((reel_size[0] - fg_w) // 2, (reel_size[1] - fg_h) // 2)
+    bg_pil.paste(foreground, offset)
+
+    return np.array(bg_pil)
+
+
+def background_level(frame, reel_size):
+    """Mean of the top and bottom rows, 0 when the background is black."""
+    rows = max(1, reel_size[1] // 50)
+    return float(np.concatenate([frame[:rows], frame[-rows:]]).mean())
+
+
+def run_benchmark(width=1080, height=1920, repeat=5, scale=1.0, save_dir=None):
+    reel_size = (width, height)
+    formatters = {
+        "legacy (reference)": legacy_format_photo_to_vertical,
+        "blurred_cover": lambda path, size: format_photo_to_vertical(
+            path, size, FitModeEnum.BLUR
+        ),
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as photo_dir:
+        paths = generate_photo_fixtures(photo_dir, scale)
+        for name, formatter in formatters.items():
+            walls = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                frames = [formatter(path, reel_size) for path in paths]
+                walls.append(time.perf_counter() - start)
+            per_photo = min(walls) / len(paths) * 1000
+            level = np.mean([background_level(f, reel_size) for f in frames])
+            results[name] = {"ms_per_photo": per_photo, "background": level}
+            logger.info(
+                f"{name:>20}: {per_photo:7.2f} ms/photo, "
+                f"background level {level:5.1f} at {width}x{height}"
+            )
+            if save_dir:
+                os.makedirs(save_dir, exist_ok=True)
+                for path, frame in zip(paths, frames):
+                    stem = os.path.splitext(os.path.basename(path))[0]
+                    Image.fromarray(frame).save(
+                        os.path.join(save_dir, f"{name.split()[0]}_{stem}.jpg")
+                    )
+    return results
+
+
+def arg_parser():
+    parser = argparse.ArgumentParser(
+        description="Compare the photo formatter with the one it replaced.",
+    )
+    parser.add_argument("--width", type=int, default=1080)
+    parser.add_argument("--height", type=int, default=1920)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Photo resolution factor."
+    )
+    parser.add_argument(
+        "--save_dir",
+        type=str,
+        default=None,
+        help="Also write every formatted photo here to compare the look.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = arg_parser()
+    run_benchmark(args.width, args.height, args.repeat, args.scale, args.save_dir)
@@ -0,0 +1,425 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from components.video_processing.encoder_profiles import hardware_encoding_available
+from components.video_processing.video_postprocessing import VideoPostProcessing
+from components.video_processing.video_preprocessing import VideoPreprocessing
+from components.video_processing.video_processing_utils import format_photo_to_vertical
+from main import PREVIEW_PROXY, create_instagram_reel
+from utils.cache_utils import CACHE_DIR_ENV, write_json_atomic
+from utils.data_structures import (
+    EncoderProfileEnum,
+    MediaClip,
+    TransitionTypeEnum,
+    VisionDataTypeEnum,
+)
+from utils.profiling import profiler
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
+logger = logging.getLogger(__name__)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "render_baseline.json")
+# (filename, (width, height), fps, variable frame rate, display rotation)
+VIDEO_FIXTURES = [
+    ("cfr_portrait_30.mp4", (1080, 1920), 30, False, 0),
+    ("cfr_landscape_60.mp4", (1920, 1080), 60, False, 0),
+    ("vfr_portrait_30.mp4", (1080, 1920), 30, True, 0),
+    ("cfr_landscape_24_rotated.mp4", (1280, 720), 24, False, 90),
+]
+PHOTO_FIXTURES = {
+    "photo_4x3.jpg": (1600, 1200),
+    "photo_3x4.jpg": (1200, 1600),
+    "photo_square.jpg": (1500, 1500),
+    "photo_9x16.jpg": (1080, 1920),
+    "photo_panorama.jpg": (3000, 1000),
+}
+# Keeps every other frame plus every fifth, so frame durations vary.
+VFR_SELECT = "select='not(mod(n\\,2))+eq(mod(n\\,5)\\,1)'"
+
+
+def scaled(size, scale):
+    # Even dimensions, as yuv420p requires.
+    return tuple(max(2, round(side * scale / 2) * 2) for side in size)
+
+
+def video_command(path, size, fps, duration, vfr):
+    width, height = size
+    cmd = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-f",
+        "lavfi",
+        "-i",
+        f"testsrc2=size={width}x{height}:rate={fps}:duration={duration}",
+        "-f",
+        "lavfi",
+        "-i",
+        f"sine=frequency=440:sample_rate=44100:duration={duration}",
+    ]
+    if vfr:
+        cmd += ["-vf", VFR_SELECT, "-fps_mode", "vfr"]
+    return cmd + [
+        "-c:v",
+        "libx264",
+        "-preset",
+        "ultrafast",
+        "-pix_fmt",
+        "yuv420p",
+        "-c:a",
+        "aac",
+        "-shortest",
+        path,
+    ]
+
+
+def generate_fixtures(fixture_dir, duration=4, scale=1.0):
+    """
+    Create the synthetic media once per (duration, scale) in ``fixture_dir``.
+
+    Videos are ffmpeg testsrc2 with a sine track, photos are seeded noise over a
+    gradient, so every run measures the same bytes.
+    """
+    fixture_dir = os.path.join(fixture_dir, f"d{duration}_s{scale}")
+    os.makedirs(fixture_dir, exist_ok=True)
+    for filename, size, fps, vfr, rotation in VIDEO_FIXTURES:
+        path = os.path.join(fixture_dir, filename)
+        if os.path.exists(path):
+            continue
+        partial_path = os.path.join(fixture_dir, f"partial_{filename}")
+        subprocess.run(
+            video_command(partial_path, scaled(size, scale), fps, duration, vfr),
+            check=True,
+        )
+        if rotation:
+            # Rotation is display metadata, set while remuxing.
+            subprocess.run(
+                [
+                    "ffmpeg",
+                    "-hide_banner",
+                    "-loglevel",
+                    "error",
+                    "-y",
+                    "-display_rotation",
+                    str(rotation),
+                    "-i",
+                    partial_path,
+                    "-c",
+                    "copy",
+                    path,
+                ],
+                check=True,
+            )
+            os.remove(partial_path)
+        else:
+            os.replace(partial_path, path)
+
+    generate_photo_fixtures(fixture_dir, scale)
+    return fixture_dir
+
+
+def generate_photo_fixtures(fixture_dir, scale=1.0):
+    """Write the PHOTO_FIXTURES that are missing and return all their paths."""
+    rng = np.random.default_rng(0)
+    paths = []
+    for filename, size in PHOTO_FIXTURES.items():
+        path = os.path.join(fixture_dir, filename)
+        paths.append(path)
+        if os.path.exists(path):
+            continue
+        width, height = scaled(size, scale)
+        gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+        noise = rng.integers(0, 64, (height, width, 3))
+        pixels = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+        Image.fromarray(pixels).save(path, quality=90)
+    return paths
+
+
+def measure(run, repeat=1, setup=None, frames=None):
+    """
+    Best wall time of ``repeat`` runs with the peak RSS seen during them.
+
+    ``frames`` defaults to the frames the timeline rendered in this process.
+    """
+    walls = []
+    peak_rss = 0
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        profiler.start()
+        start = time.perf_counter()
+        try:
+            run()
+        finally:
+            walls.append(time.perf_counter() - start)
+            profiler.stop()
+        summary = profiler.summary()
+        peak_rss = max(peak_rss, summary["peak_rss_mb"])
+        if frames is None:
+            frames = sum(
+                value
+                for name, value in summary["counters"].items()
+                if name.startswith("frames.")
+            )
+    wall = min(walls)
+    return {
+        "wall": round(wall, 4),
+        "frames": frames,
+        "fps": round(frames / wall, 2) if wall else None,
+        "peak_rss_mb": peak_rss,
+    }
+
+
+def clip(start, end, media_type, transition=TransitionTypeEnum.NONE):
+    return MediaClip(start, end, transition, media_type, video_resampling=1)
+
+
+class RenderBenchmark:
+    """
+    Runs every benchmark case against one fixture set.
+
+    Each case runs in a fresh process, so its peak RSS is its own and not what
+    earlier cases left allocated.
+    """
+
+    def __init__(self, fixture_dir, work_dir, duration, repeat=1, encoder_profile=None):
+        self.fixture_dir = fixture_dir
+        self.work_dir = work_dir
+        self.duration = duration
+        self.repeat = repeat
+        self.encoder_profile = encoder_profile
+        self.has_ffprobe = shutil.which("ffprobe") is not None
+        self.results = {}
+        self.skipped = {}
+
+    def cases(self):
+        return [
+            "format_photo_to_vertical",
+            "convert_to_cfr",
+            *(f"transition.{transition}" for transition in TransitionTypeEnum),
+            "reel.final",
+            "reel.preview",
+        ]
+
+    def clear_caches(self):
+        shutil.rmtree(os.environ[CACHE_DIR_ENV], ignore_errors=True)
+        shutil.rmtree(
+            os.path.join(self.work_dir, VideoPostProcessing.PREVIEW_FOLDER),
+            ignore_errors=True,
+        )
+
+    def reel_config(self):
+        transitions = [t for t in TransitionTypeEnum if t != TransitionTypeEnum.NONE]
+        config = {}
+        for i, (filename, *_) in enumerate(VIDEO_FIXTURES):
+            config[filename] = clip(
+                0.5,
+                self.duration - 0.5,
+                VisionDataTypeEnum.VIDEO,
+                transitions[i % len(transitions)],
+            )
+        for filename in list(PHOTO_FIXTURES)[:2]:
+            config[filename] = clip(0, 2, VisionDataTypeEnum.PHOTO)
+        return config
+
+    def transition_config(self, transition):
+        # Photos keep the decode cost out of the way of the transition itself.
+        first, second = list(PHOTO_FIXTURES)[:2]
+        return {
+            first: clip(0, 2, VisionDataTypeEnum.PHOTO, transition),
+            second: clip(0, 2, VisionDataTypeEnum.PHOTO),
+        }
+
+    def render(self, config, preview=False):
+        return lambda: create_instagram_reel(
+            config,
+            self.fixture_dir,
+            os.path.join(self.work_dir, "output.mp4"),
+            preview=preview,
+            encoder_profile=None if preview else self.encoder_profile,
+        )
+
+    def measure_case(self, name):
+        if name == "format_photo_to_vertical":
+            paths = [os.path.join(self.fixture_dir, name) for name in PHOTO_FIXTURES]
+
+            def run():
+                for path in paths:
+                    format_photo_to_vertical(
+                        path, VideoPreprocessing.INSTAGRAM_RESOLUTION
+                    )
+
+            return measure(run, self.repeat, frames=len(paths))
+
+        if name == "convert_to_cfr":
+            path = os.path.join(self.fixture_dir, "vfr_portrait_30.mp4")
+            preprocessing = VideoPreprocessing()
+            return measure(
+                lambda: preprocessing.convert_to_cfr(path, 30, 0, self.duration),
+                self.repeat,
+                setup=preprocessing.cfr_cache.clear,
+                frames=self.duration * 30,
+            )
+
+        if name.startswith("transition."):
+            transition = TransitionTypeEnum(name.split(".", 1)[1])
+            config = self.transition_config(transition)
+            return measure(self.render(config), self.repeat, setup=self.clear_caches)
+
+        config = self.reel_config()
+        if name == "reel.final":
+            return measure(self.render(config), self.repeat, setup=self.clear_caches)
+        # Preview clips render in worker processes, count their frames up front.
+        seconds = sum(entry.end - entry.start for entry in config.values())
+        return measure(
+            self.render(config, preview=True),
+            self.repeat,
+            setup=self.clear_caches,
+            frames=round(seconds * PREVIEW_PROXY.fps),
+        )
+
+    def run(self):
+        for name in self.cases():
+            if name.startswith("reel.") and not self.has_ffprobe:
+                self.skipped[name] = "ffprobe not found"
+                logger.warning(f"{name:<36} skipped: {self.skipped[name]}")
+                continue
+            with ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                result = pool.submit(self.measure_case, name).result()
+            self.results[name] = result
+            logger.info(
+                f"{name:<36} {result['wall']:8.3f}s {result['fps'] or 0:9.1f} "
+                f"frames/s {result['peak_rss_mb']:8.1f} MB"
+            )
+        return self.results
+
+
+def environment(duration, scale, encoder_profile):
+    ffmpeg = subprocess.run(
+        ["ffmpeg", "-version"], capture_output=True, text=True
+    ).stdout.splitlines()
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "ffmpeg": ffmpeg[0] if ffmpeg else None,
+        "nvenc": hardware_encoding_available(),
+        "duration": duration,
+        "scale": scale,
+        "encoder_profile": str(encoder_profile) if encoder_profile else None,
+    }
+
+
+def find_regressions(results, baseline, tolerance):
+    """Describe every result slower or heavier than the baseline beyond ``tolerance``."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        for metric, unit in (("wall", "s"), ("peak_rss_mb", " MB")):
+            if result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {metric} {base[metric]}{unit} -> {result[metric]}{unit}"
+                )
+    return regressions
+
+
+def arg_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the render pipeline on generated media fixtures.",
+    )
+    parser.add_argument(
+        "--fixture_dir",
+        type=str,
+        default=os.path.join(tempfile.gettempdir(), "reel_benchmark_fixtures"),
+        help="Where fixtures are generated and reused.",
+    )
+    parser.add_argument("--duration", type=int, default=4, help="Seconds per video.")
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Fixture resolution factor, e.g. 0.25 for a quick run.",
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--encoder_profile",
+        type=EncoderProfileEnum,
+        choices=list(EncoderProfileEnum),
+        default=None,
+        help="Encoder profile of the final renders (default: publish).",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="render_benchmark.json",
+        help="Results JSON.",
+    )
+    parser.add_argument("--baseline", type=str, default=BASELINE_PATH)
+    parser.add_argument(
+        "--save_baseline",
+        action="store_true",
+        help="Store these results as the new baseline.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="Allowed slowdown/growth over the baseline before flagging it.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = arg_parser()
+    fixtures = generate_fixtures(
+        os.path.abspath(args.fixture_dir), args.duration, args.scale
+    )
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Cold, private caches and preview folder for every run.
+        os.environ[CACHE_DIR_ENV] = os.path.join(work_dir, "cache")
+        os.chdir(work_dir)
+        try:
+            benchmark = RenderBenchmark(
+                fixtures, work_dir, args.duration, args.repeat, args.encoder_profile
+            )
+            results = benchmark.run()
+            env = environment(args.duration, args.scale, args.encoder_profile)
+        finally:
+            os.chdir(cwd)
+
+    report = {"environment": env, "results": results, "skipped": benchmark.skipped}
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        report["regressions"] = regressions
+    write_json_atomic(args.output, report)
+    if args.save_baseline:
+        write_json_atomic(args.baseline, report)
+        logger.info(f"Baseline saved to {args.baseline}")
+    for regression in regressions:
+        logger.error(f"Regression: {regression}")
+    if regressions:
+        raise SystemExit(1)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+
+import numpy as np
+
+from components.video_processing import transition_kernels
+from components.video_processing.video_transitions import VideoTransitions
+from utils.data_structures import TransitionTypeEnum
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
+logger = logging.getLogger(__name__)
+
+
+def numpy_blend(frame1, frame2, progress, out=None):
+    """Float32 blend the kernels replaced, kept as a reference point."""
+    return (
+        frame1.astype(np.float32) * (1 - progress)
+        + frame2.astype(np.float32) * progress
+    ).astype(np.uint8)
+
+
+def measure_fps(blend, frame1, frame2, frames):
+    out = np.empty_like(frame1)
+    start = time.perf_counter()
+    for i in range(frames):
+        blend(frame1, frame2, i / frames, out)
+    return frames / (time.perf_counter() - start)
+
+
+def run_benchmark(width=1080, height=1920, frames=60, blend_width=40):
+    video_transitions = VideoTransitions()
+    rng = np.random.default_rng(0)
+    frame1 = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    frame2 = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+    blends = {
+        "numpy_blend (reference)": numpy_blend,
+        "kernel_blend": transition_kernels.blend,
+        TransitionTypeEnum.FADE.value: lambda f1, f2, p, out: (
+            video_transitions.fade_out_frame(f1, p, out)
+        ),
+        TransitionTypeEnum.SLIDE.value: lambda f1, f2, p, out: (
+            video_transitions.slide_frames(f1, f2, p, out, blend_width=blend_width)
+        ),
+        TransitionTypeEnum.ZOOM.value: video_transitions.blend_for(
+            TransitionTypeEnum.ZOOM, frames / 30, 30
+        ),
+        TransitionTypeEnum.SPIN.value: video_transitions.blend_for(
+            TransitionTypeEnum.SPIN, frames / 30, 30
+        ),
+    }
+    results = {}
+    for name, blend in blends.items():
+        results[name] = measure_fps(blend, frame1, frame2, frames)
+        logger.info(f"{name:>24}: {results[name]:8.1f} frames/s at {width}x{height}")
+    return results
+
+
+def arg_parser():
+    parser = argparse.ArgumentParser(
+        description="Measure frames/sec of the transition blending kernels.",
+    )
+    parser.add_argument("--width", type=int, default=1080)
+    parser.add_argument("--height", type=int, default=1920)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--blend_width", type=int, default=40)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = arg_parser()
+    run_benchmark(args.width, args.height, args.frames, args.blend_width)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import time
+
+
+class FramePresenter:
+    """
+    Paces playback by a monotonic clock instead of by timer callbacks.
+
+    The frame to show is derived from the wall time elapsed since playback
+    started, so a late callback skips ahead instead of slowing the video down.
+    Buffered frames that are already behind the clock are dropped. ``source``
+    provides ``peek()`` and ``read()`` like PreviewPlayer.
+    """
+
+    def __init__(self, source, fps, clock=time.monotonic):
+        self.source = source
+        self.fps = fps
+        self.clock = clock
+        self.start_frame = 0
+        self.start_time = None  # set by the first frame after start()
+        self.presented_frames = 0
+        self.dropped_frames = 0
+
+    def start(self, frame_index=0):
+        """(Re)start the clock at ``frame_index``, e.g. on play or seek."""
+        self.start_frame = frame_index
+        self.start_time = None
+        self.presented_frames = 0
+        self.dropped_frames = 0
+
+    def elapsed_frames(self):
+        # The epsilon keeps float error from showing a frame one tick late.
+        return (self.clock() - self.start_time) * self.fps + 1e-6
+
+    def target_frame(self):
+        if self.start_time is None:
+            return self.start_frame
+        return self.start_frame + int(self.elapsed_frames())
+
+    def next_frame(self):
+        """
+        Return the ``(frame_index, frame)`` due now, or None if the current frame
+        is still on screen or the decoder has not caught up.
+        """
+        target = self.target_frame()
+        index = self.source.peek()
+        while index is not None and index < target:
+            self.source.read()
+            self.dropped_frames += 1
+            index = self.source.peek()
+        if index is None or (index > target and self.start_time is not None):
+            return None
+
+        item = self.source.read()
+        if self.start_time is None:
+            # Anchor on the first frame, so waiting for a seek drops nothing.
+            self.start_time = self.clock()
+            self.start_frame = index
+        self.presented_frames += 1
+        return item
+
+    def delay_ms(self):
+        """Milliseconds until the next frame is due."""
+        if self.start_time is None:
+            return 1
+        elapsed_frames = self.elapsed_frames()
+        remaining = int(elapsed_frames) + 1 - elapsed_frames
+        return max(1, round(remaining / self.fps * 1000))
+
+    @property
+    def achieved_fps(self):
+        if self.start_time is None:
+            return 0.0
+        elapsed = self.clock() - self.start_time
+        return self.presented_frames / elapsed if elapsed > 0 else 0.0
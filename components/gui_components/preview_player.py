@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import bisect
+import threading
+
+import cv2
+import numpy as np
+
+
+class PreviewPlayer:
+    """
+    Streams a sequence of preview files as one seekable video.
+
+    A background thread decodes, resizes and converts frames to RGB into a
+    fixed ring buffer of ``buffer_frames`` slots, so memory does not depend on
+    the reel length. The Tk thread pulls frames with ``read`` and jumps with
+    ``seek``, which restarts decoding from a container seek in the right file.
+    """
+
+    BUFFER_FRAMES = 32
+
+    def __init__(self, video_files, size, fps=30, buffer_frames=BUFFER_FRAMES):
+        self.video_files = list(video_files)
+        self.size = size  # (width, height)
+        self.fps = fps
+        # First global frame index of every file.
+        self.file_starts = []
+        self.total_frames = 0
+        for path in self.video_files:
+            cap = cv2.VideoCapture(path)
+            self.file_starts.append(self.total_frames)
+            self.total_frames += max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+            cap.release()
+
+        width, height = size
+        self.ring = np.empty((buffer_frames, height, width, 3), dtype=np.uint8)
+        self.ring_indices = [0] * buffer_frames  # frame index held by each slot
+        self.head = 0  # next slot to read
+        self.count = 0  # filled slots
+        self.condition = threading.Condition()
+        self.seek_target = 0
+        self.finished = False  # decoder reached the last frame
+        self.stopped = False
+        self.thread = threading.Thread(target=self._decode_loop, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+    def seek(self, frame_index):
+        """Drop buffered frames and continue decoding from ``frame_index``."""
+        with self.condition:
+            self.seek_target = max(0, min(frame_index, self.total_frames - 1))
+            self.count = 0
+            self.finished = False
+            self.condition.notify_all()
+
+    def read(self):
+        """Return the next ``(frame_index, rgb_frame)`` or None if none is ready."""
+        with self.condition:
+            if self.count == 0:
+                return None
+            slot = self.head
+            item = self.ring_indices[slot], self.ring[slot].copy()
+            self.head = (self.head + 1) % len(self.ring)
+            self.count -= 1
+            self.condition.notify_all()
+            return item
+
+    def peek(self):
+        """Index of the next frame ``read`` would return, or None."""
+        with self.condition:
+            return self.ring_indices[self.head] if self.count else None
+
+    @property
+    def at_end(self):
+        with self.condition:
+            return self.finished and self.count == 0
+
+    def _open(self, frame_index):
+        file_index = bisect.bisect_right(self.file_starts, frame_index) - 1
+        cap = cv2.VideoCapture(self.video_files[file_index])
+        local_index = frame_index - self.file_starts[file_index]
+        if local_index:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, local_index)
+        return cap, file_index
+
+    def _decode_loop(self):
+        cap = None
+        file_index = 0
+        frame_index = 0
+        while True:
+            with self.condition:
+                while (
+                    not self.stopped
+                    and (self.finished or self.count == len(self.ring))
+                    and self.seek_target is None
+                ):
+                    self.condition.wait()
+                if self.stopped:
+                    break
+                target, self.seek_target = self.seek_target, None
+
+            if target is not None:
+                if cap is not None:
+                    cap.release()
+                cap, file_index = self._open(target)
+                frame_index = target
+
+            ok, frame = cap.read()
+            if not ok:
+                cap.release()
+                cap = None
+                if file_index + 1 < len(self.video_files):
+                    file_index += 1
+                    cap = cv2.VideoCapture(self.video_files[file_index])
+                    frame_index = self.file_starts[file_index]
+                    continue
+                with self.condition:
+                    if self.seek_target is None:
+                        self.finished = True
+                continue
+
+            resized = cv2.resize(frame, self.size)
+            with self.condition:
+                if self.seek_target is not None:
+                    continue  # stale frame from before the seek
+                slot = (self.head + self.count) % len(self.ring)
+                cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=self.ring[slot])
+                self.ring_indices[slot] = frame_index
+                self.count += 1
+                self.condition.notify_all()
+            frame_index += 1
+
+        if cap is not None:
+            cap.release()
@@ -2,40 +2,101 @@ from __future__ import annotations
 
 import io
 import logging
+import queue
 import tkinter as tk
 
 
-class TextRedirector(io.TextIOBase):
-    def __init__(self, text_widget):
+class LogSink:
+    """
+    Thread-safe buffer between log writers and a Tk ``Text`` widget.
+
+    Writers only put text on a queue. The Tk main loop drains it every
+    ``FLUSH_INTERVAL_MS`` and applies the whole batch at once: consecutive
+    carriage-return progress updates collapse into the last one, and the widget
+    keeps at most ``MAX_LINES`` lines.
+    """
+
+    FLUSH_INTERVAL_MS = 100
+    MAX_LINES = 2000
+
+    def __init__(self, text_widget, flush_interval_ms=FLUSH_INTERVAL_MS):
         self.text_widget = text_widget
-        self.last_line = ""
+        self.flush_interval_ms = flush_interval_ms
+        self.queue = queue.SimpleQueue()
 
-    def write(self, s):
-        if "\r" in s:
-            self.last_line = s.strip()
-            self._overwrite_last_line(self.last_line)
-        else:
-            self.text_widget.insert(tk.END, s)
-            self.text_widget.see(tk.END)
-            self.text_widget.update_idletasks()
-
-    def _overwrite_last_line(self, text):
-        self.text_widget.delete("end-2l", "end-1l")
-        self.text_widget.insert(tk.END, text + "\n")
+    def start(self):
+        self.text_widget.after(self.flush_interval_ms, self._flush_loop)
+        return self
+
+    def write(self, text):
+        """Queue text for the widget; safe to call from any thread."""
+        self.queue.put(text)
+
+    def clear(self):
+        self.queue.put(None)
+
+    def _flush_loop(self):
+        self.flush()
+        self.text_widget.after(self.flush_interval_ms, self._flush_loop)
+
+    def _batch(self):
+        """Turn queued writes into ('insert' | 'replace' | 'clear', text) ops."""
+        ops = []
+        while True:
+            try:
+                text = self.queue.get_nowait()
+            except queue.Empty:
+                return ops
+            if text is None:
+                ops = [("clear", "")]
+            elif "\r" in text:
+                op = ("replace", text.strip())
+                # Only the newest progress line survives
+                if ops and ops[-1][0] == "replace":
+                    ops[-1] = op
+                else:
+                    ops.append(op)
+            elif ops and ops[-1][0] == "insert":
+                ops[-1] = ("insert", ops[-1][1] + text)
+            else:
+                ops.append(("insert", text))
+
+    def flush(self):
+        """Apply queued writes to the widget; call from the Tk thread."""
+        ops = self._batch()
+        if not ops:
+            return
+        for op, text in ops:
+            if op == "clear":
+                self.text_widget.delete("1.0", tk.END)
+            elif op == "replace":
+                self.text_widget.delete("end-2l", "end-1l")
+                self.text_widget.insert(tk.END, text + "\n")
+            else:
+                self.text_widget.insert(tk.END, text)
+
+        lines = int(self.text_widget.index("end-1c").split(".")[0])
+        if lines > self.MAX_LINES:
+            self.text_widget.delete("1.0", f"{lines - self.MAX_LINES + 1}.0")
         self.text_widget.see(tk.END)
-        self.text_widget.update_idletasks()
+
+
+class TextRedirector(io.TextIOBase):
+    def __init__(self, sink: LogSink):
+        self.sink = sink
+
+    def write(self, s):
+        self.sink.write(s)
+        return len(s)
 
     def flush(self):
         pass
 
 
 class TextWidgetHandler(logging.Handler):
-    def __init__(self, text_widget):
+    def __init__(self, sink: LogSink):
         super().__init__()
-        self.text_widget = text_widget
+        self.sink = sink
 
     def emit(self, record):
-        msg = self.format(record)
-        self.text_widget.insert(tk.END, msg + "\n")
-        self.text_widget.see(tk.END)
-        self.text_widget.update_idletasks()
+        self.sink.write(self.format(record) + "\n")
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from utils.cache_utils import cache_key, file_identity
+from utils.data_structures import VisionDataTypeEnum
+from utils.file_cache import FileCache
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
+
+
+def thumbnail_timestamps(start, end, count):
+    """Timestamps of ``count`` tiles evenly covering ``start``..``end``."""
+    if count <= 0 or end <= start:
+        return []
+    step = (end - start) / count
+    # Rounded so small trims and drags keep hitting the same cached tiles.
+    return [round(start + i * step, 1) for i in range(count)]
+
+
+class ThumbnailService:
+    """
+    Extracts timeline thumbnails off the Tk thread.
+
+    Video tiles come from a keyframe-only ffmpeg seek, so a tile costs one
+    keyframe decode however long the source is. Tiles are stored as JPEGs in a
+    persistent ``FileCache`` keyed by the source's file identity and timestamp,
+    and the most recent ones are kept decoded in a bounded in-memory LRU.
+    ``request`` answers from memory or schedules the tile on a worker pool and
+    calls back from a worker thread once it is ready.
+    """
+
+    THUMBNAIL_HEIGHT = 40
+    MEMORY_ITEMS = 512
+    CACHE_MAX_BYTES = 200 * 1024**2
+    WORKERS = 2
+
+    def __init__(
+        self,
+        height=THUMBNAIL_HEIGHT,
+        memory_items=MEMORY_ITEMS,
+        workers=WORKERS,
+        cache=None,
+    ):
+        self.height = height
+        self.memory_items = memory_items
+        self.cache = cache or FileCache(
+            "thumbnails", ".jpg", max_bytes=self.CACHE_MAX_BYTES
+        )
+        self.memory = OrderedDict()  # key -> PIL image, least recent first
+        self.pending = {}  # key -> (future, callbacks)
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="thumbnails"
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def key(self, path, timestamp, media_type=VisionDataTypeEnum.VIDEO):
+        """Cache key of a tile, None if the source is missing."""
+        try:
+            identity = file_identity(path)
+        except OSError:
+            return None
+        if media_type == VisionDataTypeEnum.PHOTO:
+            timestamp = 0
+        return cache_key("thumbnail", identity, round(timestamp, 1), self.height)
+
+    def request(self, path, timestamp, callback, media_type=VisionDataTypeEnum.VIDEO):
+        """
+        Return the tile if it is in memory, otherwise None.
+
+        A missing tile is loaded in the background and ``callback(image)`` is
+        called from a worker thread once it is ready.
+        """
+        key = self.key(path, timestamp, media_type)
+        if key is None:
+            return None
+        with self.lock:
+            image = self.memory.get(key)
+            if image is not None:
+                self.memory.move_to_end(key)
+                return image
+            if key in self.pending:
+                self.pending[key][1].append(callback)
+                return None
+            future = self.executor.submit(self._load, key, path, timestamp, media_type)
+            self.pending[key] = (future, [callback])
+        return None
+
+    def cancel(self):
+        """Drop queued tiles that have not started loading."""
+        with self.lock:
+            for key, (future, _) in list(self.pending.items()):
+                if future.cancel():
+                    del self.pending[key]
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False)
+
+    def _remember(self, key, image):
+        with self.lock:
+            self.memory[key] = image
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.memory_items:
+                self.memory.popitem(last=False)
+            _, callbacks = self.pending.pop(key, (None, []))
+        return callbacks
+
+    def _load(self, key, path, timestamp, media_type):
+        try:
+            cached_path = self.cache.get(key)
+            if cached_path is None:
+                cached_path = self._extract(key, path, timestamp, media_type)
+            with Image.open(cached_path) as image:
+                image.load()
+        except Exception as e:
+            with self.lock:
+                self.pending.pop(key, None)
+            self.logger.warning(f"No thumbnail for {path} at {timestamp}s: {e}")
+            return
+
+        for callback in self._remember(key, image):
+            callback(image)
+
+    def _extract(self, key, path, timestamp, media_type):
+        partial_path = self.cache.partial_path_for(key)
+        try:
+            if media_type == VisionDataTypeEnum.PHOTO:
+                with Image.open(path) as image:
+                    image = image.convert("RGB")
+                    width = max(1, round(image.width * self.height / image.height))
+                    image.resize((width, self.height)).save(partial_path, "JPEG")
+            else:
+                subprocess.run(
+                    self.extract_command(path, timestamp, partial_path),
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    check=True,
+                )
+        except Exception:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        return self.cache.put(
+            key, partial_path, source=os.path.abspath(path), timestamp=timestamp
+        )
+
+    def extract_command(self, path, timestamp, output_path):
+        # Without accurate seeking ffmpeg stops at the keyframe before the
+        # timestamp, and skipping non-key frames means nothing else is decoded.
+        return [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-noaccurate_seek",
+            "-ss",
+            f"{timestamp:.3f}",
+            "-skip_frame",
+            "nokey",
+            "-i",
+            path,
+            "-frames:v",
+            "1",
+            "-vf",
+            f"scale=-2:{self.height}",
+            "-q:v",
+            "5",
+            output_path,
+        ]
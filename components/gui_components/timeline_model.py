@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import bisect
+
+from utils.data_structures import TimelineItem
+
+
+class TimelineModel:
+    """
+    Non-overlapping timeline items kept sorted by position.
+
+    Because items never overlap, sorting by start also sorts them by end, so
+    overlap checks, neighbours and visible-range queries are binary searches
+    over the parallel ``starts``/``ends`` lists instead of scans of every item.
+    """
+
+    def __init__(self):
+        self.items = []  # sorted by start
+        self.starts = []
+        self.ends = []
+        self.by_id = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(list(self.items))
+
+    def get(self, item_id) -> TimelineItem:
+        return self.by_id[item_id]
+
+    @property
+    def end(self):
+        return self.ends[-1] if self.ends else 0
+
+    def _index(self, item):
+        index = bisect.bisect_left(self.starts, item.start)
+        while self.items[index] is not item:
+            index += 1
+        return index
+
+    def add(self, item: TimelineItem):
+        index = bisect.bisect_right(self.starts, item.start)
+        self.items.insert(index, item)
+        self.starts.insert(index, item.start)
+        self.ends.insert(index, item.end)
+        self.by_id[item.item_id] = item
+
+    def remove(self, item_id):
+        item = self.by_id.pop(item_id)
+        index = self._index(item)
+        del self.items[index], self.starts[index], self.ends[index]
+        return item
+
+    def move(self, item_id, start, end):
+        """Set an item's position, callers check ``overlaps`` first."""
+        item = self.remove(item_id)
+        item.start, item.end = start, end
+        self.add(item)
+
+    def overlaps(self, item_id, start, end):
+        """Whether ``start``..``end`` would overlap any item but ``item_id``."""
+        # Items before ``index`` start before ``end``; the latest of them also
+        # ends last, so it is the only candidate besides the item itself.
+        index = bisect.bisect_left(self.starts, end)
+        for candidate in self.items[max(0, index - 2) : index]:
+            if candidate.item_id != item_id and candidate.end > start:
+                return True
+        return False
+
+    def visible(self, start, end) -> list[TimelineItem]:
+        """Items intersecting ``start``..``end``."""
+        first = bisect.bisect_right(self.ends, start)
+        last = bisect.bisect_left(self.starts, end)
+        return self.items[first:last]
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+from dataclasses import replace
+from functools import lru_cache
+
+from components.video_processing.video_processing_utils import (
+    has_nvenc_support,
+    has_nvidia_gpu,
+)
+from utils.cache_utils import cache_key, file_identity, get_cache_dir, write_json_atomic
+from utils.data_structures import EncoderProfile, EncoderProfileEnum
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
+logger = logging.getLogger(__name__)
+
+CAPABILITIES_FILE = "capabilities.json"
+
+# Many preview renders run side by side, each gets a couple of threads, while a
+# publish render gets the machine minus two cores for the UI and decoding.
+PARALLEL_RENDER_THREADS = 2
+
+SOFTWARE_PROFILES = {
+    EncoderProfileEnum.DRAFT: EncoderProfile("libx264", "ultrafast", ["-crf", "30"], 0),
+    EncoderProfileEnum.PREVIEW: EncoderProfile(
+        "libx264", "ultrafast", ["-crf", "26"], 0
+    ),
+    EncoderProfileEnum.PUBLISH: EncoderProfile("libx264", "medium", ["-crf", "18"], 0),
+}
+HARDWARE_PROFILES = {
+    EncoderProfileEnum.DRAFT: EncoderProfile("h264_nvenc", "p1", ["-cq", "32"], 0),
+    EncoderProfileEnum.PREVIEW: EncoderProfile("h264_nvenc", "p2", ["-cq", "28"], 0),
+    EncoderProfileEnum.PUBLISH: EncoderProfile("h264_nvenc", "p5", ["-cq", "19"], 0),
+}
+
+
+def profile_threads(profile):
+    if profile == EncoderProfileEnum.PUBLISH:
+        return max(1, (os.cpu_count() or 1) - 2)
+    return PARALLEL_RENDER_THREADS
+
+
+def _capabilities_key():
+    """Detection is redone when ffmpeg is replaced or nvidia-smi appears."""
+    ffmpeg = shutil.which("ffmpeg")
+    return cache_key(
+        ffmpeg,
+        file_identity(ffmpeg) if ffmpeg else None,
+        shutil.which("nvidia-smi"),
+    )
+
+
+@lru_cache(maxsize=1)
+def hardware_encoding_available():
+    """
+    Whether NVENC can be used, detected once per process.
+
+    The result is persisted in the cache directory, so later runs skip the
+    ``ffmpeg -encoders`` and ``nvidia-smi`` calls.
+    """
+    path = os.path.join(get_cache_dir("encoders"), CAPABILITIES_FILE)
+    key = _capabilities_key()
+    try:
+        with open(path) as f:
+            stored = json.load(f)
+        if stored.get("key") == key:
+            return stored["nvenc"]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        pass
+
+    nvenc = has_nvenc_support() and has_nvidia_gpu()
+    if nvenc:
+        logger.info("NVENC GPU acceleration is available.")
+    else:
+        logger.info("NVENC not available, falling back to CPU encoding.")
+    write_json_atomic(path, {"key": key, "nvenc": nvenc})
+    return nvenc
+
+
+def resolve_profile(profile=EncoderProfileEnum.PUBLISH, hardware=None):
+    """
+    Return the EncoderProfile for a named profile.
+
+    ``hardware`` forces (True) or disables (False) NVENC, by default it is used
+    when detected and libx264 is the fallback. A resolved EncoderProfile is
+    returned as is.
+    """
+    if isinstance(profile, EncoderProfile):
+        return profile
+    profile = EncoderProfileEnum(profile)
+    if hardware is None:
+        hardware = hardware_encoding_available()
+    profiles = HARDWARE_PROFILES if hardware else SOFTWARE_PROFILES
+    return replace(profiles[profile], threads=profile_threads(profile))
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+
+from components.video_processing.encoder_profiles import resolve_profile
+from utils.data_structures import (
+    EncoderProfile,
+    EncoderProfileEnum,
+    FfmpegInput,
+    MediaClip,
+    TransitionTypeEnum,
+    VisionDataTypeEnum,
+)
+from utils.media_index import MediaIndex
+from utils.profiling import profiler
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
+
+
+class FfmpegRenderer:
+    """
+    Renders a parsed config with one ffmpeg ``-filter_complex`` invocation.
+
+    Trimming, scale+pad to the reel resolution, transitions and concatenation all
+    run inside ffmpeg, so no frame is decoded into Python.
+    """
+
+    OUTPUT_RESOLUTION = (1080, 1920)
+    OUTPUT_FPS = 30
+    TRANSITION_DURATION = 1  # seconds
+    AUDIO_SAMPLE_RATE = 44100
+    # xfade equivalents of the overlapping transitions. xfade has no spin, the
+    # rotating "radial" wipe is the closest match.
+    XFADE_TRANSITIONS = {
+        TransitionTypeEnum.SLIDE: "slideleft",
+        TransitionTypeEnum.ZOOM: "zoomin",
+        TransitionTypeEnum.SPIN: "radial",
+    }
+
+    def __init__(self, media_index=None):
+        self.media_index = media_index or MediaIndex()
+        self.logger = logging.getLogger(__name__)
+
+    @profiler.timed()
+    def load_inputs(
+        self, config: dict[str, MediaClip], media_dir, max_duration
+    ) -> list[FfmpegInput]:
+        inputs = []
+        total_duration = 0
+        media = self.media_index.probe_all(
+            os.path.join(media_dir, filename)
+            for filename, entry in config.items()
+            if entry.type == VisionDataTypeEnum.VIDEO
+        )
+        for filename, entry in config.items():
+            try:
+                path = os.path.join(media_dir, filename)
+                end = entry.end
+                has_audio = False
+                if entry.type == VisionDataTypeEnum.VIDEO:
+                    info = media.get(os.path.abspath(path))
+                    if info is None or info.duration is None:
+                        raise ValueError(f"Could not probe video: {path}")
+                    clip_duration, has_audio = info.duration, info.has_audio
+                    if end > clip_duration:
+                        self.logger.warning(
+                            f"End time {end}s exceeds video duration {clip_duration:.2f}s for file: {filename}",
+                        )
+                        end = clip_duration
+                elif entry.type != VisionDataTypeEnum.PHOTO:
+                    raise ValueError(f"Unsupported media type: {entry.type}")
+
+                duration = end - entry.start
+                if total_duration + duration > max_duration:
+                    self.logger.info(f"Skipping {filename}, would exceed max duration.")
+                    continue
+
+                inputs.append(FfmpegInput(path, entry, duration, has_audio))
+                total_duration += duration
+            except Exception as e:
+                self.logger.info(f"Error processing {filename}: {e}")
+        return inputs
+
+    def input_args(self, item: FfmpegInput) -> list[str]:
+        duration = f"{item.duration:.3f}"
+        if item.entry.type == VisionDataTypeEnum.PHOTO:
+            framerate = str(self.OUTPUT_FPS)
+            return [
+                "-loop",
+                "1",
+                "-framerate",
+                framerate,
+                "-t",
+                duration,
+                "-i",
+                item.path,
+            ]
+        return ["-ss", f"{item.entry.start:.3f}", "-t", duration, "-i", item.path]
+
+    def plan_transitions(self, inputs: list[FfmpegInput]):
+        """
+        Return per-input (fade_in, fade_out, overlap_with_next) durations.
+
+        Mirrors TimelineCompositor: overlapping transitions never consume more of
+        a clip than what is left after its head, fades keep clip lengths.
+        """
+        plan = []
+        head_overlap = 0
+        fade_in = 0
+        for i, item in enumerate(inputs):
+            next_item = inputs[i + 1] if i + 1 < len(inputs) else None
+            transition = item.entry.transition if next_item is not None else None
+            available = item.duration - head_overlap - fade_in
+
+            overlap = 0
+            fade_out = 0
+            if transition in self.XFADE_TRANSITIONS:
+                overlap = max(
+                    0, min(self.TRANSITION_DURATION, available, next_item.duration)
+                )
+            elif transition == TransitionTypeEnum.FADE:
+                fade_out = max(0, min(self.TRANSITION_DURATION, available))
+
+            plan.append((fade_in, fade_out, overlap))
+            head_overlap = overlap
+            fade_in = 0
+            if transition == TransitionTypeEnum.FADE:
+                fade_in = max(0, min(self.TRANSITION_DURATION, next_item.duration))
+        return plan
+
+    def build_filter_graph(self, inputs: list[FfmpegInput]) -> tuple[str, str, str]:
+        """Return the filtergraph and the labels of its video and audio outputs."""
+        w, h = self.OUTPUT_RESOLUTION
+        plan = self.plan_transitions(inputs)
+        filters = []
+
+        for i, (item, (fade_in, fade_out, _)) in enumerate(zip(inputs, plan)):
+            duration = f"{item.duration:.3f}"
+            # fps comes after trim, which drops the frame rate xfade requires.
+            video = (
+                f"[{i}:v]trim=duration={duration},setpts=PTS-STARTPTS,"
+                f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+                f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2:color=black,setsar=1,"
+                f"fps={self.OUTPUT_FPS},format=yuv420p"
+            )
+            if fade_in:
+                video += f",fade=t=in:st=0:d={fade_in:.3f}"
+            if fade_out:
+                video += (
+                    f",fade=t=out:st={item.duration - fade_out:.3f}:d={fade_out:.3f}"
+                )
+            filters.append(f"{video},settb=AVTB[v{i}]")
+
+            audio_format = (
+                f"aformat=sample_rates={self.AUDIO_SAMPLE_RATE}:channel_layouts=stereo"
+            )
+            if item.has_audio:
+                filters.append(
+                    f"[{i}:a]{audio_format},apad,atrim=duration={duration},"
+                    f"asetpts=PTS-STARTPTS[a{i}]"
+                )
+            else:
+                filters.append(
+                    f"anullsrc=r={self.AUDIO_SAMPLE_RATE}:cl=stereo,"
+                    f"atrim=duration={duration}[a{i}]"
+                )
+
+        video_label, audio_label = "v0", "a0"
+        length = inputs[0].duration
+        for i in range(1, len(inputs)):
+            overlap = plan[i - 1][2]
+            joined_video, joined_audio = f"vj{i}", f"aj{i}"
+            if overlap:
+                xfade = self.XFADE_TRANSITIONS[inputs[i - 1].entry.transition]
+                filters.append(
+                    f"[{video_label}][v{i}]xfade=transition={xfade}:"
+                    f"duration={overlap:.3f}:offset={length - overlap:.3f}"
+                    f"[{joined_video}]"
+                )
+                filters.append(
+                    f"[{audio_label}][a{i}]acrossfade=d={overlap:.3f}[{joined_audio}]"
+                )
+            else:
+                # concat drops the frame rate that a following xfade requires.
+                filters.append(
+                    f"[{video_label}][{audio_label}][v{i}][a{i}]"
+                    f"concat=n=2:v=1:a=1[vc{i}][{joined_audio}]"
+                )
+                filters.append(
+                    f"[vc{i}]fps={self.OUTPUT_FPS},settb=AVTB[{joined_video}]"
+                )
+            length += inputs[i].duration - overlap
+            video_label, audio_label = joined_video, joined_audio
+
+        return ";".join(filters), video_label, audio_label
+
+    def build_command(
+        self, inputs: list[FfmpegInput], output_path, profile: EncoderProfile = None
+    ) -> list[str]:
+        profile = profile or resolve_profile(EncoderProfileEnum.PUBLISH, hardware=False)
+        cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-stats", "-y"]
+        for item in inputs:
+            cmd += self.input_args(item)
+
+        graph, video_label, audio_label = self.build_filter_graph(inputs)
+        cmd += [
+            "-filter_complex",
+            graph,
+            "-map",
+            f"[{video_label}]",
+            "-map",
+            f"[{audio_label}]",
+            *profile.ffmpeg_args(),
+            "-pix_fmt",
+            "yuv420p",
+            "-r",
+            str(self.OUTPUT_FPS),
+            output_path,
+        ]
+        return cmd
+
+    def render(
+        self,
+        config: dict[str, MediaClip],
+        media_dir,
+        output_path,
+        max_duration,
+        encoder_profile=EncoderProfileEnum.PUBLISH,
+    ):
+        inputs = self.load_inputs(config, media_dir, max_duration)
+        if not inputs:
+            self.logger.info("No valid clips to process.")
+            return
+
+        cmd = self.build_command(inputs, output_path, resolve_profile(encoder_profile))
+        self.logger.info(
+            f"Rendering {len(inputs)} clips with a single ffmpeg filtergraph."
+        )
+        with profiler.span("ffmpeg_render", clips=len(inputs)):
+            subprocess.run(cmd, check=True)
+        self.logger.info(f"Reel written to: {output_path}")
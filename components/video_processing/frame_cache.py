@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.profiling import profiler
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
+
+
+class FrameCache:
+    """
+    Recently fitted frames of one render, keyed by ``(clip id, frame index)``.
+
+    Only clips that show the same source frame on consecutive output frames
+    are worth caching: stills, and sources slower than the output frame rate.
+    Those only ever revisit their latest frame, so the budget is a handful of
+    frames. Frames are copied on insert and handed out read-only; the least
+    recently used ones are dropped once the cache holds more than ``max_bytes``.
+    """
+
+    MAX_BYTES = 64 * 1024**2  # about 10 frames at 1080x1920
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.frames = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def frame_index(t, fps):
+        """Index of the source frame shown at ``t``, as MoviePy's reader picks it."""
+        return int(fps * t + 0.00001)
+
+    @staticmethod
+    def repeats_frames(source_fps, output_fps):
+        """Whether a clip shows source frames more than once, None is a still."""
+        return source_fps is None or source_fps < output_fps
+
+    def get(self, key, produce):
+        """Return the frame for ``key``, calling ``produce()`` on a miss."""
+        with self.lock:
+            frame = self.frames.get(key)
+            if frame is not None:
+                self.frames.move_to_end(key)
+                self.hits += 1
+                profiler.count("frame_cache.hits")
+                return frame
+
+        frame = np.array(produce(), copy=True)
+        frame.flags.writeable = False
+        with self.lock:
+            self.misses += 1
+            profiler.count("frame_cache.misses")
+            if key not in self.frames:
+                self.frames[key] = frame
+                self.bytes += frame.nbytes
+            # The newest frame stays even if it alone exceeds the budget.
+            while self.bytes > self.max_bytes and len(self.frames) > 1:
+                _, evicted = self.frames.popitem(last=False)
+                self.bytes -= evicted.nbytes
+        return frame
+
+    def clear(self):
+        with self.lock:
+            self.frames.clear()
+            self.bytes = 0
+
+    def log_stats(self):
+        total = self.hits + self.misses
+        if total:
+            self.logger.info(
+                f"Frame cache: {self.hits}/{total} frames reused, "
+                f"{self.bytes / 1024**2:.0f} MB held."
+            )
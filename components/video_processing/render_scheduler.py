@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from functools import partial
+
+from utils.data_structures import PreviewJob, PreviewProgress
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
+
+
+MEMINFO_PATH = "/proc/meminfo"
+
+
+def _meminfo_available(path=MEMINFO_PATH):
+    """MemAvailable from ``/proc/meminfo`` in bytes, None where it is missing."""
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024  # reported in kB
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def available_memory():
+    """
+    Memory the system can give out without swapping, in bytes, or None where
+    it is not reported.
+
+    This counts reclaimable page cache, unlike free memory, which shrinks to
+    almost nothing once a few video files have been read.
+    """
+    memory = _meminfo_available()
+    if memory is not None:
+        return memory
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        return psutil.virtual_memory().available
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _timed(render, job):
+    start = time.perf_counter()
+    result = render(job)
+    return result, time.perf_counter() - start
+
+
+class RenderScheduler:
+    """
+    Runs render jobs on a bounded process pool.
+
+    The pool is sized from the cores and the available memory, and the cores are
+    split between workers: every job's encoder gets ``threads_per_worker``
+    threads instead of each asking for the whole machine. ``cpu_budget`` and
+    ``memory_budget`` (bytes) cap what the pool may use of the machine.
+    """
+
+    # Rough peak of one worker: MoviePy, decoded frames and an ffmpeg encoder.
+    MEMORY_PER_WORKER = 1024**3
+    MIN_THREADS_PER_WORKER = 2
+
+    def __init__(
+        self,
+        max_workers=None,
+        progress_callback: Callable[[PreviewProgress], None] = None,
+        cpu_budget=None,
+        memory_budget=None,
+        memory_per_worker=MEMORY_PER_WORKER,
+    ):
+        self.max_workers = max_workers
+        self.progress_callback = progress_callback
+        self.cpu_budget = cpu_budget
+        self.memory_budget = memory_budget
+        self.memory_per_worker = memory_per_worker
+        self.logger = logging.getLogger(__name__)
+
+    def cpus(self):
+        return self.cpu_budget or os.cpu_count() or 1
+
+    def memory(self):
+        memory = available_memory()
+        if self.memory_budget is None:
+            return memory
+        return self.memory_budget if memory is None else min(memory, self.memory_budget)
+
+    def worker_count(self, job_count):
+        workers = self.max_workers or max(1, self.cpus() // self.MIN_THREADS_PER_WORKER)
+        memory = self.memory()
+        if memory is not None:
+            workers = min(workers, max(1, memory // self.memory_per_worker))
+        return max(1, min(workers, job_count))
+
+    def threads_per_worker(self, workers):
+        return max(1, self.cpus() // workers)
+
+    def run(self, render: Callable, jobs: list[PreviewJob]) -> list[PreviewProgress]:
+        """
+        Call ``render(job)`` for every job and return one PreviewProgress per
+        job in completion order. ``render`` must be picklable and return the
+        rendered duration. Failures are reported, not raised.
+        """
+        if not jobs:
+            return []
+        workers = self.worker_count(len(jobs))
+        threads = self.threads_per_worker(workers)
+        jobs = [
+            replace(job, profile=replace(job.profile, threads=threads)) for job in jobs
+        ]
+        self.logger.info(
+            f"Rendering {len(jobs)} clips on {workers} workers, {threads} threads each."
+        )
+
+        if workers == 1:
+            return [
+                self._report(job, partial(_timed, render, job), i, len(jobs))
+                for i, job in enumerate(jobs, 1)
+            ]
+
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            futures = {pool.submit(_timed, render, job): job for job in jobs}
+            return [
+                self._report(futures[future], future.result, i, len(jobs))
+                for i, future in enumerate(as_completed(futures), 1)
+            ]
+
+    def _report(self, job, result, completed, total):
+        try:
+            duration, elapsed = result()
+            progress = PreviewProgress(job, completed, total, elapsed, duration)
+        except Exception as e:
+            self.logger.error(f"Failed to render {job.filename}: {e}")
+            progress = PreviewProgress(job, completed, total, error=e)
+        if self.progress_callback is not None:
+            self.progress_callback(progress)
+        return progress
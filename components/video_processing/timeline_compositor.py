@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import logging
+from bisect import bisect_right
+
+from moviepy.audio.AudioClip import CompositeAudioClip
+from moviepy.video.VideoClip import VideoClip
+
+from components.video_processing.transition_kernels import FrameBuffers
+from components.video_processing.video_transitions import VideoTransitions
+from utils.data_structures import LoadedVideo, TimelineSegment, TransitionTypeEnum
+from utils.profiling import profiler
+
+
+class TimelineClip(VideoClip):
+    """
+    Plays a flat list of contiguous timeline segments.
+
+    Every output frame is produced by exactly one segment, so each frame of the
+    reel is rendered once no matter how many clips and transitions it has.
+    Transition frames are written into one output buffer owned by the clip.
+    """
+
+    def __init__(self, segments: list[TimelineSegment], fps=30, audio=None):
+        self.segments = segments
+        self.segment_starts = [segment.start for segment in segments]
+        self.buffers = FrameBuffers()
+        super().__init__(
+            make_frame=self.make_timeline_frame,
+            duration=segments[-1].end,
+        )
+        self.fps = fps
+        self.audio = audio
+
+    def make_timeline_frame(self, t):
+        index = max(0, bisect_right(self.segment_starts, t) - 1)
+        segment = self.segments[index]
+        local_t = min(t - segment.start, segment.duration)
+        frame = segment.clip.get_frame(segment.offset + local_t)
+        if profiler.enabled:
+            profiler.count(f"frames.{segment.label}")
+        if segment.effect is None:
+            return frame
+
+        progress = local_t / segment.duration
+        out = self.buffers.get("out", frame.shape)
+        if segment.next_clip is None:
+            return segment.effect(frame, progress, out)
+        next_frame = segment.next_clip.get_frame(segment.next_offset + local_t)
+        return segment.effect(frame, next_frame, progress, out)
+
+
+class TimelineCompositor:
+    def __init__(self, video_transitions: VideoTransitions = None):
+        self.logger = logging.getLogger(__name__)
+        self.video_transitions = video_transitions or VideoTransitions()
+
+    def build_segments(
+        self, clips: list[LoadedVideo], duration=1, fps=30
+    ) -> tuple[list[TimelineSegment], list[float]]:
+        """
+        Lay the clips out as untouched bodies plus short transition segments.
+
+        Returns the segments and the timeline position of every clip.
+        """
+        segments = []
+        positions = []
+        position = 0
+        head_overlap = 0  # head of the clip already covered by a transition
+        fade_in = 0
+
+        for i, loaded in enumerate(clips):
+            clip = loaded.clip
+            clip_duration = clip.duration
+            next_clip = clips[i + 1].clip if i + 1 < len(clips) else None
+            transition = loaded.transition if next_clip is not None else None
+            available = clip_duration - head_overlap - fade_in
+
+            tail_overlap = 0
+            fade_out = 0
+            if transition in self.video_transitions.blends:
+                tail_overlap = max(0, min(duration, available, next_clip.duration))
+            elif transition == TransitionTypeEnum.FADE:
+                fade_out = max(0, min(duration, available))
+
+            positions.append(position)
+            body_start = head_overlap
+            if fade_in:
+                segments.append(
+                    TimelineSegment(
+                        start=position + body_start,
+                        end=position + body_start + fade_in,
+                        clip=clip,
+                        offset=body_start,
+                        effect=self.video_transitions.fade_in_frame,
+                        label=f"fade_in:clip{i}",
+                    )
+                )
+                body_start += fade_in
+
+            body_end = clip_duration - tail_overlap - fade_out
+            if body_end > body_start:
+                segments.append(
+                    TimelineSegment(
+                        start=position + body_start,
+                        end=position + body_end,
+                        clip=clip,
+                        offset=body_start,
+                        label=f"clip{i}",
+                    )
+                )
+
+            if fade_out:
+                segments.append(
+                    TimelineSegment(
+                        start=position + body_end,
+                        end=position + clip_duration,
+                        clip=clip,
+                        offset=body_end,
+                        effect=self.video_transitions.fade_out_frame,
+                        label=f"fade_out:clip{i}",
+                    )
+                )
+
+            if tail_overlap:
+                segments.append(
+                    TimelineSegment(
+                        start=position + body_end,
+                        end=position + clip_duration,
+                        clip=clip,
+                        offset=body_end,
+                        effect=self.video_transitions.blend_for(
+                            transition, tail_overlap, fps
+                        ),
+                        next_clip=next_clip,
+                        label=f"{transition}:clip{i}-clip{i + 1}",
+                    )
+                )
+
+            position += clip_duration - tail_overlap
+            head_overlap = tail_overlap
+            fade_in = 0
+            if transition == TransitionTypeEnum.FADE:
+                fade_in = max(0, min(duration, next_clip.duration))
+
+        return segments, positions
+
+    def compose(self, clips: list[LoadedVideo], duration=1, fps=30) -> TimelineClip:
+        segments, positions = self.build_segments(clips, duration, fps)
+        self.logger.info(
+            f"Composing {len(clips)} clips into {len(segments)} timeline segments."
+        )
+
+        audio = [
+            loaded.clip.audio.set_start(position)
+            for loaded, position in zip(clips, positions)
+            if loaded.clip.audio is not None
+        ]
+        audio = (
+            CompositeAudioClip(audio).set_duration(segments[-1].end) if audio else None
+        )
+        return TimelineClip(segments, fps=fps, audio=audio)
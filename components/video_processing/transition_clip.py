@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import cv2
+from moviepy.audio.AudioClip import CompositeAudioClip
+from moviepy.video.VideoClip import VideoClip
+
+from components.video_processing.transition_kernels import FrameBuffers
+
+
+class TransitionClip(VideoClip):
+    """
+    Lazily joins two clips with an overlapping transition.
+
+    Frames outside the overlap are read straight from the source clips, only the
+    ``duration * fps`` overlap frames go through
+    ``blend(frame1, frame2, progress, out)``. Blended frames are written into a
+    single output buffer owned by the clip, so a returned overlap frame is only
+    valid until the next ``make_frame`` call.
+    """
+
+    def __init__(self, clip1, clip2, blend, duration, fps=30):
+        self.clip1 = clip1
+        self.clip2 = clip2
+        self.blend = blend
+        self.overlap = max(0, min(duration, clip1.duration, clip2.duration))
+        self.overlap_start = clip1.duration - self.overlap
+        self.buffers = FrameBuffers()
+
+        super().__init__(
+            make_frame=self.make_transition_frame,
+            duration=self.overlap_start + clip2.duration,
+        )
+        self.fps = fps
+
+        audio = [
+            clip.audio.set_start(start)
+            for clip, start in ((clip1, 0), (clip2, self.overlap_start))
+            if clip.audio is not None
+        ]
+        if audio:
+            self.audio = CompositeAudioClip(audio).set_duration(self.duration)
+
+    def _match_size(self, frame):
+        w, h = self.clip1.size
+        if frame.shape[1] != w or frame.shape[0] != h:
+            return cv2.resize(frame, (w, h))
+        return frame
+
+    def make_transition_frame(self, t):
+        if t < self.overlap_start:
+            return self.clip1.get_frame(t)
+
+        frame2 = self._match_size(self.clip2.get_frame(t - self.overlap_start))
+        if t >= self.clip1.duration or self.overlap == 0:
+            return frame2
+
+        progress = (t - self.overlap_start) / self.overlap
+        frame1 = self.clip1.get_frame(t)
+        out = self.buffers.get("out", frame1.shape)
+        return self.blend(frame1, frame2, progress, out)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import threading
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+
+class FrameBuffers(threading.local):
+    """
+    Per-thread pool of preallocated frame buffers.
+
+    Buffers are looked up by name and reallocated only when the requested shape
+    or dtype changes, so a transition reuses the same memory for every frame.
+    """
+
+    def __init__(self):
+        self.buffers = {}
+
+    def get(self, name, shape, dtype=np.uint8, fill=None):
+        """The ``name`` buffer, a new one is filled with ``fill`` if given."""
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            if fill is not None:
+                buffer.fill(fill)
+            self.buffers[name] = buffer
+        return buffer
+
+
+def blend(frame1, frame2, alpha, out):
+    """Write ``frame1 * (1 - alpha) + frame2 * alpha`` into ``out``."""
+    return cv2.addWeighted(frame1, 1 - alpha, frame2, alpha, 0, dst=out)
+
+
+def scale(frame, factor, out):
+    """Write ``frame * factor`` into ``out`` (saturated to uint8)."""
+    return cv2.convertScaleAbs(frame, dst=out, alpha=factor)
+
+
+def slide(frame1, frame2, progress, blend_width, out):
+    """
+    Slide frame1 out to the left while frame2 slides in from the right.
+
+    The seam is blended with a single broadcast alpha ramp of ``blend_width``
+    columns instead of one Python iteration per column.
+    """
+    w = frame1.shape[1]
+    x_offset = int(w * (1 - progress))
+    left_end = max(0, x_offset - blend_width)
+    right_start = min(w, x_offset + blend_width)
+
+    # Slide clip1 out left
+    out[:, :left_end] = frame1[:, w - left_end :]
+    # Slide clip2 in right
+    out[:, right_start:] = frame2[:, : w - right_start]
+    out[:, left_end:right_start] = 0
+
+    if blend_width and 0 < x_offset < w:
+        # Seam column i blends frame1[:, w - x_offset + i] with
+        # frame2[:, x_offset - blend_width + i]; keep the columns inside both.
+        first = max(0, blend_width - x_offset)
+        last = min(blend_width, x_offset)
+        if first < last:
+            ramp = np.arange(first, last, dtype=np.float32) / blend_width
+            ramp = ramp[None, :, None]
+            col1 = w - x_offset
+            col2 = x_offset - blend_width
+            seam = frame1[:, col1 + first : col1 + last] * (1 - ramp)
+            seam += frame2[:, col2 + first : col2 + last] * ramp
+            out[:, col2 + first : col2 + last] = seam
+    return out
+
+
+def _fit_matrix(matrix, src_size, dst_size):
+    """Fold the src_size -> dst_size rescale into an affine matrix."""
+    if src_size == dst_size:
+        return matrix
+    (src_w, src_h), (dst_w, dst_h) = src_size, dst_size
+    return matrix * np.array([[dst_w / src_w], [dst_h / src_h]])
+
+
+def rotation_matrix(src_size, dst_size, angle):
+    """Rotate around the frame center and map the result onto ``dst_size``."""
+    w, h = src_size
+    matrix = cv2.getRotationMatrix2D((w // 2, h // 2), angle, 1.0)
+    return _fit_matrix(matrix, src_size, dst_size)
+
+
+def _zoom_span(src_len, dst_len, scale):
+    """Source and destination ranges of one axis of a centered zoom."""
+    fit = dst_len / src_len
+    src_start = max(0.0, src_len * (scale - 1) / (2 * scale))
+    src_end = min(float(src_len), src_len * (scale + 1) / (2 * scale))
+
+    def to_dst(x):
+        return fit * (scale * x + src_len * (1 - scale) / 2)
+
+    dst_start = round(to_dst(src_start))
+    dst_end = max(dst_start + 1, round(to_dst(src_end)))
+    src_start = int(src_start)
+    src_end = max(src_start + 1, round(src_end))
+    return src_start, src_end, dst_start, min(dst_len, dst_end)
+
+
+def zoom_rect(src_size, dst_size, scale):
+    """
+    Scale around the frame center (crop when > 1, pad when < 1).
+
+    A zoom is axis aligned, so instead of an affine matrix it is described by
+    the source rectangle that stays visible and where it lands in the output:
+    ``(src_x0, src_x1, dst_x0, dst_x1, src_y0, src_y1, dst_y0, dst_y1)``.
+    """
+    return _zoom_span(src_size[0], dst_size[0], scale) + _zoom_span(
+        src_size[1], dst_size[1], scale
+    )
+
+
+def apply_zoom(frame, rect, out):
+    """Resize the visible source rectangle straight into ``out``."""
+    (src_x0, src_x1, dst_x0, dst_x1, src_y0, src_y1, dst_y0, dst_y1) = rect
+    h, w = out.shape[:2]
+    if dst_x0 > 0 or dst_y0 > 0 or dst_x1 < w or dst_y1 < h:
+        out[:dst_y0] = 0
+        out[dst_y1:] = 0
+        out[:, :dst_x0] = 0
+        out[:, dst_x1:] = 0
+    cv2.resize(
+        frame[src_y0:src_y1, src_x0:src_x1],
+        (dst_x1 - dst_x0, dst_y1 - dst_y0),
+        dst=out[dst_y0:dst_y1, dst_x0:dst_x1],
+        interpolation=cv2.INTER_LINEAR,
+    )
+    return out
+
+
+@lru_cache(maxsize=32)
+def rotation_schedule(src_size, dst_size, steps, start_angle, end_angle):
+    """Rotation matrices for every step of a transition, built once per size."""
+    matrices = np.stack(
+        [
+            rotation_matrix(
+                src_size,
+                dst_size,
+                start_angle + (end_angle - start_angle) * i / steps,
+            )
+            for i in range(steps)
+        ]
+    )
+    matrices.setflags(write=False)
+    return matrices
+
+
+@lru_cache(maxsize=32)
+def zoom_schedule(src_size, dst_size, steps, start_scale, end_scale):
+    """Zoom rectangles for every step of a transition, built once per size."""
+    return tuple(
+        zoom_rect(
+            src_size, dst_size, start_scale + (end_scale - start_scale) * i / steps
+        )
+        for i in range(steps)
+    )
+
+
+def schedule_step(progress, steps):
+    return min(steps - 1, max(0, round(progress * steps)))
+
+
+def warp(frame, matrix, out):
+    """Apply one affine warp into ``out``, which also defines the output size."""
+    h, w = out.shape[:2]
+    return cv2.warpAffine(
+        frame,
+        matrix,
+        (w, h),
+        dst=out,
+        flags=cv2.INTER_LINEAR,
+        borderMode=cv2.BORDER_CONSTANT,
+        borderValue=0,
+    )
@@ -1,119 +1,319 @@
+import json
 import logging
 import os
-from tqdm import tqdm
-import threading
+from collections.abc import Callable
+from dataclasses import asdict
 
 # from moviepy.editor import concatenate_videoclips
-from components.video_processing.video_processing_utils import get_codec
-from utils.data_structures import LoadedVideo
-from moviepy.video.VideoClip import ColorClip
-from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
-from moviepy.video.io.VideoFileClip import VideoFileClip
-from components.video_processing.video_transitions import VideoTransitions
+from components.video_processing.encoder_profiles import resolve_profile
+from components.video_processing.render_scheduler import RenderScheduler
+from components.video_processing.video_preprocessing import VideoPreprocessing
+from utils.cache_utils import cache_key, file_identity, write_json_atomic
+from utils.data_structures import (
+    EncoderProfileEnum,
+    FitModeEnum,
+    LoadedVideo,
+    MediaClip,
+    PreviewJob,
+    PreviewProgress,
+    ProxySettings,
+    VisionDataTypeEnum,
+)
+from utils.file_cache import FileCache
+from utils.media_index import MediaIndex
+from utils.profiling import profiler
+from moviepy.video.VideoClip import VideoClip
+from components.video_processing.canvas_fit import CanvasFit
+from components.video_processing.frame_cache import FrameCache
+from components.video_processing.timeline_compositor import (
+    TimelineClip,
+    TimelineCompositor,
+)
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
 
 
 class VideoPostProcessing:
     OUTPUT_FPS = 30
+    OUTPUT_RESOLUTION = (1080, 1920)
     PREVIEW_FOLDER = "preview"
+    PREVIEW_CLIPS_FOLDER = "clips"
+    PREVIEW_MANIFEST = "manifest.json"
+    TRANSITION_DURATION = 1  # seconds
 
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.video_transitions = VideoTransitions()
+        self.timeline_compositor = TimelineCompositor()
+        self.media_index = MediaIndex()
 
     @staticmethod
-    def resize_and_center(clip: LoadedVideo, target_size=(1080, 1920)) -> LoadedVideo:
-        target_w, target_h = target_size
-        clip_w, clip_h = clip.clip.size
-        clip_ar = clip_w / clip_h
-        target_ar = target_w / target_h
-
-        # Determine new size to preserve aspect ratio
-        if clip_ar > target_ar:
-            # Too wide, match width and scale height
-            new_w = target_w
-            new_h = int(target_w / clip_ar)
-        else:
-            # Too tall, match height and scale width
-            new_h = target_h
-            new_w = int(target_h * clip_ar)
-
-        # Now actually resize the clip
-        resized_clip = clip.clip.resize(newsize=(new_w, new_h))
-
-        # Create a background (black)
-        background = ColorClip(
-            size=target_size,
-            color=(
-                0,
-                0,
-                0,
-            ),
-            duration=clip.clip.duration,
+    @profiler.timed("VideoPostProcessing.resize_and_center")
+    def resize_and_center(
+        clip: LoadedVideo,
+        target_size=(1080, 1920),
+        frame_cache: FrameCache = None,
+        fps=None,
+        fit_mode: FitModeEnum = None,
+    ) -> LoadedVideo:
+        """
+        Fit the clip into ``target_size`` as ``fit_mode`` describes, on black
+        bars if None. A clip that already has the target size is returned
+        untouched.
+
+        With a ``frame_cache``, stills and sources slower than the output
+        ``fps`` fit each source frame once instead of once per output frame.
+        """
+        source = clip.clip
+        canvas_fit = CanvasFit(source.size, target_size, fit_mode or FitModeEnum.BLACK)
+        if canvas_fit.passthrough:
+            return clip
+
+        fitted = VideoClip(
+            lambda t: canvas_fit.fit(source.get_frame(t)), duration=source.duration
+        )
+        fitted.fps = source.fps
+        if frame_cache is not None and FrameCache.repeats_frames(clip.fps, fps):
+            fitted = VideoPostProcessing.cache_frames(clip, fitted, frame_cache)
+        clip.clip = fitted.set_audio(source.audio)
+        return clip
+
+    @staticmethod
+    def cache_frames(clip: LoadedVideo, fitted, frame_cache: FrameCache):
+        """``fitted`` with its frames looked up by source frame in ``frame_cache``."""
+        clip_id = id(clip.clip)
+
+        def make_frame(t):
+            index = 0
+            if clip.fps is not None:
+                index = FrameCache.frame_index(clip.source_start + t, clip.fps)
+            return frame_cache.get((clip_id, index), lambda: fitted.get_frame(t))
+
+        cached = VideoClip(make_frame, duration=fitted.duration)
+        cached.fps = fitted.fps
+        return cached
+
+    @profiler.timed()
+    def apply_transitions(self, clips: list[LoadedVideo]) -> TimelineClip:
+        return self.timeline_compositor.compose(
+            clips,
+            duration=self.TRANSITION_DURATION,
+            fps=self.OUTPUT_FPS,
         )
 
-        # Overlay the resized clip in the center of the background
-        composed = CompositeVideoClip(
-            [background, resized_clip.set_position("center")],
-            size=target_size,
+    def preview_cache(self):
+        return FileCache(
+            "preview",
+            extension=".mp4",
+            cache_dir=os.path.join(self.PREVIEW_FOLDER, self.PREVIEW_CLIPS_FOLDER),
         )
-        clip.clip = composed.set_duration(clip.clip.duration).set_audio(
-            resized_clip.audio
+
+    def preview_fingerprint(
+        self,
+        source_path,
+        entry: MediaClip,
+        encoder_profile,
+        proxy=None,
+        fit_mode: FitModeEnum = None,
+    ):
+        """
+        Key of a clip preview: source identity, the entry's trim and resampling,
+        output size and frame rate, fit mode and encoder settings. None if the
+        source is missing. Transitions are not part of per-clip previews.
+        """
+        try:
+            identity = file_identity(source_path)
+        except OSError:
+            return None
+        profile = asdict(resolve_profile(encoder_profile))
+        profile.pop("threads")
+        return cache_key(
+            identity,
+            {k: v for k, v in asdict(entry).items() if k != "transition"},
+            proxy.resolution if proxy else self.OUTPUT_RESOLUTION,
+            proxy.fps if proxy else self.OUTPUT_FPS,
+            profile,
+            fit_mode and FitModeEnum(fit_mode),
         )
-        return clip
 
-    def apply_transitions(self, clips: list[LoadedVideo]) -> VideoFileClip:
-        final_clip = clips[0].clip
-
-        for i in range(1, len(clips)):
-            transition = self.video_transitions.transitions[clips[i - 1].transition]
-            final_clip = transition(final_clip, clips[i].clip, duration=1)
-        return final_clip
-
-    def render_clip(self, index, clip, codec, fps):
-        output_file = os.path.join(self.PREVIEW_FOLDER, f"preview_{index}.mp4")
-        clip.write_videofile(
-            output_file,
-            codec=codec,
-            audio_codec="aac",
-            threads=max(1, os.cpu_count() - 2),
-            fps=fps,
-            logger=None,  # bar
+    def rendered_previews(self, fingerprints) -> dict[str, float]:
+        """Return ``{fingerprint: duration}`` of already rendered previews."""
+        entries = self.preview_cache().entries()
+        return {
+            fingerprint: entries[fingerprint]["duration"]
+            for fingerprint in fingerprints
+            if fingerprint in entries and "duration" in entries[fingerprint]
+        }
+
+    def expected_duration(self, source_path, entry: MediaClip):
+        """Trimmed length of an entry without loading it."""
+        end = entry.end
+        if entry.type == VisionDataTypeEnum.VIDEO:
+            info = self.media_index.probe(source_path)
+            if info is not None and info.duration is not None:
+                end = min(end, info.duration)
+        return max(0, end - entry.start)
+
+    @staticmethod
+    def render_preview(job: PreviewJob):
+        """Load, fit and encode one clip preview. Runs in a worker process."""
+        preprocessing = VideoPreprocessing(job.proxy, job.fit_mode)
+        loaded = preprocessing.process_entry(job.filename, job.entry, job.media_dir)
+        resolution = (
+            job.proxy.resolution if job.proxy else VideoPostProcessing.OUTPUT_RESOLUTION
         )
-        clip.close()
+        fps = job.proxy.fps if job.proxy else VideoPostProcessing.OUTPUT_FPS
+        source = loaded.clip
+        clip = VideoPostProcessing.resize_and_center(
+            loaded, resolution, FrameCache(), fps, job.fit_mode
+        ).clip
+        try:
+            clip.write_videofile(
+                job.output_path,
+                fps=fps,
+                logger=None,  # bar
+                **job.profile.moviepy_kwargs(),
+            )
+            return clip.duration
+        finally:
+            clip.close()
+            source.close()
 
-    def preview(self, clips: list[LoadedVideo]):
+    def preview(
+        self,
+        config_file: dict[str, MediaClip],
+        media_dir,
+        max_duration,
+        encoder_profile=EncoderProfileEnum.PREVIEW,
+        proxy: ProxySettings = None,
+        workers=None,
+        progress_callback: Callable[[PreviewProgress], None] = None,
+        fit_mode: FitModeEnum = None,
+    ):
+        """
+        Render one preview file per entry, at the proxy size and frame rate if
+        given.
+
+        Previews are keyed by preview_fingerprint and only missing ones are
+        rendered, on a RenderScheduler pool. The manifest lists the previews in
+        timeline order, previews no longer on the timeline are deleted.
+        """
         os.makedirs(self.PREVIEW_FOLDER, exist_ok=True)
-        codec = get_codec()
-        threads = []
-
-        for index, c in enumerate(clips, 1):
-            resized_clip = self.resize_and_center(c).clip
-            thread = threading.Thread(
-                target=self.render_clip,
-                args=(index, resized_clip, codec, self.OUTPUT_FPS),
+        cache = self.preview_cache()
+        profile = resolve_profile(encoder_profile)
+        paths = {
+            filename: os.path.join(media_dir, filename) for filename in config_file
+        }
+        fingerprints = {
+            filename: self.preview_fingerprint(
+                paths[filename], entry, encoder_profile, proxy, fit_mode
             )
-            thread.start()
-            threads.append(thread)
+            for filename, entry in config_file.items()
+        }
+        rendered = self.rendered_previews(fingerprints.values())
+
+        jobs = []
+        timeline = []  # fingerprints in timeline order
+        total_duration = 0
+        for filename, entry in config_file.items():
+            fingerprint = fingerprints[filename]
+            if fingerprint is None:
+                self.logger.info(f"Error processing {filename}: file not found")
+                continue
+            duration = rendered.get(fingerprint)
+            if duration is None:
+                duration = self.expected_duration(paths[filename], entry)
+            if total_duration + duration > max_duration:
+                self.logger.info(f"Skipping {filename}, would exceed max duration.")
+                continue
+
+            if fingerprint not in rendered:
+                jobs.append(
+                    PreviewJob(
+                        key=fingerprint,
+                        filename=filename,
+                        entry=entry,
+                        media_dir=media_dir,
+                        output_path=cache.partial_path_for(fingerprint),
+                        profile=profile,
+                        proxy=proxy,
+                        fit_mode=fit_mode,
+                    )
+                )
+            timeline.append(fingerprint)
+            total_duration += duration
+
+        self.logger.info(
+            f"Reusing {len(timeline) - len(jobs)} of {len(timeline)} previews."
+        )
+        scheduler = RenderScheduler(workers, progress_callback)
+        with profiler.span("VideoPostProcessing.render_previews", clips=len(jobs)):
+            results = scheduler.run(self.render_preview, jobs)
+        if jobs:
+            # Workers leave the CFR and stills caches alone, trim them here.
+            VideoPreprocessing(proxy, fit_mode).cleanup_temp_files()
+        for progress in results:
+            if progress.error is None:
+                cache.put(
+                    progress.job.key,
+                    progress.job.output_path,
+                    duration=progress.duration,
+                )
+                self.logger.info(
+                    f"Preview {progress.completed}/{progress.total} ready: "
+                    f"{progress.job.filename} in {progress.elapsed:.1f}s"
+                )
+            else:
+                timeline.remove(progress.job.key)
 
-        # Optional: Wait for all threads to finish
-        for thread in tqdm(threads, desc="Rendering previews"):
-            thread.join()
+        write_json_atomic(
+            os.path.join(self.PREVIEW_FOLDER, self.PREVIEW_MANIFEST),
+            [
+                os.path.relpath(cache.path_for(fingerprint), self.PREVIEW_FOLDER)
+                for fingerprint in timeline
+            ],
+        )
+        for key in set(cache.entries()) - set(timeline):
+            cache.remove(key)
+
+    @classmethod
+    def preview_files(cls, preview_folder=PREVIEW_FOLDER):
+        """Preview files in timeline order, as listed by the manifest."""
+        try:
+            with open(os.path.join(preview_folder, cls.PREVIEW_MANIFEST)) as f:
+                names = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+        paths = [os.path.join(preview_folder, name) for name in names]
+        return [path for path in paths if os.path.exists(path)]
 
-    def final_render(self, output_path: str, clips: list[LoadedVideo]):
-        resized_clips_list = [self.resize_and_center(c) for c in clips]
+    def final_render(
+        self,
+        output_path: str,
+        clips: list[LoadedVideo],
+        encoder_profile=EncoderProfileEnum.PUBLISH,
+        fit_mode: FitModeEnum = None,
+    ):
+        sources = [c.clip for c in clips]
+        frame_cache = FrameCache()
+        resized_clips_list = [
+            self.resize_and_center(
+                c, self.OUTPUT_RESOLUTION, frame_cache, self.OUTPUT_FPS, fit_mode
+            )
+            for c in clips
+        ]
         final_clip = self.apply_transitions(resized_clips_list)
         # final_clip = concatenate_videoclips(final_clips, method="compose")
-        final_clip.write_videofile(
-            output_path,
-            codec=get_codec(),
-            audio_codec="aac",
-            threads=os.cpu_count() - 2,
-            fps=self.OUTPUT_FPS,
-        )
+        # Decoding, compositing and transitions all run inside this call.
+        with profiler.span("write_videofile", output=output_path):
+            final_clip.write_videofile(
+                output_path,
+                fps=self.OUTPUT_FPS,
+                **resolve_profile(encoder_profile).moviepy_kwargs(),
+            )
+
+        frame_cache.log_stats()
 
         # Close all clips to release resources
         final_clip.close()
-        for clip in clips:
-            clip.clip.close()
+        for source in sources:
+            source.close()
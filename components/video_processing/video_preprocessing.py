@@ -1,16 +1,29 @@
 import os
 import logging
+import math
+import multiprocessing
 import subprocess
-import tempfile
-from utils.data_structures import VisionDataTypeEnum, MediaClip, LoadedVideo
-from sympy import floor
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from utils.data_structures import (
+    FitModeEnum,
+    VisionDataTypeEnum,
+    MediaClip,
+    LoadedVideo,
+    ProxySettings,
+)
 
+import numpy as np
 from moviepy.editor import (
     ImageClip,
     VideoFileClip,
 )
 
-from components.video_processing.video_processing_utils import format_photo_to_vertical
+from components.video_processing.video_processing_utils import save_photo_to_vertical
+from utils.cache_utils import cache_key, file_identity
+from utils.file_cache import FileCache
+from utils.media_index import MediaIndex
+from utils.profiling import profiler
 
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
@@ -20,113 +33,289 @@ class VideoPreprocessing:
     INSTAGRAM_RESOLUTION = (1080, 1920)
     INSTAGRAM_FPS = 30
 
-    def __init__(self):
-        self.cfr_cache = {}  # {original_path: converted_path}
-        self.temp_cfr_files = []  # For cleanup
+    CFR_CACHE_MAX_BYTES = 20 * 1024**3
+    CFR_TRIM_MARGIN = 1.0  # seconds kept around the used range
+    # x264 already uses every core, a few conversions at once saturate the CPU
+    CFR_MAX_CONVERSIONS = max(1, (os.cpu_count() or 1) // 4)
+    CFR_ENCODE_ARGS = [
+        "-vsync",
+        "cfr",
+        "-pix_fmt",
+        "yuv420p",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "slow",
+        "-crf",
+        "18",
+        "-c:a",
+        "aac",
+        "-b:a",
+        "192k",
+    ]
+    # Previews convert straight to the proxy size with a fast encode.
+    PROXY_CFR_ENCODE_ARGS = [
+        "-vsync",
+        "cfr",
+        "-pix_fmt",
+        "yuv420p",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "veryfast",
+        "-crf",
+        "23",
+        "-c:a",
+        "aac",
+        "-b:a",
+        "128k",
+    ]
+    STILLS_CACHE_MAX_BYTES = 2 * 1024**3
+
+    def __init__(self, proxy: ProxySettings = None, fit_mode: FitModeEnum = None):
+        # Previews decode and format media at the proxy size and frame rate.
+        self.proxy = proxy
+        # Photos are filled the way the render fits videos, on a blurred
+        # background unless a fit mode is chosen.
+        self.fit_mode = FitModeEnum(fit_mode or FitModeEnum.BLUR)
+        self.output_resolution = (
+            proxy.resolution if proxy else self.INSTAGRAM_RESOLUTION
+        )
+        self.output_fps = proxy.fps if proxy else self.INSTAGRAM_FPS
+        # Persistent across runs, keyed by source identity + conversion params.
+        self.cfr_cache = FileCache(
+            "cfr", extension=".mp4", max_bytes=self.CFR_CACHE_MAX_BYTES
+        )
+        self.cfr_locks = {}  # {cache_key: Lock}, one conversion per output
+        self.cfr_locks_guard = threading.Lock()
+        self.cfr_slots = threading.BoundedSemaphore(self.CFR_MAX_CONVERSIONS)
+        # Formatted photos as raw arrays, opened memory-mapped.
+        self.stills_cache = FileCache(
+            "stills", extension=".npy", max_bytes=self.STILLS_CACHE_MAX_BYTES
+        )
+        self.photo_pool = None  # set while process_entries runs
+        self.media_index = MediaIndex()
         self.logger = logging.getLogger(__name__)
 
     def cleanup_temp_files(self):
-        for path in self.temp_cfr_files:
+        """Trim the caches to their size caps and drop abandoned partial files."""
+        for name, cache in (("CFR", self.cfr_cache), ("stills", self.stills_cache)):
             try:
-                os.remove(path)
-                self.logger.info(f"Deleted temp CFR file: {path}")
+                cache.evict()
             except Exception as e:
-                self.logger.warning(f"Failed to delete {path}: {e}")
-
-    def convert_to_cfr(self, input_path, target_fps=30):
-        """Convert a VFR video to CFR and return cached path if already done."""
-        if input_path in self.cfr_cache:
-            return self.cfr_cache[input_path]
-
-        # Use temp file with name derived from input for reuse
-        temp_dir = tempfile.gettempdir()
-        base_name = os.path.basename(input_path)
-        name_no_ext = os.path.splitext(base_name)[0]
-        output_path = os.path.join(
-            temp_dir,
-            f"{name_no_ext}_cfr_{target_fps}fps.mp4",
-        )
+                self.logger.warning(f"Failed to prune {name} cache: {e}")
+
+    def cfr_window(self, start, end):
+        """Range of the source to convert for a ``start``..``end`` cut."""
+        window_start = round(max(0, start - self.CFR_TRIM_MARGIN), 3)
+        window_end = None
+        if end is not None:
+            window_end = round(end + self.CFR_TRIM_MARGIN, 3)
+        return window_start, window_end
+
+    @profiler.timed()
+    def convert_to_cfr(self, input_path, target_fps=30, start=0, end=None):
+        """
+        Convert a VFR video to CFR and return cached path if already done.
+
+        Only ``start``..``end`` (plus CFR_TRIM_MARGIN on both sides) is converted.
+        With a proxy the output is scaled into the proxy size, at no more than
+        the proxy frame rate, with a fast encode; it is cached separately from
+        the full-resolution conversion. Returns ``(output_path, offset)`` where
+        ``offset`` is the source time of the output's first frame.
+        """
+        window_start, window_end = self.cfr_window(start, end)
+        args = self.CFR_ENCODE_ARGS
+        if self.proxy is not None:
+            proxy_w, proxy_h = self.proxy.resolution
+            scale = (
+                f"scale={proxy_w}:{proxy_h}:force_original_aspect_ratio=decrease"
+                ":force_divisible_by=2,setsar=1"
+            )
+            args = ["-vf", scale, *self.PROXY_CFR_ENCODE_ARGS]
+            target_fps = min(target_fps, self.proxy.fps)
+        params = {
+            "fps": target_fps,
+            "args": args,
+            "window": [window_start, window_end],
+        }
+        key = cache_key(file_identity(input_path), params)
+        with self.cfr_locks_guard:
+            lock = self.cfr_locks.setdefault(key, threading.Lock())
+        with lock:
+            output_path = self._convert_to_cfr(
+                input_path, target_fps, window_start, window_end, key, params
+            )
+        return output_path, window_start
 
-        if os.path.exists(output_path):
+    def _convert_to_cfr(
+        self, input_path, target_fps, window_start, window_end, key, params
+    ):
+        output_path = self.cfr_cache.get(key)
+        if output_path is not None:
             self.logger.info(f"Using cached CFR file: {output_path}")
-            self.cfr_cache[input_path] = output_path
             return output_path
 
-        cmd = [
-            "ffmpeg",
+        partial_path = self.cfr_cache.partial_path_for(key)
+        # Input seeking jumps to the nearest keyframe before decoding, so a short
+        # cut from a long recording never decodes the rest of the file.
+        cmd = ["ffmpeg", "-ss", f"{window_start:.3f}"]
+        if window_end is not None:
+            cmd += ["-t", f"{window_end - window_start:.3f}"]
+        cmd += [
             "-i",
             input_path,
             "-r",
             str(target_fps),
-            "-vsync",
-            "cfr",
-            "-pix_fmt",
-            "yuv420p",
-            "-c:v",
-            "libx264",
-            "-preset",
-            "slow",
-            "-crf",
-            "18",
-            "-c:a",
-            "aac",
-            "-b:a",
-            "192k",
+            *params["args"],
             "-y",
-            output_path,
+            partial_path,
         ]
-        subprocess.run(
-            cmd,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=True,
+        try:
+            with self.cfr_slots:
+                subprocess.run(
+                    cmd,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    check=True,
+                )
+        except Exception:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+
+        output_path = self.cfr_cache.put(
+            key, partial_path, source=os.path.abspath(input_path), params=params
         )
         self.logger.info(f"Converted to CFR: {output_path}")
-
-        self.cfr_cache[input_path] = output_path
-        self.temp_cfr_files.append(output_path)
         return output_path
 
+    @profiler.timed()
     def is_variable_framerate(self, video_path):
         """
-        Returns a tuple: (is_variable, avg_framerate_float)
+        Returns a tuple: (is_variable, avg_framerate)
         - is_variable: True if variable framerate detected
-        - avg_framerate_float: average framerate as float, or None on failure
+        - avg_framerate: average framerate rounded down, or None on failure
         """
-        cmd = [
-            "ffprobe",
-            "-v",
-            "error",
-            "-select_streams",
-            "v:0",
-            "-show_entries",
-            "stream=r_frame_rate,avg_frame_rate",
-            "-of",
-            "default=noprint_wrappers=1:nokey=1",
-            video_path,
-        ]
-        try:
-            output = (
-                subprocess.check_output(
-                    cmd,
-                    stderr=subprocess.DEVNULL,
-                )
-                .decode()
-                .split()
+        info = self.media_index.probe(video_path)
+        if info is None or info.fps is None:
+            return False, None
+        if info.is_variable_framerate:
+            self.logger.warning(
+                f"Variable frame rate detected in: {video_path}",
+            )
+        return info.is_variable_framerate, math.floor(info.fps)
+
+    @profiler.timed()
+    def format_photo(self, photo_path):
+        """
+        The photo formatted to the output resolution, as a read-only array
+        memory-mapped from the stills cache.
+
+        Stills are keyed by source identity, resolution and fit mode, so a photo
+        is decoded and formatted once across previews and renders. Mapped pages
+        are file-backed and can be dropped by the OS, reels with many photos
+        don't keep every frame resident.
+        """
+        params = {
+            "resolution": list(self.output_resolution),
+            "fit_mode": self.fit_mode,
+        }
+        key = cache_key(file_identity(photo_path), params)
+        path = self.stills_cache.get(key)
+        if path is None:
+            partial_path = self.stills_cache.partial_path_for(key)
+            args = (
+                photo_path,
+                partial_path,
+                self.output_resolution,
+                self.fit_mode,
             )
-            if len(output) >= 2:
-                r_fps = eval(output[0])  # example: '30000/1001'
-                avg_fps = eval(output[1])
-                is_var = not (r_fps == avg_fps)
-                if is_var:
-                    self.logger.warning(
-                        f"Variable frame rate detected in: {video_path}",
+            try:
+                if self.photo_pool is None:
+                    save_photo_to_vertical(*args)
+                else:
+                    # CPU-bound, so it runs in a worker process instead of a thread.
+                    self.photo_pool.submit(save_photo_to_vertical, *args).result()
+            except Exception:
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+                raise
+            path = self.stills_cache.put(
+                key, partial_path, source=os.path.abspath(photo_path), params=params
+            )
+        return np.load(path, mmap_mode="r")
+
+    def proxy_target_resolution(self, video_path):
+        """
+        ``target_resolution`` that makes ffmpeg decode a video already fitted
+        into the proxy size, or None for full resolution.
+        """
+        if self.proxy is None:
+            return None
+        info = self.media_index.probe(video_path)
+        if info is None or not info.width or not info.height:
+            return None
+        width, height = info.width, info.height
+        if info.rotation in (90, 270):
+            width, height = height, width
+        proxy_w, proxy_h = self.proxy.resolution
+        # (height, width) with None keeping the aspect ratio.
+        if width / height > proxy_w / proxy_h:
+            return None, proxy_w
+        return proxy_h, None
+
+    @profiler.timed()
+    def process_entries(
+        self, config_file: dict[str, MediaClip], media_dir, workers=None
+    ) -> list[tuple[str, LoadedVideo, Exception]]:
+        """
+        Run process_entry for every config entry concurrently.
+
+        ffprobe/ffmpeg calls run on a thread pool and photo formatting on a
+        process pool. Results come back in config order as
+        ``(filename, loaded_video, error)``, with exactly one of the last two set.
+        """
+        workers = workers or os.cpu_count() or 1
+        # Probe every video up front in one batch, entries then hit the index.
+        self.media_index.probe_all(
+            os.path.join(media_dir, filename)
+            for filename, entry in config_file.items()
+            if entry.type == VisionDataTypeEnum.VIDEO
+        )
+        if workers == 1:
+            return [
+                self._process_entry_safe(filename, entry, media_dir)
+                for filename, entry in config_file.items()
+            ]
+
+        with (
+            ProcessPoolExecutor(
+                max_workers=workers,
+                # Forking from the entry threads is not safe, start fresh workers.
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as photo_pool,
+            ThreadPoolExecutor(max_workers=workers) as entry_pool,
+        ):
+            self.photo_pool = photo_pool
+            try:
+                futures = [
+                    entry_pool.submit(
+                        self._process_entry_safe, filename, entry, media_dir
                     )
+                    for filename, entry in config_file.items()
+                ]
+                return [future.result() for future in futures]
+            finally:
+                self.photo_pool = None
 
-                return is_var, floor(avg_fps)
+    def _process_entry_safe(self, filename, entry, media_dir):
+        try:
+            with profiler.span("VideoPreprocessing.process_entry", file=filename):
+                loaded_video = self.process_entry(filename, entry, media_dir)
+            return filename, loaded_video, None
         except Exception as e:
-            self.logger.error(f"ffprobe failed on {video_path}: {e}")
-            return False, None
+            return filename, None, e
 
     def process_entry(self, file_path, entry: MediaClip, media_dir) -> LoadedVideo:
         full_path = os.path.join(media_dir, file_path)
@@ -136,29 +325,35 @@ class VideoPreprocessing:
         loaded_video = LoadedVideo(transition=entry.transition)
 
         if media_type == VisionDataTypeEnum.VIDEO.value:
+            # Source time of the first frame of the file that gets opened.
+            offset = 0
             # Detect and convert VFR to CFR
             status, avg_fps = self.is_variable_framerate(full_path)
             if status and entry.video_resampling:
                 self.logger.info(f"Converting {file_path} to CFR.")
-                full_path = self.convert_to_cfr(full_path, avg_fps)
+                full_path, offset = self.convert_to_cfr(full_path, avg_fps, start, end)
 
-            clip = VideoFileClip(full_path)
-            if end > clip.duration:
+            clip = VideoFileClip(
+                full_path,
+                target_resolution=self.proxy_target_resolution(
+                    os.path.join(media_dir, file_path)
+                ),
+            )
+            if end > offset + clip.duration:
                 self.logger.warning(
-                    f"End time {end}s exceeds video duration {clip.duration:.2f}s for file: {file_path}",
+                    f"End time {end}s exceeds video duration {offset + clip.duration:.2f}s for file: {file_path}",
                 )
-                end = clip.duration
-            clip = clip.subclip(start, end)
+                end = offset + clip.duration
+            clip = clip.subclip(start - offset, end - offset)
+            loaded_video.fps = clip.fps
+            loaded_video.source_start = start - offset
 
         elif media_type == VisionDataTypeEnum.PHOTO.value:
             duration = end - start
-            formatted_img = format_photo_to_vertical(
-                full_path,
-                self.INSTAGRAM_RESOLUTION,
-            )
+            formatted_img = self.format_photo(full_path)
             clip = ImageClip(formatted_img).set_duration(duration)
         else:
             raise ValueError(f"Unsupported media type: {media_type}")
 
-        loaded_video.clip = clip.set_duration(end - start).set_fps(self.INSTAGRAM_FPS)
+        loaded_video.clip = clip.set_duration(end - start).set_fps(self.output_fps)
         return loaded_video
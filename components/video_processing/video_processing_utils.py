@@ -6,26 +6,56 @@ import numpy as np
 from PIL import Image
 import subprocess
 
+from components.video_processing.canvas_fit import CanvasFit
+from utils.data_structures import FitModeEnum
 
-def format_photo_to_vertical(photo_path, reel_size=(1080, 1920)):
-    # Load image
-    img = cv2.imread(photo_path)
-    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+# JPEGs are decoded at 1/2, 1/4 or 1/8 size straight from the DCT
+REDUCED_READ_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+}
 
-    # Create blurred background
-    bg = cv2.resize(img_rgb * 0, reel_size)
-    bg = cv2.GaussianBlur(bg, (51, 51), 0)
 
-    # Convert to PIL and resize foreground photo
-    foreground = Image.fromarray(img_rgb)
-    foreground.thumbnail(reel_size, Image.Resampling.LANCZOS)
+def read_photo(photo_path, reel_size=(1080, 1920)):
+    """Decode a photo as BGR, no larger than it needs to be to fit ``reel_size``."""
+    with Image.open(photo_path) as image:
+        width, height = image.size
+    reel_w, reel_h = reel_size
+    # EXIF orientation may swap the sides, so keep enough for either
+    scale = max(
+        min(reel_w / width, reel_h / height), min(reel_w / height, reel_h / width)
+    )
+    flag = cv2.IMREAD_COLOR
+    for factor, reduced_flag in REDUCED_READ_FLAGS.items():
+        if scale * factor <= 1:
+            flag = reduced_flag
+            break
+    img = cv2.imread(photo_path, flag)
+    if img is None:
+        raise ValueError(f"Cannot read photo: {photo_path}")
+    return img
 
-    fg_w, fg_h = foreground.size
-    bg_pil = Image.fromarray(bg)
-    offset = ((reel_size[0] - fg_w) // 2, (reel_size[1] - fg_h) // 2)
-    bg_pil.paste(foreground, offset)
 
-    return np.array(bg_pil)
+def format_photo_to_vertical(
+    photo_path, reel_size=(1080, 1920), fit_mode=FitModeEnum.BLUR
+):
+    """
+    The photo fitted into ``reel_size`` as an RGB array, filled as videos
+    are for the same ``fit_mode``.
+    """
+    img = read_photo(photo_path, reel_size)
+    fitted = CanvasFit(img.shape[1::-1], reel_size, fit_mode).fit(img)
+    # Converting the canvas also copies it out of the reused buffer
+    return cv2.cvtColor(fitted, cv2.COLOR_BGR2RGB)
+
+
+def save_photo_to_vertical(
+    photo_path, output_path, reel_size=(1080, 1920), fit_mode=FitModeEnum.BLUR
+):
+    """Write ``format_photo_to_vertical``'s array to ``output_path`` as ``.npy``."""
+    np.save(output_path, format_photo_to_vertical(photo_path, reel_size, fit_mode))
+    return output_path
 
 
 def has_nvenc_support():
@@ -65,14 +95,3 @@ def has_nvidia_gpu():
     except subprocess.CalledProcessError as e:
         print("❌ 'nvidia-smi' failed to run. Error:\n", e.stderr)
     return False
-
-
-def get_codec():
-    if has_nvenc_support() and has_nvidia_gpu():
-        codec = "h264_nvenc"
-        print("✅ NVENC GPU acceleration is available.")
-    else:
-        codec = "libx264"
-        # codec = "h264_qsv"
-        print("⚠️ Falling back to CPU encoding.")
-    return codec
@@ -1,9 +1,11 @@
+from functools import partial
+
 from moviepy.editor import concatenate_videoclips
 from utils.data_structures import TransitionTypeEnum
-from moviepy.editor import ImageSequenceClip
+from components.video_processing import transition_kernels
+from components.video_processing.transition_clip import TransitionClip
+from components.video_processing.transition_kernels import FrameBuffers
 import numpy as np
-import cv2
-from tqdm import tqdm
 
 
 class VideoTransitions:
@@ -17,231 +19,160 @@ class VideoTransitions:
             TransitionTypeEnum.NONE: self.no_transition,
             TransitionTypeEnum.SPIN: self.spin_transition,
         }
+        # Per-frame blends of the transitions that overlap two clips.
+        self.blends = {
+            TransitionTypeEnum.SLIDE: self.slide_frames,
+            TransitionTypeEnum.ZOOM: self.zoom_frames,
+            TransitionTypeEnum.SPIN: self.spin_frames,
+        }
+        # Scratch buffers reused by the blends, outputs are owned by the caller.
+        self.buffers = FrameBuffers()
 
     @staticmethod
-    def clip_to_frames(clip, fps=FPS):
-        """Render all frames of a clip to a list of numpy arrays (RGB)."""
-        duration = clip.duration
-        frames = []
-        for t in np.arange(0, duration, 1 / fps):
-            frame = clip.get_frame(t)  # returns (H,W,3) RGB numpy array
-            frames.append(frame)
-        return frames
+    def slide_frames(frame1, frame2, progress, out=None, blend_width=0):
+        """Slide frame1 out to the left while frame2 slides in from the right."""
+        if out is None:
+            out = np.empty_like(frame1)
+        return transition_kernels.slide(frame1, frame2, progress, blend_width, out)
 
     def slide_transition(self, clip1, clip2, duration=0.1, fps=30, blend_width=0):
-        # slide direction
-        frames1 = self.clip_to_frames(clip1, fps)
-        frames2 = self.clip_to_frames(clip2, fps)
-
-        w = frames1[0].shape[1]
-        transition_frames = int(duration * fps)
-
-        output_frames = []
-
-        # Write frames1 until transition start
-        output_frames.extend(frames1[:-transition_frames])
-
-        for i in range(transition_frames):
-            progress = i / transition_frames
-            x_offset = int(w * (1 - progress))
-
-            frame1 = frames1[-transition_frames + i]
-            frame2 = frames2[i]
-
-            frame = np.zeros_like(frame1)
-
-            # Slide clip1 out left
-            if x_offset > blend_width:
-                frame[:, : x_offset - blend_width] = frame1[
-                    :, w - x_offset + blend_width : w
-                ]
-
-            # Slide clip2 in right
-            if x_offset + blend_width < w:
-                frame[:, x_offset + blend_width :] = frame2[
-                    :, : w - (x_offset + blend_width)
-                ]
-
-            # Blend seam area with linear alpha
-            if 0 < x_offset < w:
-                for bw in range(blend_width):
-                    alpha = bw / blend_width
-                    col1 = w - x_offset + bw
-                    col2 = x_offset - blend_width + bw
-
-                    if 0 <= col1 < w and 0 <= col2 < w:
-                        # Blend the two columns at seam
-                        frame[:, col2] = (
-                            frame1[:, col1] * (1 - alpha) + frame2[:, col2] * alpha
-                        ).astype(np.uint8)
-
-            output_frames.append(frame)
-
-        # Append remaining frames2 after transition
-        output_frames.extend(frames2[transition_frames:])
-
-        final_clip = ImageSequenceClip(output_frames, fps=fps)
-        return final_clip
+        blend = partial(self.slide_frames, blend_width=blend_width)
+        return TransitionClip(clip1, clip2, blend, duration, fps)
 
     @staticmethod
-    def rotate_frame(frame, angle, output_size):
+    def rotate_frame(frame, angle, output_size, out=None):
         """
-        Rotate a frame around its center and resize/pad/crop to output_size.
+        Rotate a frame around its center and fit it to output_size in one warp.
         """
         h, w = frame.shape[:2]
-        center = (w // 2, h // 2)
-
-        # Rotation matrix
-        M = cv2.getRotationMatrix2D(center, angle, 1.0)
-        rotated = cv2.warpAffine(
-            frame,
-            M,
-            (w, h),
-            flags=cv2.INTER_LINEAR,
-            borderMode=cv2.BORDER_CONSTANT,
-            borderValue=0,
-        )
-
-        # Ensure final size is output_size (crop or pad as needed)
         out_w, out_h = output_size
-        resized = cv2.resize(rotated, (out_w, out_h))
-        return resized
-
-    @staticmethod
-    def frame_generator(clip, fps):
-        t = 0
-        while t < clip.duration:
-            yield clip.get_frame(t)
-            t += 1 / fps
-
-    def spin_transition(self, clip1, clip2, duration=0.1, fps=30):
-        transition_frames = int(duration * fps)
-        output_frames = []
-
-        w, h = clip1.size
-        output_size = (w, h)
-
-        frames1_gen = self.frame_generator(clip1, fps)
-        frames2_gen = self.frame_generator(clip2, fps)
-
-        # Pre-transition frames from clip1
-        for _ in tqdm(
-            range(int(clip1.duration * fps) - transition_frames),
-            desc="Pre-transition in spin transition",
-        ):
-            output_frames.append(next(frames1_gen))
-
-        # Transition frames
-        for i in tqdm(range(transition_frames), desc="Generating spin transition"):
-            progress = i / transition_frames
+        if out is None:
+            out = np.empty((out_h, out_w) + frame.shape[2:], dtype=frame.dtype)
+        matrix = transition_kernels.rotation_matrix((w, h), output_size, angle)
+        return transition_kernels.warp(frame, matrix, out)
 
-            frame1 = next(frames1_gen)
-            frame2 = next(frames2_gen)
+    def _blend_warped(self, warped1, warped2, progress, out):
+        if out is None:
+            out = np.empty_like(warped1)
+        return transition_kernels.blend(warped1, warped2, progress, out)
 
-            angle1 = 360 * progress
-            alpha1 = 1 - progress
-            rotated1 = self.rotate_frame(frame1, angle1, output_size)
-
-            angle2 = -360 + 360 * progress
-            alpha2 = progress
-            rotated2 = self.rotate_frame(frame2, angle2, output_size)
+    def spin_frames(self, frame1, frame2, progress, out=None, steps=None):
+        """
+        Spin frame1 out and frame2 in while cross-fading between them.
 
-            blended = (
-                rotated1.astype(np.float32) * alpha1
-                + rotated2.astype(np.float32) * alpha2
-            ).astype(np.uint8)
-            output_frames.append(blended)
+        With ``steps`` the rotation matrices come from a schedule computed once
+        per (size, steps) instead of being rebuilt for every frame.
+        """
+        size1 = frame1.shape[1::-1]
+        size2 = frame2.shape[1::-1]
+        if steps is None:
+            matrix1 = transition_kernels.rotation_matrix(size1, size1, 360 * progress)
+            matrix2 = transition_kernels.rotation_matrix(
+                size2, size1, -360 + 360 * progress
+            )
+        else:
+            schedule1 = transition_kernels.rotation_schedule(
+                size1, size1, steps, 0, 360
+            )
+            schedule2 = transition_kernels.rotation_schedule(
+                size2, size1, steps, -360, 0
+            )
+            step = transition_kernels.schedule_step(progress, steps)
+            matrix1, matrix2 = schedule1[step], schedule2[step]
 
-        # Post-transition frames from clip2
-        for frame in frames2_gen:
-            frame_resized = cv2.resize(frame, output_size)
-            output_frames.append(frame_resized)
+        warped1 = self.buffers.get("warp1", frame1.shape)
+        warped2 = self.buffers.get("warp2", frame1.shape)
+        transition_kernels.warp(frame1, matrix1, warped1)
+        transition_kernels.warp(frame2, matrix2, warped2)
+        return self._blend_warped(warped1, warped2, progress, out)
 
-        return ImageSequenceClip(output_frames, fps=fps)
+    def spin_transition(self, clip1, clip2, duration=0.1, fps=30):
+        blend = self.blend_for(TransitionTypeEnum.SPIN, duration, fps)
+        return TransitionClip(clip1, clip2, blend, duration, fps)
 
-    def zoom_frame(self, frame, scale):
+    @staticmethod
+    def zoom_frame(frame, scale, out=None):
         """
         Zoom in/out frame by scale factor keeping output size same by cropping/padding.
         scale >1 = zoom in, scale <1 = zoom out
         """
         h, w = frame.shape[:2]
-        new_w, new_h = int(w * scale), int(h * scale)
+        if out is None:
+            out = np.empty_like(frame)
+        rect = transition_kernels.zoom_rect((w, h), (w, h), scale)
+        return transition_kernels.apply_zoom(frame, rect, out)
 
-        # Resize frame
-        resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    @staticmethod
+    def zoom_scales(direction, progress):
+        """Return the (scale1, scale2) zoom factors for the given progress."""
+        if direction == "in_out":
+            return 1.2 - 0.2 * progress, 0.8 + 0.2 * progress
+        elif direction == "out_in":
+            return 0.8 + 0.2 * progress, 1.2 - 0.2 * progress
+        elif direction == "in":
+            return 1.0 + 0.2 * progress, 1.0 + 0.2 * progress
+        elif direction == "out":
+            return 1.2 - 0.2 * progress, 1.2 - 0.2 * progress
+        raise ValueError("Invalid direction. Use 'in_out', 'out_in', 'in', or 'out'.")
+
+    def zoom_frames(
+        self, frame1, frame2, progress, out=None, direction="in_out", steps=None
+    ):
+        """
+        Zoom between frame1 and frame2 while cross-fading between them.
 
-        if scale > 1:
-            # Crop center to original size
-            x_start = (new_w - w) // 2
-            y_start = (new_h - h) // 2
-            cropped = resized[y_start : y_start + h, x_start : x_start + w]
-            return cropped
+        With ``steps`` the zoom rectangles come from a schedule computed once per
+        (size, steps, direction) instead of being rebuilt for every frame.
+        """
+        size1 = frame1.shape[1::-1]
+        size2 = frame2.shape[1::-1]
+        if steps is None:
+            scale1, scale2 = self.zoom_scales(direction, progress)
+            rect1 = transition_kernels.zoom_rect(size1, size1, scale1)
+            rect2 = transition_kernels.zoom_rect(size2, size1, scale2)
         else:
-            # Pad resized to original size
-            pad_x1 = (w - new_w) // 2
-            pad_y1 = (h - new_h) // 2
-            pad_x2 = w - new_w - pad_x1
-            pad_y2 = h - new_h - pad_y1
-            padded = cv2.copyMakeBorder(
-                resized, pad_y1, pad_y2, pad_x1, pad_x2, cv2.BORDER_CONSTANT, value=0
+            start1, start2 = self.zoom_scales(direction, 0)
+            end1, end2 = self.zoom_scales(direction, 1)
+            schedule1 = transition_kernels.zoom_schedule(
+                size1, size1, steps, start1, end1
+            )
+            schedule2 = transition_kernels.zoom_schedule(
+                size2, size1, steps, start2, end2
             )
-            return padded
+            step = transition_kernels.schedule_step(progress, steps)
+            rect1, rect2 = schedule1[step], schedule2[step]
+
+        zoomed1 = self.buffers.get("warp1", frame1.shape)
+        zoomed2 = self.buffers.get("warp2", frame1.shape)
+        transition_kernels.apply_zoom(frame1, rect1, zoomed1)
+        transition_kernels.apply_zoom(frame2, rect2, zoomed2)
+        return self._blend_warped(zoomed1, zoomed2, progress, out)
+
+    def blend_for(self, transition, duration, fps=FPS):
+        """
+        Return the per-frame blend of an overlapping transition.
+
+        Spin and zoom get their warp schedule bound for ``duration * fps`` steps.
+        """
+        blend = self.blends.get(transition)
+        if transition in (TransitionTypeEnum.SPIN, TransitionTypeEnum.ZOOM):
+            blend = partial(blend, steps=max(1, round(duration * fps)))
+        return blend
 
     def zoom_transition(self, clip1, clip2, duration=0.1, fps=30, direction="in_out"):
-        transition_frames = int(duration * fps)
-
-        frames1_gen = (
-            clip1.get_frame(t) for t in np.arange(0, clip1.duration, 1 / fps)
-        )
-        frames2_gen = (
-            clip2.get_frame(t) for t in np.arange(0, clip2.duration, 1 / fps)
-        )
-
-        output_frames = []
-        total_frames1 = int(clip1.duration * fps)
-
-        for _ in range(total_frames1 - transition_frames):
-            output_frames.append(next(frames1_gen))
-
-        for i in tqdm(range(transition_frames), desc="Generating zoom transition"):
-            progress = i / transition_frames
-            frame1 = next(frames1_gen)
-            frame2 = next(frames2_gen)
-
-            # Determine zoom scale and alpha based on direction
-            if direction == "in_out":
-                scale1 = 1.2 - 0.2 * progress  # zoom out
-                scale2 = 0.8 + 0.2 * progress  # zoom in
-            elif direction == "out_in":
-                scale1 = 0.8 + 0.2 * progress  # zoom in
-                scale2 = 1.2 - 0.2 * progress  # zoom out
-            elif direction == "in":
-                scale1 = 1.0 + 0.2 * progress
-                scale2 = 1.0 + 0.2 * progress
-            elif direction == "out":
-                scale1 = 1.2 - 0.2 * progress
-                scale2 = 1.2 - 0.2 * progress
-            else:
-                raise ValueError(
-                    "Invalid direction. Use 'in_out', 'out_in', 'in', or 'out'."
-                )
-
-            alpha1 = 1 - progress
-            alpha2 = progress
-
-            zoomed1 = self.zoom_frame(frame1, scale1)
-            zoomed2 = self.zoom_frame(frame2, scale2)
-
-            blended = (
-                zoomed1.astype(np.float32) * alpha1
-                + zoomed2.astype(np.float32) * alpha2
-            ).astype(np.uint8)
-            output_frames.append(blended)
-
-        for frame in frames2_gen:
-            output_frames.append(frame)
-
-        return ImageSequenceClip(output_frames, fps=fps)
+        # Fail early instead of on the first overlap frame.
+        self.zoom_scales(direction, 0)
+        blend = self.blend_for(TransitionTypeEnum.ZOOM, duration, fps)
+        blend = partial(blend, direction=direction)
+        return TransitionClip(clip1, clip2, blend, duration, fps)
+
+    @staticmethod
+    def fade_in_frame(frame, progress, out=None):
+        return transition_kernels.scale(frame, progress, out)
+
+    @staticmethod
+    def fade_out_frame(frame, progress, out=None):
+        return transition_kernels.scale(frame, 1 - progress, out)
 
     @staticmethod
     def fade_transition(clip1, clip2, duration=0.1):
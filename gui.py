@@ -1,20 +1,43 @@
 from __future__ import annotations
 
 import logging
+import math
 import os
+import queue
 import threading
 import tkinter as tk
+from collections import OrderedDict
 from contextlib import redirect_stderr, redirect_stdout
+from functools import partial
 from tkinter import filedialog, messagebox, scrolledtext, ttk
 from utils.gui_utils import format_time
 import ttkbootstrap as ttkb
 
-from components.gui_components.text_handler import TextRedirector, TextWidgetHandler
-from main import create_instagram_reel
-from utils.data_structures import VisionDataTypeEnum
+from components.gui_components.frame_presenter import FramePresenter
+from components.gui_components.preview_player import PreviewPlayer
+from components.gui_components.thumbnail_service import (
+    ThumbnailService,
+    thumbnail_timestamps,
+)
+from components.gui_components.timeline_model import TimelineModel
+from components.gui_components.text_handler import (
+    LogSink,
+    TextRedirector,
+    TextWidgetHandler,
+)
+from components.video_processing.video_postprocessing import VideoPostProcessing
+from main import PREVIEW_PROXY, create_instagram_reel
+from utils.data_structures import (
+    EncoderProfileEnum,
+    FitModeEnum,
+    PreviewProgress,
+    TimelineItem,
+    VisionDataTypeEnum,
+)
 from utils.json_handler import media_clips_to_json, pars_config
+from utils.media_index import MediaIndex
+from utils.profiling import profiler
 
-import cv2
 from PIL import Image, ImageTk
 
 # Optional: Better theming
@@ -30,12 +53,21 @@ class InstagramReelCreatorGUI:
     TIMELINE_START_STR = "start"
     TIMELINE_END_STR = "end"
     TIMELINE_BOX_HEIGHT = 120
+    TIMELINE_Y = 20
+    TIMELINE_VISIBLE_MARGIN_SEC = 10  # clips drawn beyond each edge of the view
+    TEXT_OFFSET_Y = 82  # clip label sits below the thumbnail strip
+    THUMBNAIL_PHOTO_ITEMS = 256
+    THUMBNAIL_REDRAW_MS = 50
+    RENDER_PROGRESS_POLL_MS = 100
+    PROFILE_TRACE_PATH = "profile_trace.json"
     GRID_LENGTH_IN_SEC = 90
     ZERO_OFFSET = 0
     PREVIEW_WIDTH = 240
     PREVIEW_HEIGHT = 320
-    PREVIEW_FPS = 30
+    PREVIEW_FPS = PREVIEW_PROXY.fps
     MAIN_WINDOW_Y_SHIFT = 50
+    AUTO_ENCODER_PROFILE = "auto"
+    AUTO_FIT_MODE = "auto"
 
     def __init__(self, root):
         self.root = root
@@ -44,15 +76,28 @@ class InstagramReelCreatorGUI:
         self.config_path = tk.StringVar()
         self.media_dir = tk.StringVar()
         self.convert_cfr = tk.BooleanVar(value=True)
-        self.selected_box_id = None
+        self.encoder_profile = tk.StringVar(value=self.AUTO_ENCODER_PROFILE)
+        self.fit_mode = tk.StringVar(value=self.AUTO_FIT_MODE)
+        self.profile_run = tk.BooleanVar(value=False)
+        self.render_progress_queue = queue.SimpleQueue()
+        self.selected_item_id = None
         self.pixels_per_second = 50
-        self.timeline_data = {}
+        self.timeline = TimelineModel()
+        self.timeline_canvas_items = {}  # {item_id: {part: canvas id}}, visible only
+        self.drag_data = None
+        self.media_index = MediaIndex()
+        self.thumbnails = ThumbnailService()
+        self.thumbnail_photos = OrderedDict()  # LRU of thumbnail key -> photo
+        self.thumbnail_redraws = set()
+        self.thumbnail_lock = threading.Lock()
         # Preview
         self.preview_paused = True
         self.user_seeking = False
+        self.syncing_seek = False
         self.frame_preview = None
-        self.frames = []
-        self.frame_timestamps = []
+        self.preview_player = None
+        self.preview_presenter = None
+        self.preview_image = None
         self.current_frame_index = 0
         self.preview_reset()
         ######
@@ -83,6 +128,10 @@ class InstagramReelCreatorGUI:
             padx=self.PADDING_10,
             pady=5,
         )
+        # Render threads only queue log text, Tk drains it in batches
+        self.log_sink = LogSink(self.log_output).start()
+        self.root.after(self.RENDER_PROGRESS_POLL_MS, self.poll_render_progress)
+        self.root.after(self.THUMBNAIL_REDRAW_MS, self.redraw_thumbnails)
         self.root.bind("<Left>", self.move_selected_left)
         self.root.bind("<Right>", self.move_selected_right)
 
@@ -147,11 +196,36 @@ class InstagramReelCreatorGUI:
             text="Save Timeline",
             command=self.save_updated_config,
         ).pack(side="left", padx=5)
+        ttk.Label(frame_controls, text="Encoder:").pack(side="left", padx=(15, 5))
+        ttk.Combobox(
+            frame_controls,
+            textvariable=self.encoder_profile,
+            values=[self.AUTO_ENCODER_PROFILE, *EncoderProfileEnum],
+            state="readonly",
+            width=10,
+        ).pack(side="left", padx=5)
+        ttk.Label(frame_controls, text="Fit:").pack(side="left", padx=(15, 5))
+        ttk.Combobox(
+            frame_controls,
+            textvariable=self.fit_mode,
+            values=[self.AUTO_FIT_MODE, *FitModeEnum],
+            state="readonly",
+            width=8,
+        ).pack(side="left", padx=5)
+        ttk.Checkbutton(
+            frame_controls,
+            text="Profile",
+            variable=self.profile_run,
+        ).pack(side="left", padx=5)
         ttk.Button(
             frame_controls,
             text="Exit",
             command=self.root.quit,
         ).pack(side="left", padx=5)
+        self.render_progress = ttk.Progressbar(
+            frame_controls, mode="determinate", length=200
+        )
+        self.render_progress.pack(side="right", padx=5)
 
     def preview_frame(self):
         self.frame_preview = ttk.LabelFrame(
@@ -188,18 +262,21 @@ class InstagramReelCreatorGUI:
         )
 
         self.canvas = tk.Canvas(self.timeline_frame, height=200, bg="#fafafa")
-        scrollbar = ttk.Scrollbar(
+        self.timeline_scrollbar = ttk.Scrollbar(
             self.timeline_frame,
             orient="horizontal",
             command=self.canvas.xview,
         )
-        self.canvas.configure(xscrollcommand=scrollbar.set)
+        self.canvas.configure(xscrollcommand=self.on_timeline_scroll)
         self.canvas.pack(side="top", fill="x")
-        scrollbar.pack(side="bottom", fill="x")
+        self.timeline_scrollbar.pack(side="bottom", fill="x")
+        self.canvas.bind("<Configure>", lambda e: self.refresh_visible_items())
+        self.bind_timeline_items()
 
     def create_timeline_grid(self):
-        # Draw grid
-        for second in range(self.GRID_LENGTH_IN_SEC + 1):
+        # Draw grid once per load, long enough for the whole timeline
+        seconds = max(self.GRID_LENGTH_IN_SEC, math.ceil(self.timeline.end))
+        for second in range(seconds + 1):
             x1 = second * self.pixels_per_second
             self.canvas.create_line(
                 x1, 0, x1, self.TIMELINE_BOX_HEIGHT + 40, fill="gray"
@@ -217,8 +294,10 @@ class InstagramReelCreatorGUI:
     def preview_reset(self):
         self.preview_paused = True
         self.user_seeking = False
-        self.frames = []
-        self.frame_timestamps = []
+        if self.preview_player is not None:
+            self.preview_player.stop()
+        self.preview_player = None
+        self.preview_presenter = None
         self.current_frame_index = 0
 
     def _round_timestamp_with_pixels(self, value):
@@ -235,48 +314,196 @@ class InstagramReelCreatorGUI:
         if path:
             self.media_dir.set(path)
 
-    def move_all_components(self, box_id, dx, data):
-        # Move all components
-        self.canvas.move(box_id, dx, 0)
-        self.canvas.move(data["text"], dx, 0)
-        self.canvas.move(data["left"], dx, 0)
-        self.canvas.move(data["right"], dx, 0)
+    def timeline_x(self, seconds):
+        return seconds * self.pixels_per_second
 
-    def update_text(self, box_id):
-        data = self.timeline_data[box_id]
+    def timeline_label(self, item):
         text = (
-            f"{data['filename']}\nOn Timeline:\n{data[self.TIMELINE_START_STR]}-{data[self.TIMELINE_END_STR]}s"
-            f"\nVideo Time:\n{data['info'].start}-{data['info'].end}s"
+            f"{item.filename}\nOn Timeline:\n{item.start}-{item.end}s"
+            f"\nVideo Time:\n{item.info.start}-{item.info.end}s"
         )
-        self.canvas.itemconfig(data["text"], text=text)
-
-    def move_selected_box(self, dx):
-        if self.selected_box_id is None:
+        if item.media is not None and item.media.duration is not None:
+            text += f" of {item.media.duration:.1f}s"
+        return text
+
+    def create_clip_items(self, item):
+        """Create the canvas items of one timeline clip."""
+        tag = f"clip{item.item_id}"
+        color = "#91c9f7" if item.info.type == VisionDataTypeEnum.VIDEO else "#f9d58c"
+        outline = "red" if item.item_id == self.selected_item_id else "#333"
+        self.timeline_canvas_items[item.item_id] = {
+            "left": self.canvas.create_rectangle(
+                0, 0, 0, 0, fill="#666", tags=("left_handle", tag)
+            ),
+            "right": self.canvas.create_rectangle(
+                0, 0, 0, 0, fill="#666", tags=("right_handle", tag)
+            ),
+            "box": self.canvas.create_rectangle(
+                0, 0, 0, 0, fill=color, outline=outline, tags=("clip_box", tag)
+            ),
+            "text": self.canvas.create_text(
+                0, 0, anchor="w", font=("Arial", 8), tags=("clip_box", tag)
+            ),
+        }
+        self.place_clip_items(item)
+
+    def place_clip_items(self, item):
+        """Sync one clip's canvas items with the model, if it is drawn."""
+        parts = self.timeline_canvas_items.get(item.item_id)
+        if parts is None:
+            return
+        x1, x2 = self.timeline_x(item.start), self.timeline_x(item.end)
+        y1, y2 = self.TIMELINE_Y, self.TIMELINE_Y + self.TIMELINE_BOX_HEIGHT
+        self.canvas.coords(parts["box"], x1, y1, x2, y2)
+        self.canvas.coords(parts["left"], x1 - self.PADDING_10, y1, x1 + 2, y2)
+        self.canvas.coords(parts["right"], x2 - 2, y1, x2 + self.PADDING_10, y2)
+        self.canvas.coords(parts["text"], x1 + 10, y1 + self.TEXT_OFFSET_Y)
+        self.canvas.itemconfig(parts["text"], text=self.timeline_label(item))
+        self.draw_thumbnails(item)
+
+    def thumbnail_width(self, item):
+        media = item.media
+        if media is None or not media.width or not media.height:
+            return self.thumbnails.height * 9 / 16
+        width, height = media.width, media.height
+        if media.rotation in (90, 270):
+            width, height = height, width
+        return self.thumbnails.height * width / height
+
+    def draw_thumbnails(self, item, force=False):
+        """
+        Lay out a clip's filmstrip from ready tiles and request the rest.
+
+        A clip that only moved keeps its tiles and shifts them, the strip is
+        rebuilt when its tiles change or ``force`` is set.
+        """
+        parts = self.timeline_canvas_items.get(item.item_id)
+        media_dir = self.media_dir.get()
+        if parts is None or not media_dir:
+            return
+        tag = f"thumb{item.item_id}"
+        x1, x2 = self.timeline_x(item.start), self.timeline_x(item.end)
+        tile_width = self.thumbnail_width(item)
+        count = int((x2 - x1 - 4) // tile_width)
+        path = os.path.join(media_dir, item.filename)
+        timestamps = thumbnail_timestamps(item.info.start, item.info.end, count)
+        if not force and parts.get("thumb_layout") == (path, timestamps):
+            self.canvas.move(tag, x1 - parts["thumb_x"], 0)
+            parts["thumb_x"] = x1
             return
 
-        data = self.timeline_data[self.selected_box_id]
-        self.move_all_components(self.selected_box_id, dx, data)
+        self.canvas.delete(tag)
+        parts["thumbs"] = []  # keeps the drawn PhotoImages alive
+        parts["thumb_layout"] = (path, timestamps)
+        parts["thumb_x"] = x1
+        callback = partial(self.on_thumbnail_ready, item.item_id)
+        for i, timestamp in enumerate(timestamps):
+            photo = self.thumbnail_photo(path, timestamp, callback, item.info.type)
+            if photo is None:
+                continue
+            parts["thumbs"].append(photo)
+            self.canvas.create_image(
+                x1 + 2 + i * tile_width,
+                self.TIMELINE_Y + 2,
+                image=photo,
+                anchor="nw",
+                tags=("clip_box", f"clip{item.item_id}", tag),
+            )
 
-        # Update timing
-        x1 = self.canvas.coords(self.selected_box_id)[0]  # only x coord
-        new_start = round(x1 / self.pixels_per_second, 1)
-        duration = data[self.TIMELINE_END_STR] - data[self.TIMELINE_START_STR]
-        data[self.TIMELINE_START_STR] = new_start
-        data[self.TIMELINE_END_STR] = round(new_start + duration, 1)
-        self.update_text(self.selected_box_id)
+    def thumbnail_photo(self, path, timestamp, callback, media_type):
+        # Keyed like the disk cache, so a replaced source gets new tiles
+        key = self.thumbnails.key(path, timestamp, media_type)
+        if key is None:
+            return None
+        photo = self.thumbnail_photos.get(key)
+        if photo is not None:
+            self.thumbnail_photos.move_to_end(key)
+            return photo
+        image = self.thumbnails.request(path, timestamp, callback, media_type)
+        if image is None:
+            return None
+        photo = ImageTk.PhotoImage(image)
+        self.thumbnail_photos[key] = photo
+        while len(self.thumbnail_photos) > self.THUMBNAIL_PHOTO_ITEMS:
+            self.thumbnail_photos.popitem(last=False)
+        return photo
+
+    def on_thumbnail_ready(self, item_id, image):
+        # Called from a worker thread, redraw_thumbnails picks the clip up
+        with self.thumbnail_lock:
+            self.thumbnail_redraws.add(item_id)
+
+    def redraw_thumbnails(self):
+        """Redraw clips with newly ready tiles, polled from the Tk main loop."""
+        with self.thumbnail_lock:
+            item_ids, self.thumbnail_redraws = self.thumbnail_redraws, set()
+        for item_id in item_ids:
+            if item_id in self.timeline_canvas_items:
+                self.draw_thumbnails(self.timeline.get(item_id), force=True)
+        self.root.after(self.THUMBNAIL_REDRAW_MS, self.redraw_thumbnails)
+
+    def delete_clip_items(self, item_id):
+        self.canvas.delete(f"clip{item_id}")
+        del self.timeline_canvas_items[item_id]
+
+    def visible_time_range(self):
+        left, right = self.canvas.xview()
+        width = self.timeline_scroll_width()
+        margin = self.TIMELINE_VISIBLE_MARGIN_SEC
+        return (
+            left * width / self.pixels_per_second - margin,
+            right * width / self.pixels_per_second + margin,
+        )
 
-    def is_overlapping(self, box_id, proposed_start, proposed_end):
-        for other_id, data in self.timeline_data.items():
-            if other_id == box_id:
-                continue
-            other_start = data[self.TIMELINE_START_STR]
-            other_end = data[self.TIMELINE_END_STR]
-            if not (proposed_end <= other_start or proposed_start >= other_end):
-                return True
-        return False
+    def timeline_scroll_width(self):
+        seconds = max(self.GRID_LENGTH_IN_SEC, self.timeline.end)
+        return self.timeline_x(seconds) + self.PADDING_10 * 2
+
+    def refresh_visible_items(self):
+        """Create canvas items for clips scrolled into view, drop the others."""
+        visible = {
+            item.item_id for item in self.timeline.visible(*self.visible_time_range())
+        }
+        if self.drag_data is not None:
+            visible.add(self.drag_data["item"])  # never delete under the pointer
+        for item_id in set(self.timeline_canvas_items) - visible:
+            self.delete_clip_items(item_id)
+        for item_id in visible - set(self.timeline_canvas_items):
+            self.create_clip_items(self.timeline.get(item_id))
+
+    def on_timeline_scroll(self, first, last):
+        self.timeline_scrollbar.set(first, last)
+        self.refresh_visible_items()
+
+    def current_item_id(self):
+        for tag in self.canvas.gettags("current"):
+            if tag.startswith("clip") and tag[4:].isdigit():
+                return int(tag[4:])
+        return None
+
+    def move_item(self, item_id, dx):
+        """Shift a clip by ``dx`` pixels unless it would overlap another."""
+        item = self.timeline.get(item_id)
+        new_start = round(
+            (self.timeline_x(item.start) + dx) / self.pixels_per_second, 1
+        )
+        new_end = round(new_start + item.end - item.start, 1)
+        if new_start < 0 or self.timeline.overlaps(item_id, new_start, new_end):
+            return  # block move if it overlaps
+        self.timeline.move(item_id, new_start, new_end)
+        self.place_clip_items(item)
+        self.update_scrollregion()
+
+    def move_selected_box(self, dx):
+        if self.selected_item_id is None:
+            return
+        self.move_item(self.selected_item_id, dx)
+
+    def is_overlapping(self, item_id, proposed_start, proposed_end):
+        return self.timeline.overlaps(item_id, proposed_start, proposed_end)
 
     def save_updated_config(self):
-        if len(self.timeline_data) == 0:
+        if len(self.timeline) == 0:
             messagebox.showerror(
                 "Error",
                 "Please select both config file first.",
@@ -284,9 +511,8 @@ class InstagramReelCreatorGUI:
             return
 
         updated = {}
-        for box_id, data in self.timeline_data.items():
-            info = data["info"]
-            updated[data["filename"]] = info
+        for item in self.timeline:
+            updated[item.filename] = item.info
 
         out_path = filedialog.asksaveasfilename(defaultextension=".json")
         if out_path:
@@ -297,128 +523,112 @@ class InstagramReelCreatorGUI:
             )
         self.config_path.set(out_path)
 
-    def make_resizable(self, left_handle, right_handle, box_id):
-        def resize_left(event):
-            x1, y1, x2, y2 = self.canvas.coords(box_id)
-            dx = event.x - x1
-            dx = round(dx / 10) * 10
-
-            if x2 - (x1 + dx) > self.MIN_TIMELINE_ELEMENT_WIDTH:
-                # Update start time
-                new_start = self._round_timestamp_with_pixels(x1 + dx)
-                if self.is_overlapping(
-                    box_id,
-                    new_start,
-                    self.timeline_data[box_id][self.TIMELINE_END_STR],
-                ):
-                    return
-                self.canvas.coords(box_id, x1 + dx, y1, x2, y2)
-                self.canvas.move(self.timeline_data[box_id]["text"], dx, 0)
-                self.canvas.coords(
-                    left_handle,
-                    x1 + dx - self.PADDING_10,
-                    y1,
-                    x1 + dx + 2,
-                    y2,
-                )
-
-                diff = new_start - self.timeline_data[box_id][self.TIMELINE_START_STR]
-                self.timeline_data[box_id]["info"].start = round(
-                    self.timeline_data[box_id]["info"].start + diff, 1
-                )
-                self.timeline_data[box_id][self.TIMELINE_START_STR] = new_start
-                self.update_text(box_id)
-
-        def resize_right(event):
-            x1, y1, x2, y2 = self.canvas.coords(box_id)
-            dx = event.x - x2
-            dx = round(dx / 10) * 10
-
-            if (x2 + dx) - x1 > self.MIN_TIMELINE_ELEMENT_WIDTH:
-                # Update end time
-                new_end = round((x2 + dx) / self.pixels_per_second, 1)
-                if self.is_overlapping(
-                    box_id,
-                    self.timeline_data[box_id][self.TIMELINE_START_STR],
-                    new_end,
-                ):
-                    return
-                self.canvas.coords(box_id, x1, y1, x2 + dx, y2)
-                self.canvas.coords(
-                    right_handle,
-                    x2 + dx - 2,
-                    y1,
-                    x2 + dx + self.PADDING_10,
-                    y2,
-                )
-
-                diff = new_end - self.timeline_data[box_id][self.TIMELINE_END_STR]
-                self.timeline_data[box_id]["info"].end = round(
-                    self.timeline_data[box_id]["info"].end + diff, 1
-                )
-                self.timeline_data[box_id][self.TIMELINE_END_STR] = new_end
-                self.update_text(box_id)
-
-        self.canvas.tag_bind(left_handle, "<B1-Motion>", resize_left)
-        self.canvas.tag_bind(right_handle, "<B1-Motion>", resize_right)
-
-    def make_draggable(self, item_id):
-        def on_start(event):
-            self.drag_data = {
-                "item": item_id,
-                "x": event.x_root,
-            }
-            self.selected_box_id = item_id  # Track selected item
-
-            # Reset outline for all boxes
-            for box_id in self.timeline_data:
-                self.canvas.itemconfig(box_id, outline="#333")
-            self.canvas.itemconfig(item_id, outline="red")
-
-            # Raise all components of the selected item
-            data = self.timeline_data[item_id]
-            self.canvas.tag_raise(data["left"])
-            self.canvas.tag_raise(data["right"])
-            self.canvas.tag_raise(item_id)
-            self.canvas.tag_raise(data["text"])  # Make sure text is on toplevel
-
-        def on_drag(event):
-            dx = event.x_root - self.drag_data["x"]
-            self.drag_data["x"] = event.x_root
-
-            dx = round(dx / 10) * 10
-            if dx == 0:
-                return
-
-            box_id = self.drag_data["item"]
-            data = self.timeline_data[box_id]
-            x1, y1, x2, y2 = self.canvas.coords(box_id)
-            new_x1 = x1 + dx
-            new_x2 = x2 + dx
-
-            new_start = round(new_x1 / self.pixels_per_second, 1)
-            new_end = round(new_x2 / self.pixels_per_second, 1)
-
-            if self.is_overlapping(box_id, new_start, new_end):
-                return  # block move if it overlaps
-
-            self.move_all_components(box_id, dx, data)
-            data[self.TIMELINE_START_STR] = new_start
-            data[self.TIMELINE_END_STR] = new_end
-            self.update_text(box_id)
-
-        self.canvas.tag_bind(item_id, "<ButtonPress-1>", on_start)
-        self.canvas.tag_bind(item_id, "<B1-Motion>", on_drag)
+    def bind_timeline_items(self):
+        # One binding per tag serves every clip, drawn now or later
+        for tag in ("clip_box", "left_handle", "right_handle"):
+            self.canvas.tag_bind(tag, "<ButtonPress-1>", self.on_item_press)
+        self.canvas.tag_bind("clip_box", "<B1-Motion>", self.on_drag)
+        self.canvas.tag_bind("left_handle", "<B1-Motion>", self.resize_left)
+        self.canvas.tag_bind("right_handle", "<B1-Motion>", self.resize_right)
         self.canvas.tag_bind(
-            item_id,
+            "clip_box",
             "<Enter>",
             lambda e: self.canvas.config(cursor="fleur"),
         )
         self.canvas.tag_bind(
-            item_id,
+            "clip_box",
             "<Leave>",
             lambda e: self.canvas.config(cursor=""),
         )
+        self.canvas.bind("<ButtonRelease-1>", self.on_item_release)
+
+    def on_item_press(self, event):
+        item_id = self.current_item_id()
+        if item_id is None:
+            return
+        self.drag_data = {
+            "item": item_id,
+            "x": event.x_root,
+        }
+        # Move the red outline from the previous selection only
+        previous = self.timeline_canvas_items.get(self.selected_item_id)
+        if previous is not None:
+            self.canvas.itemconfig(previous["box"], outline="#333")
+        self.selected_item_id = item_id  # Track selected item
+        parts = self.timeline_canvas_items[item_id]
+        self.canvas.itemconfig(parts["box"], outline="red")
+
+        # Raise all components of the selected item, keeping their order
+        self.canvas.tag_raise(f"clip{item_id}")
+
+    def on_item_release(self, event):
+        self.drag_data = None
+        self.refresh_visible_items()
+
+    def on_drag(self, event):
+        if self.drag_data is None:
+            return
+        dx = event.x_root - self.drag_data["x"]
+        dx = round(dx / 10) * 10
+        if dx == 0:
+            return
+        self.drag_data["x"] += dx
+        self.move_item(self.drag_data["item"], dx)
+
+    def resize_left(self, event):
+        if self.drag_data is None:
+            return
+        item = self.timeline.get(self.drag_data["item"])
+        x1, x2 = self.timeline_x(item.start), self.timeline_x(item.end)
+        dx = round((self.canvas.canvasx(event.x) - x1) / 10) * 10
+        if dx == 0 or x2 - (x1 + dx) <= self.MIN_TIMELINE_ELEMENT_WIDTH:
+            return
+
+        # Update start time
+        new_start = self._round_timestamp_with_pixels(x1 + dx)
+        if new_start < 0 or self.is_overlapping(item.item_id, new_start, item.end):
+            return
+        diff = new_start - item.start
+        if item.info.start + diff < 0:
+            return
+        item.info.start = round(item.info.start + diff, 1)
+        self.timeline.move(item.item_id, new_start, item.end)
+        self.place_clip_items(item)
+
+    def resize_right(self, event):
+        if self.drag_data is None:
+            return
+        item = self.timeline.get(self.drag_data["item"])
+        x1, x2 = self.timeline_x(item.start), self.timeline_x(item.end)
+        dx = round((self.canvas.canvasx(event.x) - x2) / 10) * 10
+        if dx == 0 or (x2 + dx) - x1 <= self.MIN_TIMELINE_ELEMENT_WIDTH:
+            return
+
+        # Update end time
+        new_end = self._round_timestamp_with_pixels(x2 + dx)
+        if self.is_overlapping(item.item_id, item.start, new_end):
+            return
+        diff = new_end - item.end
+        if (
+            item.media is not None
+            and item.media.duration is not None
+            and item.info.end + diff > item.media.duration
+        ):
+            return
+        item.info.end = round(item.info.end + diff, 1)
+        self.timeline.move(item.item_id, item.start, new_end)
+        self.place_clip_items(item)
+        self.update_scrollregion()
+
+    def update_scrollregion(self):
+        self.canvas.config(
+            scrollregion=(
+                -self.PADDING_10,
+                0,
+                self.timeline_scroll_width(),
+                self.TIMELINE_BOX_HEIGHT + 60,
+            )
+        )
 
     def draw_timeline(self):
         config_path = self.config_path.get()
@@ -432,76 +642,29 @@ class InstagramReelCreatorGUI:
 
         try:
             config_data = pars_config(config_path)
+            media = self.probe_timeline_media(config_data)
             self.canvas.delete("all")
-            self.timeline_data = {}
-            x = self.ZERO_OFFSET  # start offset
-            y = 20
+            self.thumbnails.cancel()
+            self.timeline = TimelineModel()
+            self.timeline_canvas_items = {}
+            self.selected_item_id = None
+            self.drag_data = None
 
+            # Clips are laid out back to back, each as long as its trimmed part
             start = self.ZERO_OFFSET
-            end = self.ZERO_OFFSET
-            for filename, info in config_data.items():
-                # we need to show grid with 1 second resolution and duration which part of given file is takes
-                start += info.start
-                end += info.end
-                duration = end - start
-                width = duration * self.pixels_per_second
-                color = (
-                    "#91c9f7" if info.type == VisionDataTypeEnum.VIDEO else "#f9d58c"
-                )
-
-                # Main box
-                rect = self.canvas.create_rectangle(
-                    x,
-                    y,
-                    x + width,
-                    y + self.TIMELINE_BOX_HEIGHT,
-                    fill=color,
-                    outline="#333",
-                )
-                text = self.canvas.create_text(
-                    x + 10,
-                    y + 55,
-                    anchor="w",
-                    font=("Arial", 8),
-                )
-
-                # Resize handles (left + right edges)
-                left_handle = self.canvas.create_rectangle(
-                    x - self.PADDING_10,
-                    y,
-                    x + 2,
-                    y + self.TIMELINE_BOX_HEIGHT,
-                    fill="#666",
-                )
-                right_handle = self.canvas.create_rectangle(
-                    x + width - 2,
-                    y,
-                    x + width + self.PADDING_10,
-                    y + self.TIMELINE_BOX_HEIGHT,
-                    fill="#666",
+            for item_id, (filename, info) in enumerate(config_data.items()):
+                end = round(start + info.end - info.start, 1)
+                self.timeline.add(
+                    TimelineItem(
+                        item_id, filename, start, end, info, media.get(filename)
+                    )
                 )
-
-                # TODO:
-                # create data structure that has field "preview render ready"
-                self.timeline_data[rect] = {
-                    "filename": filename,
-                    self.TIMELINE_START_STR: start,
-                    self.TIMELINE_END_STR: end,
-                    "text": text,
-                    "left": left_handle,
-                    "right": right_handle,
-                    "info": info,
-                }
-                self.update_text(rect)
-
-                self.create_timeline_grid()
-
-                self.make_draggable(rect)
-                self.make_resizable(left_handle, right_handle, rect)
-
-                x += width
                 start = end
-            self.canvas.config(scrollregion=self.canvas.bbox("all"))
+
+            self.create_timeline_grid()
+            self.update_scrollregion()
+            self.canvas.xview_moveto(0)
+            self.refresh_visible_items()
 
         except Exception as e:
             self.config_path.set("")
@@ -510,6 +673,19 @@ class InstagramReelCreatorGUI:
                 f"Failed to load timeline: {e}",
             )
 
+    def probe_timeline_media(self, config_data):
+        """Return ``{filename: MediaInfo}`` for the config's videos."""
+        media_dir = self.media_dir.get()
+        if not media_dir or not os.path.isdir(media_dir):
+            return {}
+        paths = {
+            filename: os.path.abspath(os.path.join(media_dir, filename))
+            for filename, info in config_data.items()
+            if info.type == VisionDataTypeEnum.VIDEO
+        }
+        probed = self.media_index.probe_all(paths.values())
+        return {filename: probed.get(path) for filename, path in paths.items()}
+
     def select_config_file(self):
         path = filedialog.askopenfilename(
             title="Select Config JSON",
@@ -527,95 +703,111 @@ class InstagramReelCreatorGUI:
 
     def play_video_on_canvas(self, video_path_dir="preview"):
         # TODO:
-        # 1. run on the separated thread
-        # 2. On slider move stop video
-        # 3. On slider not touch start
-        # 4. Don't render files that don't need rerender
         # 5. Add option to detach window with preview
 
-        # Load all frames and timestamps
-        # Skip loading if already loaded
-        if len(self.frames) == 0:
-            # Gather and sort all video files
-            video_files = sorted(
-                [
-                    os.path.join(video_path_dir, f)
-                    for f in os.listdir(video_path_dir)
-                    if f.lower().endswith((".mp4", ".avi", ".mov"))
-                ]
-            )
+        # Open the player once, frames are decoded in the background on demand
+        if self.preview_player is None:
+            # Preview files in timeline order
+            video_files = VideoPostProcessing.preview_files(video_path_dir)
 
             if not video_files:
                 print("No video files found.")
                 return
             self.current_frame_index = 0
-
-            for video_path in video_files:
-                cap = cv2.VideoCapture(video_path)
-                frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-
-                for i in range(frame_count):
-                    ret, frame = cap.read()
-                    if not ret:
-                        break
-                    resized = cv2.resize(
-                        frame, (self.PREVIEW_WIDTH, self.PREVIEW_HEIGHT)
-                    )
-                    self.frames.append(resized)
-                    self.frame_timestamps.append(len(self.frames) / self.PREVIEW_FPS)
-
-                cap.release()
-
-        if not hasattr(self, "preview_seek"):
-            self.preview_seek = ttk.Scale(
-                self.frame_preview,
-                from_=0,
-                to=len(self.frames) - 1,
-                orient="horizontal",
-                command=self.seek_frame,
+            self.preview_player = PreviewPlayer(
+                video_files,
+                (self.PREVIEW_WIDTH, self.PREVIEW_HEIGHT),
+                self.PREVIEW_FPS,
+            ).start()
+            self.preview_presenter = FramePresenter(
+                self.preview_player, self.PREVIEW_FPS
             )
-            self.preview_seek.pack(side="bottom", fill="x", padx=10)
 
-        # Start playback
+            if not hasattr(self, "preview_seek"):
+                self.preview_seek = ttk.Scale(
+                    self.frame_preview,
+                    from_=0,
+                    orient="horizontal",
+                    command=self.seek_frame,
+                )
+                self.preview_seek.pack(side="bottom", fill="x", padx=10)
+            self.preview_seek.config(to=max(0, self.preview_player.total_frames - 1))
+
+        # Start playback, the clock restarts from the frame on screen
+        self.preview_presenter.start(self.current_frame_index)
         self.playback_loop()
 
-    def render_one_frame(self):
-        frame = self.frames[self.current_frame_index]
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img = ImageTk.PhotoImage(Image.fromarray(rgb))
-        self.preview_canvas.create_image(0, 0, anchor="nw", image=img)
-        self.preview_canvas.image = img  # prevent GC
+    def render_one_frame(self, frame):
+        # Reuse one PhotoImage, paste copies the pixels without a new Tk image
+        if self.preview_image is None:
+            self.preview_image = ImageTk.PhotoImage(
+                "RGB", (self.PREVIEW_WIDTH, self.PREVIEW_HEIGHT)
+            )
+            self.preview_canvas.create_image(
+                0, 0, anchor="nw", image=self.preview_image
+            )
+        self.preview_image.paste(Image.fromarray(frame))
+
+    def show_frame(self, item):
+        self.current_frame_index, frame = item
+        self.render_one_frame(frame)
+        # Follow playback with the slider without seeking the player
+        self.syncing_seek = True
+        self.preview_seek.set(self.current_frame_index)
+        self.syncing_seek = False
+        self.update_time_label()
 
     def playback_loop(self):
-        if len(self.frames) == 0 or self.preview_paused:
+        if self.preview_player is None or self.preview_paused:
             return
 
-        if self.current_frame_index >= len(self.frames):
+        if self.preview_player.at_end:
             return  # End of video
 
-        self.preview_seek.set(self.current_frame_index)
-        self.update_time_label()
-        self.current_frame_index += 1
+        item = self.preview_presenter.next_frame()
+        if item is not None:
+            self.show_frame(item)
+        self.root.after(self.preview_presenter.delay_ms(), self.playback_loop)
 
-        self.root.after(int(1000 / self.PREVIEW_FPS), self.playback_loop)
+    def show_seek_frame(self, attempts=50):
+        # While paused, poll until the decoder delivered the sought frame
+        if self.preview_player is None or not self.preview_paused:
+            return
+        item = self.preview_player.read()
+        if item is not None:
+            self.show_frame(item)
+        elif attempts:
+            self.root.after(10, self.show_seek_frame, attempts - 1)
 
     def update_time_label(self):
+        total_frames = self.preview_player.total_frames if self.preview_player else 0
         current_sec = self.current_frame_index / self.PREVIEW_FPS
-        total_sec = len(self.frames) / self.PREVIEW_FPS
-        self.preview_time_label.config(
-            text=f"{format_time(current_sec)} / {format_time(total_sec)}"
-        )
+        total_sec = total_frames / self.PREVIEW_FPS
+        text = f"{format_time(current_sec)} / {format_time(total_sec)}"
+        if self.preview_presenter is not None and not self.preview_paused:
+            text += (
+                f"  {self.preview_presenter.achieved_fps:.1f} fps,"
+                f" {self.preview_presenter.dropped_frames} dropped"
+            )
+        self.preview_time_label.config(text=text)
 
     def toggle_play_pause(self):
         self.preview_paused = not self.preview_paused
         self.play_pause_button.config(text="Play" if self.preview_paused else "Pause")
         if not self.preview_paused:
+            if self.preview_player is not None and self.preview_player.at_end:
+                self.preview_player.seek(0)  # replay from the start
+                self.current_frame_index = 0
             self.play_video_on_canvas()
 
     def seek_frame(self, val):
+        if self.syncing_seek or self.preview_player is None:
+            return
         self.current_frame_index = int(float(val))
+        self.preview_player.seek(self.current_frame_index)
+        self.preview_presenter.start(self.current_frame_index)
         self.update_time_label()
-        self.render_one_frame()
+        self.show_seek_frame()
 
     def run_main_script(self, preview: bool = False):
         if not self.config_path.get() or not self.media_dir.get():
@@ -625,7 +817,7 @@ class InstagramReelCreatorGUI:
             )
             return
 
-        self.log_output.delete("1.0", tk.END)
+        self.log_sink.clear()
         self.append_log("Starting reel creation...")
         threading.Thread(
             target=self.execute_script, args=(preview,), daemon=True
@@ -634,11 +826,11 @@ class InstagramReelCreatorGUI:
     def execute_script(self, preview):
         try:
             # Setup stdout/stderr redirection
-            stdout_redirector = TextRedirector(self.log_output)
-            stderr_redirector = TextRedirector(self.log_output)
+            stdout_redirector = TextRedirector(self.log_sink)
+            stderr_redirector = TextRedirector(self.log_sink)
 
             # Setup logging redirection
-            text_handler = TextWidgetHandler(self.log_output)
+            text_handler = TextWidgetHandler(self.log_sink)
             text_handler.setLevel(logging.INFO)
             formatter = logging.Formatter(
                 "%(asctime)s - %(levelname)s - %(message)s",
@@ -652,11 +844,35 @@ class InstagramReelCreatorGUI:
             logger.setLevel(logging.INFO)
             logger.propagate = False  # Optional: Avoid double logs from parent handlers
 
-            with redirect_stdout(stdout_redirector), redirect_stderr(stderr_redirector):
-                json_file = pars_config(self.config_path.get())
-                create_instagram_reel(
-                    json_file, self.media_dir.get(), "test_output.mp4", preview
-                )
+            encoder_profile = self.encoder_profile.get()
+            if encoder_profile == self.AUTO_ENCODER_PROFILE:
+                encoder_profile = None
+            fit_mode = self.fit_mode.get()
+            if fit_mode == self.AUTO_FIT_MODE:
+                fit_mode = None
+            if self.profile_run.get():
+                profiler.start()
+            try:
+                with (
+                    redirect_stdout(stdout_redirector),
+                    redirect_stderr(stderr_redirector),
+                ):
+                    json_file = pars_config(self.config_path.get())
+                    create_instagram_reel(
+                        json_file,
+                        self.media_dir.get(),
+                        "test_output.mp4",
+                        preview,
+                        encoder_profile=encoder_profile,
+                        progress_callback=self.on_render_progress,
+                        fit_mode=fit_mode,
+                    )
+            finally:
+                if profiler.enabled:
+                    profiler.stop()
+                    profiler.log_summary(logger)
+                    profiler.export(self.PROFILE_TRACE_PATH)
+                    self.append_log(f"Profile trace: {self.PROFILE_TRACE_PATH}\n")
 
             self.append_log("✅ Reel creation finished.\n")
 
@@ -664,9 +880,26 @@ class InstagramReelCreatorGUI:
         except Exception as e:
             self.append_log(f"❌ Error: {e}\n")
 
+    def on_render_progress(self, progress: PreviewProgress):
+        """Called from the render thread once per finished clip preview."""
+        self.render_progress_queue.put(progress)
+
+    def poll_render_progress(self):
+        # Render threads only queue progress, Tk shows the newest
+        progress = None
+        while True:
+            try:
+                progress = self.render_progress_queue.get_nowait()
+            except queue.Empty:
+                break
+        if progress is not None:
+            self.render_progress.config(
+                maximum=progress.total, value=progress.completed
+            )
+        self.root.after(self.RENDER_PROGRESS_POLL_MS, self.poll_render_progress)
+
     def append_log(self, text):
-        self.log_output.insert(tk.END, text)
-        self.log_output.see(tk.END)
+        self.log_sink.write(text)
 
 
 if __name__ == "__main__":
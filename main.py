@@ -3,44 +3,98 @@ from __future__ import annotations
 import argparse
 import logging
 
+from components.video_processing.ffmpeg_renderer import FfmpegRenderer
 from components.video_processing.video_preprocessing import VideoPreprocessing
 from components.video_processing.video_postprocessing import VideoPostProcessing
 
+from utils.data_structures import (
+    EncoderProfileEnum,
+    FitModeEnum,
+    ProxySettings,
+    RenderBackendEnum,
+)
 from utils.json_handler import json_template_generator, pars_config
+from utils.profiling import PROFILE_FORMATS, PYTHON_PROFILERS, profiler
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
 logger = logging.getLogger(__name__)
 
 MAX_DURATION = 90  # seconds
 GENERATE_JSON = 0
+PREVIEW_PROXY = ProxySettings(resolution=(270, 480), fps=15)
 
 
-def create_instagram_reel(config_file, media_dir, output_path, preview=False):
-    video_preprocessing = VideoPreprocessing()
-    video_preprocessing.cleanup_temp_files()
+def load_clips(video_preprocessing, config_file, media_dir, workers=None):
+    """Preprocess the config's entries, keeping the clips within MAX_DURATION."""
     clips = []
     total_duration = 0
-    for filename, entry in config_file.items():
-        try:
-            clip = video_preprocessing.process_entry(filename, entry, media_dir)
-            duration = clip.clip.duration
-            if total_duration + duration > MAX_DURATION:
-                logger.info(f"Skipping {filename}, would exceed max duration.")
-                continue
+    entries = video_preprocessing.process_entries(config_file, media_dir, workers)
+    for filename, clip, error in entries:
+        if error is not None:
+            logger.info(f"Error processing {filename}: {error}")
+            continue
 
-            clips.append(clip)
-            total_duration += duration
-        except Exception as e:
-            logger.info(f"Error processing {filename}: {e}")
+        duration = clip.clip.duration
+        if total_duration + duration > MAX_DURATION:
+            logger.info(f"Skipping {filename}, would exceed max duration.")
+            clip.clip.close()
+            continue
 
-    if not clips:
-        logger.info("No valid clips to process.")
+        clips.append(clip)
+        total_duration += duration
+    return clips
+
+
+def create_instagram_reel(
+    config_file,
+    media_dir,
+    output_path,
+    preview=False,
+    backend=RenderBackendEnum.MOVIEPY,
+    workers=None,
+    encoder_profile=None,
+    proxy: ProxySettings = PREVIEW_PROXY,
+    progress_callback=None,
+    fit_mode: FitModeEnum = None,
+):
+    if encoder_profile is None:
+        encoder_profile = (
+            EncoderProfileEnum.PREVIEW if preview else EncoderProfileEnum.PUBLISH
+        )
+
+    if backend == RenderBackendEnum.FFMPEG and not preview:
+        if fit_mode not in (None, FitModeEnum.BLACK):
+            logger.warning(
+                f"The ffmpeg backend always letterboxes on black, "
+                f"ignoring fit mode '{fit_mode}'."
+            )
+        FfmpegRenderer().render(
+            config_file, media_dir, output_path, MAX_DURATION, encoder_profile
+        )
         return
+
     video_postprocessing = VideoPostProcessing()
     if preview:
-        video_postprocessing.preview(clips)
-    else:
-        video_postprocessing.final_render(output_path, clips)
+        video_postprocessing.preview(
+            config_file,
+            media_dir,
+            MAX_DURATION,
+            encoder_profile,
+            proxy,
+            workers,
+            progress_callback,
+            fit_mode,
+        )
+        return
+
+    # The final render always works from full-resolution sources.
+    video_preprocessing = VideoPreprocessing(fit_mode=fit_mode)
+    video_preprocessing.cleanup_temp_files()
+    clips = load_clips(video_preprocessing, config_file, media_dir, workers)
+    if not clips:
+        logger.info("No valid clips to process.")
+        return
+    video_postprocessing.final_render(output_path, clips, encoder_profile, fit_mode)
     video_preprocessing.cleanup_temp_files()
 
     # TODO:
@@ -50,6 +104,11 @@ def create_instagram_reel(config_file, media_dir, output_path, preview=False):
     #     final_clip = final_clip.set_audio(audio)
 
 
+def parse_resolution(value):
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
 def arg_paser():
     parser = argparse.ArgumentParser(
         description="Validate JSON config file structure.",
@@ -66,6 +125,79 @@ def arg_paser():
         required=True,
         help="Full path to the dir with media.",
     )
+    parser.add_argument(
+        "--output_path",
+        type=str,
+        default="test_output.mp4",
+        help="Where to write the reel.",
+    )
+    parser.add_argument(
+        "--backend",
+        type=RenderBackendEnum,
+        choices=list(RenderBackendEnum),
+        default=RenderBackendEnum.MOVIEPY,
+        help="Final render backend: frame by frame in MoviePy or a single ffmpeg filtergraph.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Parallel workers for preprocessing and preview rendering (default: from CPU count).",
+    )
+    parser.add_argument(
+        "--encoder_profile",
+        type=EncoderProfileEnum,
+        choices=list(EncoderProfileEnum),
+        default=None,
+        help="Speed/quality preset (default: preview for previews, publish otherwise).",
+    )
+    parser.add_argument(
+        "--fit_mode",
+        type=FitModeEnum,
+        choices=list(FitModeEnum),
+        default=None,
+        help="How clips that are not 9:16 fill the frame: black bars, a blurred background or a crop (default: black bars for videos, a blurred background for photos).",
+    )
+    parser.add_argument(
+        "--preview",
+        action="store_true",
+        help="Render per-clip previews into the preview folder instead of the reel.",
+    )
+    parser.add_argument(
+        "--proxy_resolution",
+        type=parse_resolution,
+        default=PREVIEW_PROXY.resolution,
+        help="Preview proxy size as WIDTHxHEIGHT, e.g. 270x480.",
+    )
+    parser.add_argument(
+        "--proxy_fps",
+        type=int,
+        default=PREVIEW_PROXY.fps,
+        help="Preview proxy frame rate.",
+    )
+    parser.add_argument(
+        "--no_proxy",
+        action="store_true",
+        help="Render previews at full resolution and frame rate.",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        help="Record per-stage timings, frame counters and memory to this file.",
+    )
+    parser.add_argument(
+        "--profile_format",
+        choices=PROFILE_FORMATS,
+        default="chrome",
+        help="chrome: trace for chrome://tracing or Perfetto, json: summary and spans.",
+    )
+    parser.add_argument(
+        "--python_profiler",
+        choices=PYTHON_PROFILERS,
+        default=None,
+        help="Also run a Python profiler, saved next to the --profile file.",
+    )
     return parser.parse_args()
 
 
@@ -74,5 +206,26 @@ if __name__ == "__main__":
         json_template_generator()
     else:
         args = arg_paser()
-        json_file = pars_config(args.config_path)
-        create_instagram_reel(json_file, args.media_dir, "test_output.mp4")
+        if args.profile:
+            profiler.start(args.python_profiler)
+        try:
+            json_file = pars_config(args.config_path)
+            create_instagram_reel(
+                json_file,
+                args.media_dir,
+                args.output_path,
+                preview=args.preview,
+                backend=args.backend,
+                workers=args.workers,
+                encoder_profile=args.encoder_profile,
+                fit_mode=args.fit_mode,
+                proxy=None
+                if args.no_proxy
+                else ProxySettings(args.proxy_resolution, args.proxy_fps),
+            )
+        finally:
+            if args.profile:
+                profiler.stop()
+                profiler.log_summary(logger)
+                profiler.export(args.profile, args.profile_format)
+                logger.info(f"Profile written to: {args.profile}")
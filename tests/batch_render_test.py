@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+from batch_render import BatchRenderer, load_jobs
+from utils.cache_utils import CACHE_DIR_ENV
+from utils.data_structures import (
+    BatchStatusEnum,
+    EncoderProfileEnum,
+    MediaClip,
+    TransitionTypeEnum,
+    VisionDataTypeEnum,
+)
+from utils.json_handler import media_clips_to_json
+
+
+class TestBatchRender(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        # Keep every cache out of the developer's cache directory
+        cache_env = mock.patch.dict(
+            os.environ, {CACHE_DIR_ENV: os.path.join(self.temp_dir.name, "cache")}
+        )
+        cache_env.start()
+        self.addCleanup(cache_env.stop)
+        self.root = self.temp_dir.name
+        self.media_dir = os.path.join(self.root, "media")
+        self.config_dir = os.path.join(self.root, "configs")
+        os.makedirs(self.media_dir)
+        os.makedirs(self.config_dir)
+        Image.new("RGB", (64, 48), "red").save(os.path.join(self.media_dir, "a.png"))
+        clip = MediaClip(0, 1, TransitionTypeEnum.NONE, VisionDataTypeEnum.PHOTO, 0)
+        media_clips_to_json({"a.png": clip}, os.path.join(self.config_dir, "reel.json"))
+        media_clips_to_json(
+            {"missing.png": clip}, os.path.join(self.config_dir, "empty.json")
+        )
+
+    def test_manifest_paths_are_relative_to_it(self):
+        manifest = os.path.join(self.root, "jobs.json")
+        with open(manifest, "w") as f:
+            json.dump(
+                {"jobs": [{"config": "configs/reel.json", "media_dir": "media"}]}, f
+            )
+        (job,) = load_jobs(manifest, output_dir="out")
+        self.assertEqual(job.name, "reel")
+        self.assertEqual(job.media_dir, self.media_dir)
+        self.assertEqual(job.output_path, os.path.join("out", "reel.mp4"))
+
+    def test_renders_then_skips_up_to_date_outputs(self):
+        output_dir = os.path.join(self.root, "out")
+        jobs = load_jobs(self.config_dir, self.media_dir, output_dir)
+        renderer = BatchRenderer(encoder_profile=EncoderProfileEnum.DRAFT, max_jobs=1)
+
+        summary = renderer.run(jobs)
+        statuses = {job["name"]: job["status"] for job in summary["jobs"]}
+        self.assertEqual(
+            statuses, {"empty": BatchStatusEnum.EMPTY, "reel": BatchStatusEnum.RENDERED}
+        )
+        self.assertIn("render", summary["jobs"][1]["stages"])
+        self.assertTrue(os.path.exists(os.path.join(output_dir, "reel.mp4")))
+        self.assertEqual(
+            sorted(os.listdir(output_dir)), ["reel.mp4", "reel.mp4.render.json"]
+        )
+
+        summary = renderer.run(jobs)
+        self.assertEqual(summary["counts"][BatchStatusEnum.SKIPPED], 1)
+        self.assertEqual(summary["counts"][BatchStatusEnum.EMPTY], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import unittest
+from collections import deque
+
+from components.gui_components.frame_presenter import FramePresenter
+
+
+class FakeSource:
+    def __init__(self, indices):
+        self.frames = deque(indices)
+
+    def peek(self):
+        return self.frames[0] if self.frames else None
+
+    def read(self):
+        index = self.frames.popleft()
+        return index, f"frame {index}"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFramePresenter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.presenter = FramePresenter(FakeSource(range(100)), 10, clock=self.clock)
+        self.presenter.start(0)
+
+    def test_presents_frames_on_time(self):
+        self.assertEqual(self.presenter.next_frame()[0], 0)
+        self.assertIsNone(self.presenter.next_frame())  # frame 0 still due
+        self.clock.now += 0.1
+        self.assertEqual(self.presenter.next_frame()[0], 1)
+        self.assertEqual(self.presenter.dropped_frames, 0)
+
+    def test_drops_frames_when_behind(self):
+        self.presenter.next_frame()
+        self.clock.now += 0.55  # frame 5 is due
+        self.assertEqual(self.presenter.next_frame()[0], 5)
+        self.assertEqual(self.presenter.dropped_frames, 4)
+        self.assertAlmostEqual(self.presenter.achieved_fps, 2 / 0.55)
+
+    def test_delay_until_next_frame(self):
+        self.presenter.next_frame()
+        self.clock.now += 0.03
+        self.assertEqual(self.presenter.delay_ms(), 70)
+
+    def test_waits_for_seek_without_dropping(self):
+        presenter = FramePresenter(FakeSource([40, 41]), 10, clock=self.clock)
+        presenter.start(40)
+        self.clock.now += 2  # decoder was slow to deliver the sought frame
+        self.assertEqual(presenter.next_frame()[0], 40)
+        self.assertEqual(presenter.dropped_frames, 0)
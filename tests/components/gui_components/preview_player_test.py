@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import unittest
+
+import cv2
+import numpy as np
+
+from components.gui_components.preview_player import PreviewPlayer
+
+
+def write_video(path, frames, value):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 15, (64, 48))
+    for i in range(frames):
+        writer.write(np.full((48, 64, 3), value + i, dtype=np.uint8))
+    writer.release()
+
+
+class TestPreviewPlayer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.files = [
+            os.path.join(self.temp_dir.name, name) for name in ("a.avi", "b.avi")
+        ]
+        write_video(self.files[0], 10, 0)
+        write_video(self.files[1], 10, 100)
+        self.player = PreviewPlayer(self.files, (32, 24), buffer_frames=4).start()
+
+    def tearDown(self):
+        self.player.stop()
+        self.player.thread.join(timeout=5)
+        self.temp_dir.cleanup()
+
+    def read(self):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            item = self.player.read()
+            if item is not None:
+                return item
+            time.sleep(0.001)
+        self.fail("no frame decoded")
+
+    def test_plays_files_back_to_back(self):
+        self.assertEqual(self.player.total_frames, 20)
+        indices = [self.read()[0] for _ in range(20)]
+        self.assertEqual(indices, list(range(20)))
+        self.assertEqual(self.player.ring.shape[0], 4)
+
+    def test_seek_into_second_file(self):
+        self.player.seek(12)
+        index, frame = self.read()
+        self.assertEqual(index, 12)
+        self.assertEqual(frame.shape, (24, 32, 3))
+        self.assertGreater(frame.mean(), 90)
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import unittest
+
+from components.gui_components.text_handler import LogSink
+
+
+class TestLogSink(unittest.TestCase):
+    def test_batches_inserts_and_coalesces_progress(self):
+        sink = LogSink(text_widget=None)
+        for text in ("a\n", "b\n", "\r 10%", "\r 50%", "\r 90%", "done\n"):
+            sink.write(text)
+        self.assertEqual(
+            sink._batch(),
+            [("insert", "a\nb\n"), ("replace", "90%"), ("insert", "done\n")],
+        )
+        self.assertEqual(sink._batch(), [])
+
+    def test_clear_drops_earlier_writes(self):
+        sink = LogSink(text_widget=None)
+        sink.write("old\n")
+        sink.clear()
+        sink.write("new\n")
+        self.assertEqual(sink._batch(), [("clear", ""), ("insert", "new\n")])
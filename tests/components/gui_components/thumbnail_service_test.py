@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import unittest
+
+from PIL import Image
+
+from components.gui_components.thumbnail_service import (
+    ThumbnailService,
+    thumbnail_timestamps,
+)
+from utils.data_structures import VisionDataTypeEnum
+from utils.file_cache import FileCache
+
+
+class TestThumbnailService(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.photos = []
+        for i, color in enumerate(("red", "blue")):
+            path = os.path.join(self.temp_dir.name, f"photo{i}.png")
+            Image.new("RGB", (90, 160), color).save(path)
+            self.photos.append(path)
+        cache = FileCache(
+            "thumbnails", ".jpg", cache_dir=os.path.join(self.temp_dir.name, "cache")
+        )
+        self.service = ThumbnailService(height=32, memory_items=1, cache=cache)
+        self.addCleanup(self.service.shutdown)
+
+    def fetch(self, path):
+        ready = threading.Event()
+        images = []
+
+        def callback(image):
+            images.append(image)
+            ready.set()
+
+        image = self.service.request(
+            path, 0, callback, media_type=VisionDataTypeEnum.PHOTO
+        )
+        if image is None:
+            self.assertTrue(ready.wait(5))
+            image = images[0]
+        return image
+
+    def test_tile_is_downscaled_and_cached(self):
+        image = self.fetch(self.photos[0])
+        self.assertEqual(image.size, (18, 32))
+        self.assertEqual(len(self.service.cache.entries()), 1)
+        # Served from memory now
+        self.assertIs(
+            self.service.request(
+                self.photos[0], 0, None, media_type=VisionDataTypeEnum.PHOTO
+            ),
+            image,
+        )
+
+    def test_memory_is_bounded(self):
+        self.fetch(self.photos[0])
+        self.fetch(self.photos[1])
+        self.assertEqual(len(self.service.memory), 1)
+        # The evicted tile comes back from the disk cache
+        self.assertEqual(self.fetch(self.photos[0]).size, (18, 32))
+        self.assertEqual(len(self.service.cache.entries()), 2)
+
+    def test_missing_source(self):
+        missing = os.path.join(self.temp_dir.name, "missing.png")
+        self.assertIsNone(self.service.request(missing, 0, None))
+        self.assertEqual(self.service.pending, {})
+
+    def test_timestamps(self):
+        self.assertEqual(thumbnail_timestamps(2, 6, 4), [2, 3, 4, 5])
+        self.assertEqual(thumbnail_timestamps(0, 1, 3), [0, 0.3, 0.7])
+        self.assertEqual(thumbnail_timestamps(0, 5, 0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import unittest
+
+from components.gui_components.timeline_model import TimelineModel
+from utils.data_structures import (
+    MediaClip,
+    TimelineItem,
+    TransitionTypeEnum,
+    VisionDataTypeEnum,
+)
+
+
+def make_item(item_id, start, end):
+    info = MediaClip(
+        0, end - start, TransitionTypeEnum.NONE, VisionDataTypeEnum.VIDEO, 0
+    )
+    return TimelineItem(item_id, f"clip{item_id}.mp4", start, end, info)
+
+
+class TestTimelineModel(unittest.TestCase):
+    def setUp(self):
+        self.timeline = TimelineModel()
+        # Added out of order, with a gap between 20 and 30
+        for item_id, (start, end) in enumerate([(10, 20), (0, 10), (30, 40)]):
+            self.timeline.add(make_item(item_id, start, end))
+
+    def test_items_sorted_by_start(self):
+        self.assertEqual([item.item_id for item in self.timeline], [1, 0, 2])
+        self.assertEqual(self.timeline.end, 40)
+
+    def test_overlaps_ignores_the_item_itself(self):
+        self.assertFalse(self.timeline.overlaps(0, 12, 22))
+        self.assertFalse(self.timeline.overlaps(0, 20, 30))
+        self.assertTrue(self.timeline.overlaps(0, 5, 15))
+        self.assertTrue(self.timeline.overlaps(0, 25, 31))
+        self.assertTrue(self.timeline.overlaps(2, 15, 25))
+
+    def test_move_keeps_order(self):
+        self.timeline.move(1, 45, 55)
+        self.assertEqual([item.item_id for item in self.timeline], [0, 2, 1])
+        self.assertEqual(self.timeline.end, 55)
+        self.assertFalse(self.timeline.overlaps(0, 0, 20))
+
+    def visible_ids(self, start, end):
+        return [item.item_id for item in self.timeline.visible(start, end)]
+
+    def test_visible(self):
+        self.assertEqual(self.visible_ids(0, 5), [1])
+        self.assertEqual(self.visible_ids(10, 30), [0])
+        self.assertEqual(self.visible_ids(15, 35), [0, 2])
+        self.assertEqual(self.visible_ids(22, 28), [])
+        self.assertEqual(self.visible_ids(-10, 100), [1, 0, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
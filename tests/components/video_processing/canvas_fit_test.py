@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+
+from components.video_processing.canvas_fit import CanvasFit, cover_rect, fit_rect
+from utils.data_structures import FitModeEnum
+
+
+class TestCanvasFit(unittest.TestCase):
+    def setUp(self):
+        # 80x40 landscape frame, left half dark and right half bright
+        self.frame = np.full((40, 80, 3), 200, dtype=np.uint8)
+        self.frame[:, :40] = 50
+
+    def test_rects(self):
+        self.assertEqual(fit_rect((80, 40), (20, 40)), (0, 15, 20, 10))
+        self.assertEqual(fit_rect((20, 40), (20, 40)), (0, 0, 20, 40))
+        self.assertEqual(cover_rect((80, 40), (20, 40)), (30, 0, 20, 40))
+        self.assertEqual(cover_rect((20, 80), (20, 40)), (0, 20, 20, 40))
+
+    def test_matching_size_is_passed_through(self):
+        canvas_fit = CanvasFit((80, 40), (80, 40), FitModeEnum.BLUR)
+        self.assertTrue(canvas_fit.passthrough)
+        self.assertIs(canvas_fit.fit(self.frame).base, self.frame)
+
+    def test_black_letterbox_reuses_canvas(self):
+        canvas_fit = CanvasFit((80, 40), (20, 40))
+        fitted = canvas_fit.fit(self.frame)
+        self.assertEqual(fitted.shape, (40, 20, 3))
+        self.assertEqual(fitted[:15].max(), 0)
+        self.assertEqual(fitted[25:].max(), 0)
+        self.assertEqual(fitted[15:25, 15:].min(), 200)
+        self.assertIs(canvas_fit.fit(self.frame), fitted)
+
+    def test_blur_fills_the_bars(self):
+        fitted = CanvasFit((80, 40), (20, 40), FitModeEnum.BLUR).fit(self.frame)
+        # The bars show the blurred center of the frame, half dark, half bright
+        self.assertGreaterEqual(fitted[:15].min(), 50)
+        self.assertLessEqual(fitted[:15].max(), 200)
+        self.assertEqual(fitted[15:25, 15:].min(), 200)
+
+    def test_crop_fills_the_canvas(self):
+        fitted = CanvasFit((80, 40), (20, 40), FitModeEnum.CROP).fit(self.frame)
+        self.assertEqual(fitted.shape, (40, 20, 3))
+        # Columns 30..50 of the source: the seam lands in the middle
+        np.testing.assert_array_equal(fitted[:, :9], 50)
+        np.testing.assert_array_equal(fitted[:, 11:], 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
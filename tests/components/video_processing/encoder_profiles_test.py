@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from components.video_processing.encoder_profiles import resolve_profile
+from utils.cache_utils import CACHE_DIR_ENV
+from utils.data_structures import EncoderProfileEnum
+
+
+class TestEncoderProfiles(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        # Keep every cache out of the developer's cache directory
+        cache_env = mock.patch.dict(
+            os.environ, {CACHE_DIR_ENV: os.path.join(self.temp_dir.name, "cache")}
+        )
+        cache_env.start()
+        self.addCleanup(cache_env.stop)
+
+    def test_software_preview_uses_ultrafast(self):
+        profile = resolve_profile(EncoderProfileEnum.PREVIEW, hardware=False)
+        self.assertEqual(profile.codec, "libx264")
+        self.assertEqual(profile.preset, "ultrafast")
+
+    def test_hardware_profile_uses_nvenc(self):
+        profile = resolve_profile("publish", hardware=True)
+        self.assertEqual(profile.codec, "h264_nvenc")
+        self.assertIn("-cq", profile.ffmpeg_args())
+
+    def test_threads_are_positive(self):
+        for name in EncoderProfileEnum:
+            self.assertGreaterEqual(resolve_profile(name, hardware=False).threads, 1)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from components.video_processing.ffmpeg_renderer import FfmpegRenderer
+from utils.cache_utils import CACHE_DIR_ENV
+from utils.data_structures import (
+    FfmpegInput,
+    MediaClip,
+    TransitionTypeEnum,
+    VisionDataTypeEnum,
+)
+
+
+def make_input(path, duration, transition, media_type=VisionDataTypeEnum.PHOTO):
+    entry = MediaClip(
+        start=0,
+        end=duration,
+        transition=transition,
+        type=media_type,
+        video_resampling=0,
+    )
+    return FfmpegInput(path, entry, duration, has_audio=False)
+
+
+class TestFfmpegRenderer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        # Keep every cache out of the developer's cache directory
+        cache_env = mock.patch.dict(
+            os.environ, {CACHE_DIR_ENV: os.path.join(self.temp_dir.name, "cache")}
+        )
+        cache_env.start()
+        self.addCleanup(cache_env.stop)
+        self.renderer = FfmpegRenderer()
+        self.inputs = [
+            make_input("a.mp4", 3, TransitionTypeEnum.SLIDE, VisionDataTypeEnum.VIDEO),
+            make_input("b.jpg", 2, TransitionTypeEnum.FADE),
+            make_input("c.jpg", 2, TransitionTypeEnum.NONE),
+        ]
+
+    def test_plan_transitions(self):
+        self.assertEqual(
+            self.renderer.plan_transitions(self.inputs),
+            [(0, 0, 1), (0, 1, 0), (1, 0, 0)],
+        )
+
+    def test_filter_graph_joins_all_inputs(self):
+        graph, video_label, audio_label = self.renderer.build_filter_graph(self.inputs)
+
+        self.assertIn(
+            "[v0][v1]xfade=transition=slideleft:duration=1.000:offset=2.000[vj1]",
+            graph,
+        )
+        self.assertIn("concat=n=2:v=1:a=1[vc2][aj2]", graph)
+        self.assertIn("fade=t=out:st=1.000:d=1.000", graph)
+        self.assertIn("fade=t=in:st=0:d=1.000", graph)
+        self.assertEqual((video_label, audio_label), ("vj2", "aj2"))
+
+    def test_input_args(self):
+        video, photo = self.inputs[0], self.inputs[1]
+        self.assertEqual(
+            self.renderer.input_args(video),
+            ["-ss", "0.000", "-t", "3.000", "-i", "a.mp4"],
+        )
+        self.assertEqual(self.renderer.input_args(photo)[:2], ["-loop", "1"])
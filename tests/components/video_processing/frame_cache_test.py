@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+from moviepy.video.VideoClip import VideoClip
+
+from components.video_processing.frame_cache import FrameCache
+from components.video_processing.video_postprocessing import VideoPostProcessing
+from utils.data_structures import LoadedVideo
+
+
+class TestFrameCache(unittest.TestCase):
+    def test_copies_on_insert_and_shares_read_only(self):
+        cache = FrameCache()
+        source = np.zeros((2, 2, 3), dtype=np.uint8)
+        frame = cache.get(("clip", 0), lambda: source)
+        source[:] = 255  # a decoder reusing its buffer
+        self.assertEqual(frame.max(), 0)
+        self.assertFalse(frame.flags.writeable)
+        self.assertIs(cache.get(("clip", 0), lambda: source), frame)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evicts_least_recently_used_over_budget(self):
+        frame_bytes = 2 * 2 * 3
+        cache = FrameCache(max_bytes=2 * frame_bytes)
+        for index in range(3):
+            if index == 2:
+                cache.get(("clip", 0), None)  # refresh frame 0
+            cache.get(("clip", index), lambda: np.zeros((2, 2, 3), np.uint8))
+        self.assertEqual(list(cache.frames), [("clip", 0), ("clip", 2)])
+        self.assertEqual(cache.bytes, 2 * frame_bytes)
+
+
+class TestResizeAndCenter(unittest.TestCase):
+    def make_loaded(self, fps):
+        decoded = []
+
+        def make_frame(t):
+            decoded.append(t)
+            return np.full((40, 80, 3), 200, dtype=np.uint8)
+
+        clip = VideoClip(make_frame, duration=1)
+        clip.fps = 30
+        decoded.clear()  # VideoClip reads the first frame for its size
+        return LoadedVideo(clip=clip, fps=fps), decoded
+
+    def test_fits_frame_into_letterbox(self):
+        loaded, _ = self.make_loaded(fps=None)
+        frame = VideoPostProcessing.resize_and_center(loaded, (20, 40)).clip.get_frame(
+            0
+        )
+        self.assertEqual(frame.shape, (40, 20, 3))
+        # 80x40 fitted to a width of 20 is 20x10, centered vertically
+        self.assertEqual(frame[15:25].min(), 200)
+        self.assertEqual(frame[:15].max(), 0)
+        self.assertEqual(frame[25:].max(), 0)
+
+    def fit_and_play(self, loaded, cache):
+        clip = VideoPostProcessing.resize_and_center(loaded, (20, 40), cache, 30).clip
+        for i in range(30):
+            clip.get_frame(i / 30)
+
+    def test_repeated_source_frames_are_fitted_once(self):
+        # A 15 fps source shown at 30 fps repeats every frame
+        for fps, fitted in ((15, 15), (None, 1)):
+            cache = FrameCache()
+            loaded, _ = self.make_loaded(fps)
+            self.fit_and_play(loaded, cache)
+            self.assertEqual(cache.misses, fitted)
+            self.assertEqual(cache.hits + cache.misses, 31)  # and the size probe
+
+    def test_full_rate_sources_are_not_cached(self):
+        cache = FrameCache()
+        loaded, _ = self.make_loaded(fps=30)
+        self.fit_and_play(loaded, cache)
+        self.assertEqual(cache.hits + cache.misses, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+from components.video_processing import render_scheduler
+from components.video_processing.render_scheduler import RenderScheduler
+from utils.data_structures import (
+    EncoderProfile,
+    MediaClip,
+    PreviewJob,
+    TransitionTypeEnum,
+    VisionDataTypeEnum,
+)
+
+
+def make_job(filename):
+    entry = MediaClip(
+        start=0,
+        end=1,
+        transition=TransitionTypeEnum.NONE,
+        type=VisionDataTypeEnum.PHOTO,
+        video_resampling=0,
+    )
+    profile = EncoderProfile("libx264", "ultrafast", [], threads=16)
+    return PreviewJob(filename, filename, entry, "media", f"{filename}.mp4", profile)
+
+
+def fake_render(job):
+    if job.filename == "broken":
+        raise RuntimeError("cannot decode")
+    return job.profile.threads
+
+
+class TestRenderScheduler(unittest.TestCase):
+    def test_worker_count_is_bounded_by_jobs(self):
+        self.assertEqual(RenderScheduler(max_workers=8).worker_count(3), 3)
+        self.assertEqual(RenderScheduler(max_workers=8).worker_count(1), 1)
+
+    def test_reports_progress_and_failures(self):
+        reported = []
+        scheduler = RenderScheduler(max_workers=1, progress_callback=reported.append)
+        results = scheduler.run(fake_render, [make_job("a"), make_job("broken")])
+
+        self.assertEqual([p.completed for p in reported], [1, 2])
+        self.assertEqual(results[0].duration, scheduler.threads_per_worker(1))
+        self.assertIsInstance(results[1].error, RuntimeError)
+
+
+MEMINFO = """MemTotal:       16000000 kB
+MemFree:          500000 kB
+MemAvailable:    6000000 kB
+"""
+
+
+class TestAvailableMemory(unittest.TestCase):
+    def test_counts_reclaimable_page_cache(self):
+        with mock.patch("builtins.open", mock.mock_open(read_data=MEMINFO)):
+            self.assertEqual(render_scheduler.available_memory(), 6000000 * 1024)
+
+    def test_falls_back_without_meminfo(self):
+        with (
+            mock.patch("builtins.open", side_effect=FileNotFoundError),
+            mock.patch.dict("sys.modules", {"psutil": None}),
+            mock.patch.object(render_scheduler.os, "sysconf", return_value=4),
+        ):
+            self.assertEqual(render_scheduler.available_memory(), 16)
+
+    def test_page_cache_does_not_shrink_the_pool(self):
+        scheduler = RenderScheduler(memory_per_worker=1024**3)
+        with (
+            mock.patch("builtins.open", mock.mock_open(read_data=MEMINFO)),
+            mock.patch.object(scheduler, "cpus", return_value=64),
+        ):
+            # 5.7 GB available, not the 0.5 GB that is free
+            self.assertEqual(scheduler.worker_count(8), 5)
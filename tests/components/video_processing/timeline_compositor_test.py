@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+from moviepy.video.VideoClip import ImageClip
+
+from components.video_processing.timeline_compositor import TimelineCompositor
+from utils.data_structures import LoadedVideo, TransitionTypeEnum
+
+
+def make_clip(value, duration, transition):
+    frame = np.full((16, 8, 3), value, dtype=np.uint8)
+    return LoadedVideo(
+        clip=ImageClip(frame).set_duration(duration).set_fps(30),
+        transition=transition,
+    )
+
+
+class TestTimelineCompositor(unittest.TestCase):
+    def setUp(self):
+        self.compositor = TimelineCompositor()
+
+    def test_overlapping_transition_shortens_timeline(self):
+        clips = [
+            make_clip(200, 3, TransitionTypeEnum.SLIDE),
+            make_clip(100, 2, TransitionTypeEnum.NONE),
+        ]
+        segments, positions = self.compositor.build_segments(clips, duration=1)
+
+        self.assertEqual(positions, [0, 2])
+        self.assertEqual([(s.start, s.end) for s in segments], [(0, 2), (2, 3), (3, 4)])
+        self.assertIs(segments[1].next_clip, clips[1].clip)
+
+    def test_fade_keeps_clip_lengths(self):
+        clips = [
+            make_clip(200, 2, TransitionTypeEnum.FADE),
+            make_clip(100, 2, TransitionTypeEnum.NONE),
+        ]
+        final_clip = self.compositor.compose(clips, duration=1)
+
+        self.assertEqual(final_clip.duration, 4)
+        self.assertEqual(final_clip.get_frame(0.5).max(), 200)
+        self.assertEqual(final_clip.get_frame(1.5).max(), 100)
+        self.assertEqual(final_clip.get_frame(2.5).max(), 50)
+        self.assertEqual(final_clip.get_frame(3.5).max(), 100)
+
+    def test_segments_are_contiguous(self):
+        clips = [
+            make_clip(10, 1.5, TransitionTypeEnum.ZOOM),
+            make_clip(20, 0.5, TransitionTypeEnum.FADE),
+            make_clip(30, 2, TransitionTypeEnum.SPIN),
+            make_clip(40, 2, TransitionTypeEnum.NONE),
+        ]
+        segments, _ = self.compositor.build_segments(clips, duration=1)
+
+        for previous, current in zip(segments, segments[1:]):
+            self.assertAlmostEqual(previous.end, current.start)
+        self.assertTrue(all(s.duration > 0 for s in segments))
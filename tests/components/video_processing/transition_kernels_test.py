@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+
+from components.video_processing import transition_kernels
+from components.video_processing.transition_kernels import FrameBuffers
+
+
+class TestTransitionKernels(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.frame1 = rng.integers(0, 256, (8, 12, 3), dtype=np.uint8)
+        self.frame2 = rng.integers(0, 256, (8, 12, 3), dtype=np.uint8)
+        self.out = np.empty_like(self.frame1)
+
+    def test_blend_endpoints(self):
+        transition_kernels.blend(self.frame1, self.frame2, 0, self.out)
+        np.testing.assert_array_equal(self.out, self.frame1)
+        transition_kernels.blend(self.frame1, self.frame2, 1, self.out)
+        np.testing.assert_array_equal(self.out, self.frame2)
+
+    def test_slide_without_seam(self):
+        transition_kernels.slide(self.frame1, self.frame2, 0.25, 0, self.out)
+        np.testing.assert_array_equal(self.out[:, :9], self.frame1[:, 3:])
+        np.testing.assert_array_equal(self.out[:, 9:], self.frame2[:, :3])
+
+    def test_slide_seam_matches_column_loop(self):
+        blend_width = 4
+        transition_kernels.slide(self.frame1, self.frame2, 0.5, blend_width, self.out)
+        for bw in range(blend_width):
+            alpha = bw / blend_width
+            expected = (
+                self.frame1[:, 6 + bw] * (1 - alpha) + self.frame2[:, 2 + bw] * alpha
+            )
+            np.testing.assert_allclose(self.out[:, 2 + bw], expected, atol=1)
+        np.testing.assert_array_equal(self.out[:, 6:10], 0)
+
+    def test_zoom_rect_identity(self):
+        rect = transition_kernels.zoom_rect((12, 8), (12, 8), 1.0)
+        self.assertEqual(rect, (0, 12, 0, 12, 0, 8, 0, 8))
+        transition_kernels.apply_zoom(self.frame1, rect, self.out)
+        np.testing.assert_array_equal(self.out, self.frame1)
+
+    def test_zoom_out_pads_with_black(self):
+        rect = transition_kernels.zoom_rect((12, 8), (12, 8), 0.5)
+        self.assertEqual(rect, (0, 12, 3, 9, 0, 8, 2, 6))
+        transition_kernels.apply_zoom(self.frame1, rect, self.out)
+        np.testing.assert_array_equal(self.out[:2], 0)
+        np.testing.assert_array_equal(self.out[:, 9:], 0)
+
+    def test_schedules_are_cached(self):
+        schedule = transition_kernels.rotation_schedule((12, 8), (12, 8), 5, 0, 360)
+        self.assertEqual(schedule.shape, (5, 2, 3))
+        self.assertIs(
+            transition_kernels.rotation_schedule((12, 8), (12, 8), 5, 0, 360),
+            schedule,
+        )
+
+    def test_buffers_are_reused(self):
+        buffers = FrameBuffers()
+        first = buffers.get("out", (2, 2, 3))
+        self.assertIs(buffers.get("out", (2, 2, 3)), first)
+        self.assertIsNot(buffers.get("out", (4, 2, 3)), first)
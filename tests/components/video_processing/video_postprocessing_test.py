@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from dataclasses import replace
+from unittest import mock
+
+from components.video_processing.video_postprocessing import VideoPostProcessing
+from utils.cache_utils import CACHE_DIR_ENV
+from utils.data_structures import (
+    EncoderProfileEnum,
+    MediaClip,
+    ProxySettings,
+    TransitionTypeEnum,
+    VisionDataTypeEnum,
+)
+
+
+class TestPreviewFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # Keep every cache out of the developer's cache directory
+        cache_env = mock.patch.dict(
+            os.environ, {CACHE_DIR_ENV: os.path.join(self.temp_dir.name, "cache")}
+        )
+        cache_env.start()
+        self.addCleanup(cache_env.stop)
+        self.source = os.path.join(self.temp_dir.name, "photo.png")
+        with open(self.source, "wb") as f:
+            f.write(b"x")
+        self.entry = MediaClip(
+            start=0,
+            end=2,
+            transition=TransitionTypeEnum.NONE,
+            type=VisionDataTypeEnum.PHOTO,
+            video_resampling=0,
+        )
+        self.post = VideoPostProcessing()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def fingerprint(self, entry, proxy=None):
+        return self.post.preview_fingerprint(
+            self.source, entry, EncoderProfileEnum.PREVIEW, proxy
+        )
+
+    def test_trim_and_size_change_the_fingerprint(self):
+        base = self.fingerprint(self.entry)
+        self.assertNotEqual(base, self.fingerprint(replace(self.entry, end=3)))
+        self.assertNotEqual(base, self.fingerprint(self.entry, ProxySettings()))
+
+    def test_transition_does_not_change_the_fingerprint(self):
+        self.assertEqual(
+            self.fingerprint(self.entry),
+            self.fingerprint(replace(self.entry, transition=TransitionTypeEnum.FADE)),
+        )
+
+    def test_missing_source_has_no_fingerprint(self):
+        os.remove(self.source)
+        self.assertIsNone(self.fingerprint(self.entry))
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from components.video_processing import video_preprocessing
+from components.video_processing.video_preprocessing import VideoPreprocessing
+from utils.cache_utils import CACHE_DIR_ENV
+from utils.data_structures import (
+    FitModeEnum,
+    MediaClip,
+    ProxySettings,
+    TransitionTypeEnum,
+    VisionDataTypeEnum,
+)
+from utils.file_cache import FileCache
+
+
+class TestStillsCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # Keep every cache out of the developer's cache directory
+        cache_env = mock.patch.dict(
+            os.environ, {CACHE_DIR_ENV: os.path.join(self.temp_dir.name, "cache")}
+        )
+        cache_env.start()
+        self.addCleanup(cache_env.stop)
+        self.photo = os.path.join(self.temp_dir.name, "photo.png")
+        Image.new("RGB", (64, 48), (200, 100, 50)).save(self.photo)
+        self.stills_cache = FileCache(
+            "stills", ".npy", cache_dir=os.path.join(self.temp_dir.name, "stills")
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def preprocessing(self, proxy=None, fit_mode=None):
+        preprocessing = VideoPreprocessing(proxy, fit_mode)
+        preprocessing.stills_cache = self.stills_cache
+        return preprocessing
+
+    def test_formatted_once_and_memory_mapped(self):
+        save = mock.Mock(wraps=video_preprocessing.save_photo_to_vertical)
+        with mock.patch.object(video_preprocessing, "save_photo_to_vertical", save):
+            first = self.preprocessing().format_photo(self.photo)
+            second = self.preprocessing().format_photo(self.photo)
+        self.assertEqual(save.call_count, 1)
+        self.assertIsInstance(second, np.memmap)
+        self.assertFalse(second.flags.writeable)
+        self.assertEqual(second.shape, (1920, 1080, 3))
+        np.testing.assert_array_equal(first, second)
+        self.assertEqual(tuple(second[960, 540]), (200, 100, 50))
+
+    def test_resolution_and_source_change_the_key(self):
+        self.preprocessing().format_photo(self.photo)
+        proxy = ProxySettings(resolution=(54, 96), fps=15)
+        still = self.preprocessing(proxy).format_photo(self.photo)
+        self.assertEqual(still.shape, (96, 54, 3))
+        Image.new("RGB", (64, 48), (0, 0, 0)).save(self.photo)
+        os.utime(self.photo, ns=(0, 0))
+        self.assertEqual(self.preprocessing(proxy).format_photo(self.photo).max(), 0)
+        self.assertEqual(len(self.stills_cache.entries()), 3)
+
+    def test_photos_are_blurred_unless_a_fit_mode_is_chosen(self):
+        blurred = self.preprocessing().format_photo(self.photo)
+        black = self.preprocessing(fit_mode=FitModeEnum.BLACK).format_photo(self.photo)
+        self.assertEqual(black[0].max(), 0)
+        self.assertEqual(tuple(blurred[0, 0]), (200, 100, 50))
+        self.assertEqual(len(self.stills_cache.entries()), 2)
+
+    def test_photo_entry_plays_the_still(self):
+        entry = MediaClip(
+            start=0,
+            end=2,
+            transition=TransitionTypeEnum.NONE,
+            type=VisionDataTypeEnum.PHOTO,
+            video_resampling=0,
+        )
+        loaded = self.preprocessing(ProxySettings((54, 96), 15)).process_entry(
+            "photo.png", entry, self.temp_dir.name
+        )
+        self.assertEqual(loaded.clip.duration, 2)
+        self.assertEqual(tuple(loaded.clip.get_frame(1)[48, 27]), (200, 100, 50))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from components.video_processing.video_processing_utils import (
+    format_photo_to_vertical,
+    read_photo,
+)
+from utils.data_structures import FitModeEnum
+
+
+class TestFormatPhotoToVertical(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "photo.jpg")
+        # Landscape photo, red on the left half and blue on the right
+        pixels = np.zeros((300, 400, 3), dtype=np.uint8)
+        pixels[:, :200, 0] = 255
+        pixels[:, 200:, 2] = 255
+        Image.fromarray(pixels).save(self.path, quality=95)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_photo_over_blurred_cover(self):
+        frame = format_photo_to_vertical(self.path, (90, 160), FitModeEnum.BLUR)
+        self.assertEqual(frame.shape, (160, 90, 3))
+        # Foreground keeps the RGB order, the bars are not black
+        self.assertGreater(frame[80, 5, 0], 200)
+        self.assertGreater(frame[80, -5, 2], 200)
+        self.assertGreater(frame[:40].mean(), 50)
+
+    def test_large_photo_is_decoded_reduced(self):
+        self.assertEqual(read_photo(self.path, (90, 160)).shape, (150, 200, 3))
+        self.assertEqual(read_photo(self.path, (1080, 1920)).shape, (300, 400, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
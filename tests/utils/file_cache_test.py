@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from utils.file_cache import FileCache
+
+
+class TestFileCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = FileCache(
+            "test", extension=".bin", max_bytes=10, cache_dir=self.temp_dir.name
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def put(self, key, size):
+        partial_path = self.cache.partial_path_for(key)
+        with open(partial_path, "wb") as f:
+            f.write(b"x" * size)
+        return self.cache.put(key, partial_path, source=key)
+
+    def test_get_returns_put_file(self):
+        self.assertIsNone(self.cache.get("a"))
+        path = self.put("a", 4)
+        self.assertEqual(self.cache.get("a"), path)
+        self.assertEqual(self.cache.entries()["a"]["source"], "a")
+
+    def test_least_recently_used_is_evicted(self):
+        self.put("a", 4)
+        time.sleep(0.01)
+        self.put("b", 4)
+        time.sleep(0.01)
+        self.cache.get("a")
+        time.sleep(0.01)
+        self.put("c", 4)
+
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("c"))
+
+    def test_orphan_files_are_adopted(self):
+        with open(os.path.join(self.temp_dir.name, "orphan.bin"), "wb") as f:
+            f.write(b"x")
+        self.assertIn("orphan", self.cache.entries())
+        self.cache.clear()
+        self.assertEqual(
+            sorted(os.listdir(self.temp_dir.name)), ["index.json", "index.json.lock"]
+        )
+
+    def last_used(self, key):
+        with open(os.path.join(self.temp_dir.name, "index.json")) as f:
+            return json.load(f)[key]["last_used"]
+
+    def test_uses_are_written_in_batches(self):
+        self.put("a", 4)
+        written = self.last_used("a")
+        time.sleep(0.01)
+        self.cache.get("a")
+        self.assertEqual(self.last_used("a"), written)
+        self.cache.flush()
+        self.assertGreater(self.last_used("a"), written)
+
+    def test_directory_is_scanned_only_over_the_cap(self):
+        self.put("a", 4)
+        with mock.patch("utils.file_cache.os.listdir", wraps=os.listdir) as listdir:
+            self.put("b", 4)
+            self.cache.get("a")
+            listdir.assert_not_called()
+            self.put("c", 4)
+            listdir.assert_called()
+        self.assertEqual(self.cache.total_bytes, 8)
+
+    def test_caches_sharing_a_directory_keep_each_others_entries(self):
+        caches = [
+            FileCache("test", extension=".bin", cache_dir=self.temp_dir.name)
+            for _ in range(2)
+        ]
+
+        def fill(cache, prefix):
+            for i in range(20):
+                partial_path = cache.partial_path_for(f"{prefix}{i}")
+                with open(partial_path, "wb") as f:
+                    f.write(b"x")
+                cache.put(f"{prefix}{i}", partial_path)
+
+        threads = [
+            threading.Thread(target=fill, args=(cache, prefix))
+            for cache, prefix in zip(caches, "ab")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with open(os.path.join(self.temp_dir.name, "index.json")) as f:
+            self.assertEqual(len(json.load(f)), 40)
+
+    def test_worker_processes_do_not_evict(self):
+        with mock.patch(
+            "utils.file_cache.multiprocessing.parent_process", return_value=object()
+        ):
+            self.put("a", 8)
+            self.put("b", 8)
+        self.assertEqual(set(self.cache.entries()), {"a", "b"})
+        self.assertEqual(self.cache.evict(), ["a"])
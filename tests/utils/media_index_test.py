@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from utils.data_structures import MediaInfo
+from utils.media_index import MediaIndex, parse_frame_rate
+
+
+class TestMediaIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.media_path = os.path.join(self.temp_dir.name, "clip.mp4")
+        with open(self.media_path, "wb") as f:
+            f.write(b"x")
+        self.info = MediaInfo(
+            duration=4.0, r_frame_rate="30/1", avg_frame_rate="30000/1001", fps=29.97
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def index(self):
+        return MediaIndex(cache_dir=os.path.join(self.temp_dir.name, "index"))
+
+    def test_parse_frame_rate(self):
+        self.assertAlmostEqual(parse_frame_rate("30000/1001"), 29.97, places=2)
+        self.assertIsNone(parse_frame_rate("0/0"))
+        self.assertIsNone(parse_frame_rate(None))
+
+    def test_probes_once_across_instances(self):
+        with mock.patch(
+            "utils.media_index.probe_media_info", return_value=self.info
+        ) as probe:
+            self.assertEqual(self.index().probe(self.media_path), self.info)
+            self.assertEqual(self.index().probe(self.media_path), self.info)
+        self.assertEqual(probe.call_count, 1)
+        self.assertTrue(self.info.is_variable_framerate)
+
+    def test_changed_file_is_probed_again(self):
+        index = self.index()
+        with mock.patch(
+            "utils.media_index.probe_media_info", return_value=self.info
+        ) as probe:
+            index.probe(self.media_path)
+            with open(self.media_path, "ab") as f:
+                f.write(b"more")
+            index.probe(self.media_path)
+        self.assertEqual(probe.call_count, 2)
+
+    def test_failed_probe_is_left_out(self):
+        with mock.patch(
+            "utils.media_index.probe_media_info", side_effect=RuntimeError("bad")
+        ):
+            self.assertIsNone(self.index().probe(self.media_path))
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+
+from utils.profiling import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.profiler = Profiler()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def test_disabled_records_nothing(self):
+        with self.profiler.span("stage"):
+            pass
+        self.profiler.count("frames")
+        self.assertEqual(self.profiler.spans, [])
+        self.assertEqual(self.profiler.counters, {})
+
+    def test_spans_counters_and_memory(self):
+        @self.profiler.timed("decorated")
+        def work():
+            return 42
+
+        self.profiler.start()
+        with self.profiler.span("stage", file="a.mp4"):
+            self.assertEqual(work(), 42)
+        self.profiler.count("frames.clip0", 3)
+        self.profiler.stop()
+
+        summary = self.profiler.summary()
+        self.assertEqual(list(summary["spans"]), ["stage", "decorated"])
+        self.assertEqual(summary["spans"]["stage"]["count"], 1)
+        self.assertEqual(summary["counters"], {"frames.clip0": 3})
+        self.assertGreater(summary["peak_rss_mb"], 0)
+
+    def test_chrome_trace_export(self):
+        self.profiler.start("cprofile")
+        with self.profiler.span("stage", file="a.mp4"):
+            pass
+        self.profiler.stop()
+
+        path = os.path.join(self.temp_dir.name, "trace.json")
+        self.profiler.export(path)
+        with open(path) as f:
+            trace = json.load(f)
+        (span,) = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+        self.assertEqual(span["name"], "stage")
+        self.assertEqual(span["args"], {"file": "a.mp4"})
+        self.assertTrue(any(e["ph"] == "C" for e in trace["traceEvents"]))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, "trace.prof")))
+
+
+if __name__ == "__main__":
+    unittest.main()
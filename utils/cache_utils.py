@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+
+CACHE_DIR_ENV = "REEL_CREATOR_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "instagram_reel_creator"
+)
+
+
+def get_cache_dir(name):
+    """Return (and create) a named cache directory, overridable via env var."""
+    path = os.path.join(os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR), name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def file_identity(path):
+    """
+    Identify a file by its device, inode, size and mtime.
+
+    Two different files with the same name never share an identity, and editing a
+    file changes it, without hashing gigabytes of footage.
+    """
+    stat = os.stat(path)
+    return {
+        "device": stat.st_dev,
+        "inode": stat.st_ino,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def cache_key(*parts):
+    """Stable hex digest of JSON-serialisable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def write_json_atomic(path, data):
+    """Write JSON next to ``path`` and rename it in place."""
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(data, f, indent=4)
+    os.replace(temp_path, path)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass
 from enum import StrEnum
+from moviepy.video.VideoClip import VideoClip
 from moviepy.video.io.VideoFileClip import VideoFileClip
 
 
@@ -18,6 +20,36 @@ class TransitionTypeEnum(StrEnum):
     SPIN = "spin"
 
 
+class RenderBackendEnum(StrEnum):
+    MOVIEPY = "moviepy"
+    FFMPEG = "ffmpeg"
+
+
+class EncoderProfileEnum(StrEnum):
+    DRAFT = "draft"
+    PREVIEW = "preview"
+    PUBLISH = "publish"
+
+
+class FitModeEnum(StrEnum):
+    BLACK = "black"  # letterbox on black
+    BLUR = "blur"  # letterbox on a blurred, cropped copy of the frame
+    CROP = "crop"  # crop to fill the canvas
+
+
+class BatchStatusEnum(StrEnum):
+    RENDERED = "rendered"
+    SKIPPED = "skipped"  # output already up to date
+    EMPTY = "empty"  # no clip could be loaded
+    FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class ProxySettings:
+    resolution: tuple[int, int] = (270, 480)  # (width, height)
+    fps: int = 15
+
+
 @dataclass
 class MediaClip:
     start: float
@@ -31,3 +63,136 @@ class MediaClip:
 class LoadedVideo:
     clip: VideoFileClip = None
     transition: TransitionTypeEnum = None
+    fps: float = None  # frame rate of the opened source, None for stills
+    source_start: float = 0  # source time of the clip's first frame
+
+
+@dataclass
+class FfmpegInput:
+    path: str
+    entry: MediaClip
+    duration: float  # trimmed length on the timeline
+    has_audio: bool = False
+
+
+@dataclass
+class TimelineSegment:
+    start: float  # position on the timeline
+    end: float
+    clip: VideoClip
+    offset: float  # clip time at segment start
+    effect: Callable = None  # effect(frame, p, out) or blend(frame, next, p, out)
+    next_clip: VideoClip = None  # set only for overlapping transitions
+    next_offset: float = 0
+    label: str = None  # frame counter name, e.g. 'clip0' or 'zoom:clip0-clip1'
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+
+@dataclass
+class MediaInfo:
+    duration: float = None  # None for stills
+    width: int = None
+    height: int = None
+    r_frame_rate: str = None  # e.g. '30000/1001'
+    avg_frame_rate: str = None
+    fps: float = None  # average frame rate
+    rotation: int = 0  # degrees, from the display matrix or rotate tag
+    has_audio: bool = False
+
+    @property
+    def is_variable_framerate(self):
+        return (
+            self.r_frame_rate is not None
+            and self.avg_frame_rate is not None
+            and self.r_frame_rate != self.avg_frame_rate
+        )
+
+
+@dataclass
+class EncoderProfile:
+    codec: str
+    preset: str
+    quality_args: list[str]  # e.g. ['-crf', '18'] or ['-b:v', '8M']
+    threads: int
+    audio_bitrate: str = "192k"
+
+    def moviepy_kwargs(self):
+        """Keyword arguments for ``VideoClip.write_videofile``."""
+        return {
+            "codec": self.codec,
+            "preset": self.preset,
+            "ffmpeg_params": list(self.quality_args),
+            "threads": self.threads,
+            "audio_codec": "aac",
+            "audio_bitrate": self.audio_bitrate,
+        }
+
+    def ffmpeg_args(self):
+        """Output arguments for an ffmpeg command line."""
+        return [
+            "-c:v",
+            self.codec,
+            "-preset",
+            self.preset,
+            *self.quality_args,
+            "-threads",
+            str(self.threads),
+            "-c:a",
+            "aac",
+            "-b:a",
+            self.audio_bitrate,
+        ]
+
+
+@dataclass
+class PreviewJob:
+    key: str  # preview fingerprint
+    filename: str
+    entry: MediaClip
+    media_dir: str
+    output_path: str
+    profile: EncoderProfile
+    proxy: ProxySettings = None
+    fit_mode: FitModeEnum = None  # None: black bars, blurred photos
+
+
+@dataclass
+class PreviewProgress:
+    job: PreviewJob
+    completed: int
+    total: int
+    elapsed: float = 0  # seconds spent rendering this clip
+    duration: float = None  # rendered clip length
+    error: Exception = None
+
+
+@dataclass
+class TimelineItem:
+    item_id: int
+    filename: str
+    start: float  # position on the timeline
+    end: float
+    info: MediaClip
+    media: MediaInfo = None  # probed source, None for photos or when unknown
+
+
+@dataclass
+class BatchJob:
+    name: str
+    config_path: str
+    media_dir: str
+    output_path: str
+    backend: RenderBackendEnum = RenderBackendEnum.MOVIEPY
+    profile: EncoderProfile = None
+
+
+@dataclass
+class BatchResult:
+    job: BatchJob
+    status: BatchStatusEnum
+    elapsed: float = 0
+    stages: dict[str, float] = None  # {stage: seconds}
+    error: str = None
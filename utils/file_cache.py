@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing.util import Finalize
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from utils.cache_utils import get_cache_dir, write_json_atomic
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
+logger = logging.getLogger(__name__)
+
+
+class FileCache:
+    """
+    Persistent on-disk cache of generated files with a size cap.
+
+    Files live in a named directory under the cache root and are tracked in an
+    ``index.json`` with their size, metadata and last use. When the cache grows
+    over ``max_bytes`` the least recently used files are evicted. Files found on
+    disk but missing from the index (e.g. written by another process) are adopted
+    instead of being regenerated.
+
+    Several processes can share a cache: index updates hold a file lock, and
+    partial files are named per process and thread. Only the main process
+    evicts on ``put``, worker processes leave trimming to it.
+
+    The index is kept in memory along with its total size. ``get`` only marks
+    entries used there, uses are written back every ``FLUSH_EVERY_USES`` entries,
+    ``FLUSH_INTERVAL_SECONDS``, on ``put`` and when the process exits. The
+    directory is only scanned when the cache is loaded and when it is over its
+    cap.
+    """
+
+    INDEX_FILE = "index.json"
+    LOCK_SUFFIX = ".lock"
+    PARTIAL_MARKER = ".part"
+    STALE_PARTIAL_SECONDS = 60 * 60
+    FLUSH_EVERY_USES = 64
+    FLUSH_INTERVAL_SECONDS = 10
+
+    def __init__(self, name, extension="", max_bytes=None, cache_dir=None):
+        self.name = name
+        self.extension = extension
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir or get_cache_dir(name)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        self.lock = threading.Lock()
+        self.index = None  # loaded on first use
+        self.total_bytes = 0
+        self.unsaved = {}  # key -> entry used or adopted since the last write
+        self.last_write = time.monotonic()
+        self.logger = logging.getLogger(__name__)
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f"{key}{self.extension}")
+
+    def partial_path_for(self, key):
+        """Where to write a file before ``put`` moves it into the cache."""
+        return os.path.join(
+            self.cache_dir,
+            f"{key}{self.PARTIAL_MARKER}{os.getpid()}.{threading.get_ident()}"
+            f"{self.extension}",
+        )
+
+    def _load_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _is_cache_file(self, filename):
+        return (
+            not filename.startswith(self.INDEX_FILE)
+            and self.PARTIAL_MARKER not in filename
+            and not filename.endswith(".tmp")
+        )
+
+    @contextmanager
+    def _index_lock(self):
+        """Hold the index against other processes, if the platform can."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.index_path + self.LOCK_SUFFIX, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            yield  # released when the file is closed
+
+    def _write_index(self, changes=None, removed=()):
+        """
+        Apply ``changes``, ``removed`` and the unsaved entries to the index on
+        disk, which may have been updated by another process, and reload it.
+        """
+        with self._index_lock():
+            index = self._load_index()
+            for key in removed:
+                index.pop(key, None)
+                self.unsaved.pop(key, None)
+            for key, entry in self.unsaved.items():
+                if key in index:
+                    index[key]["last_used"] = max(
+                        index[key]["last_used"], entry["last_used"]
+                    )
+                else:
+                    index[key] = entry
+            index.update(changes or {})
+            if changes or removed or self.unsaved:
+                write_json_atomic(self.index_path, index)
+        self.unsaved = {}
+        _unsaved_caches.discard(self)
+        self.last_write = time.monotonic()
+        self.index = index
+        self.total_bytes = sum(entry["size"] for entry in index.values())
+
+    def _adopt_files(self):
+        """Add files on disk that are missing from the index."""
+        for filename in os.listdir(self.cache_dir):
+            key = os.path.splitext(filename)[0]
+            if not self._is_cache_file(filename) or key in self.index:
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            entry = {
+                "file": filename,
+                "size": os.path.getsize(path),
+                "last_used": os.path.getmtime(path),
+            }
+            self.index[key] = self.unsaved[key] = entry
+            _unsaved_caches.add(self)
+            self.total_bytes += entry["size"]
+
+    def _loaded_index(self):
+        if self.index is None:
+            self._remove_stale_partials()
+            self._write_index()
+            self._adopt_files()
+        return self.index
+
+    def get(self, key):
+        """Return the cached path for ``key`` and mark it used, or None."""
+        path = self.path_for(key)
+        with self.lock:
+            index = self._loaded_index()
+            if not os.path.exists(path):
+                if key in index:
+                    self._write_index(removed=[key])
+                return None
+
+            entry = index.get(key)
+            if entry is None:
+                entry = index[key] = {
+                    "file": os.path.basename(path),
+                    "size": os.path.getsize(path),
+                }
+                self.total_bytes += entry["size"]
+            entry["last_used"] = time.time()
+            self.unsaved[key] = entry
+            _unsaved_caches.add(self)
+            if (
+                len(self.unsaved) >= self.FLUSH_EVERY_USES
+                or time.monotonic() - self.last_write > self.FLUSH_INTERVAL_SECONDS
+            ):
+                self._write_index()
+        return path
+
+    def put(self, key, partial_path=None, **metadata):
+        """Move ``partial_path`` into the cache (if given) and record ``key``."""
+        path = self.path_for(key)
+        if partial_path is not None:
+            os.replace(partial_path, path)
+
+        with self.lock:
+            self._loaded_index()
+            entry = {
+                **metadata,
+                "file": os.path.basename(path),
+                "size": os.path.getsize(path),
+                "last_used": time.time(),
+            }
+            self._write_index({key: entry})
+            over_limit = (
+                self.max_bytes is not None and self.total_bytes > self.max_bytes
+            )
+        # Worker processes leave trimming to the main process.
+        if over_limit and multiprocessing.parent_process() is None:
+            self.evict()
+        return path
+
+    def flush(self):
+        """Write the uses recorded by ``get`` to the index."""
+        with self.lock:
+            if self.unsaved:
+                self._write_index()
+
+    def entries(self):
+        """Index entries, including files adopted from disk, keyed by cache key."""
+        with self.lock:
+            self._write_index()
+            self._adopt_files()
+            return dict(self.index)
+
+    def remove(self, key, filename=None):
+        with self.lock:
+            entry = self._loaded_index().get(key, {})
+            filename = filename or entry.get("file")
+            path = os.path.join(self.cache_dir, filename) if filename else None
+            try:
+                os.remove(path or self.path_for(key))
+            except FileNotFoundError:
+                pass
+            self._write_index(removed=[key])
+
+    def evict(self, max_bytes=None):
+        """Drop least recently used files until the cache fits ``max_bytes``."""
+        self._remove_stale_partials()
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        if max_bytes is None:
+            return []
+
+        entries = self.entries()
+        total = sum(entry["size"] for entry in entries.values())
+        evicted = []
+        for key, entry in sorted(entries.items(), key=lambda i: i[1]["last_used"]):
+            if total <= max_bytes:
+                break
+            self.remove(key, entry.get("file"))
+            total -= entry["size"]
+            evicted.append(key)
+        if evicted:
+            self.logger.info(
+                f"Evicted {len(evicted)} files from the {self.name} cache."
+            )
+        return evicted
+
+    def clear(self):
+        return self.evict(max_bytes=0)
+
+    def _remove_stale_partials(self):
+        now = time.time()
+        for filename in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, filename)
+            if self.PARTIAL_MARKER not in filename:
+                continue
+            try:
+                if now - os.path.getmtime(path) > self.STALE_PARTIAL_SECONDS:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+_unsaved_caches = set()  # kept alive until their uses are written
+
+
+def _flush_unsaved_caches():
+    for cache in list(_unsaved_caches):
+        if not os.path.isdir(cache.cache_dir):
+            continue  # deleted, nothing left to record
+        try:
+            cache.flush()
+        except OSError as e:
+            logger.warning(f"Failed to save the {cache.name} cache index: {e}")
+
+
+# multiprocessing runs its finalizers at interpreter exit and when a worker
+# process exits, where atexit handlers are skipped.
+Finalize(None, _flush_unsaved_caches, exitpriority=0)
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def arg_parser():
+    parser = argparse.ArgumentParser(
+        description="Inspect and prune the persistent media caches.",
+    )
+    parser.add_argument(
+        "cache",
+        type=str,
+        help="Name of the cache, e.g. 'cfr'.",
+    )
+    parser.add_argument(
+        "action",
+        choices=["list", "prune", "clear"],
+        help="list entries, prune to --max_size_gb, or clear everything.",
+    )
+    parser.add_argument(
+        "--max_size_gb",
+        type=float,
+        default=None,
+        help="Size cap used by 'prune'.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = arg_parser()
+    cache = FileCache(args.cache)
+    if args.action == "list":
+        entries = cache.entries()
+        for key, entry in sorted(entries.items(), key=lambda i: -i[1]["last_used"]):
+            last_used = time.strftime(
+                "%Y-%m-%d %H:%M", time.localtime(entry["last_used"])
+            )
+            source = entry.get("source", "")
+            print(f"{key}  {format_size(entry['size']):>10}  {last_used}  {source}")
+        total = sum(entry["size"] for entry in entries.values())
+        print(f"{len(entries)} files, {format_size(total)} in {cache.cache_dir}")
+    elif args.action == "prune":
+        if args.max_size_gb is None:
+            raise SystemExit("prune needs --max_size_gb")
+        evicted = cache.evict(int(args.max_size_gb * 1024**3))
+        logger.info(f"Removed {len(evicted)} files.")
+    else:
+        evicted = cache.clear()
+        logger.info(f"Removed {len(evicted)} files.")
@@ -7,6 +7,7 @@ import os
 from dataclasses import asdict, fields
 
 from utils.data_structures import MediaClip, VisionDataTypeEnum, TransitionTypeEnum
+from utils.media_index import MediaIndex
 
 # Configure logger
 logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
@@ -15,6 +16,7 @@ logger = logging.getLogger(__name__)
 # File extensions for type detection
 VIDEO_EXTENSIONS = {".mp4", ".mov", ".avi", ".mkv"}
 PHOTO_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".gif"}
+DEFAULT_CLIP_DURATION = 10  # seconds
 
 
 # Path to your JSON file
@@ -44,17 +46,30 @@ def detect_type(filename):
         return None
 
 
-def create_config_from_folder(folder_path):
+def create_config_from_folder(folder_path, media_index=None):
+    media_index = media_index or MediaIndex()
+    filenames = os.listdir(folder_path)
+    media = media_index.probe_all(
+        os.path.join(folder_path, filename)
+        for filename in filenames
+        if detect_type(filename) == VisionDataTypeEnum.VIDEO
+    )
+
     config = {}
-    for filename in os.listdir(folder_path):
+    for filename in filenames:
         full_path = os.path.join(folder_path, filename)
         if os.path.isfile(full_path):
             file_type = detect_type(filename)
             if file_type:
+                end = DEFAULT_CLIP_DURATION
+                info = media.get(os.path.abspath(full_path))
+                if info is not None and info.duration is not None:
+                    # Short videos are used whole.
+                    end = round(min(end, info.duration), 1)
                 config[filename] = MediaClip(
                     start=0,
-                    end=10,
-                    transition=TransitionTypeEnum(0),
+                    end=end,
+                    transition=TransitionTypeEnum.NONE,
                     type=file_type,
                     video_resampling=0,
                 )
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from fractions import Fraction
+
+from utils.cache_utils import file_identity, get_cache_dir, write_json_atomic
+from utils.data_structures import MediaInfo
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
+
+
+def parse_frame_rate(rate):
+    """Parse an ffprobe rate such as '30000/1001', None when unknown."""
+    try:
+        value = Fraction(rate)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    return float(value) if value else None
+
+
+def probe_media_info(path) -> MediaInfo:
+    """Probe a media file with a single ffprobe call."""
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration:stream=codec_type,width,height,r_frame_rate,"
+        "avg_frame_rate:stream_tags=rotate:stream_side_data=rotation",
+        "-of",
+        "json",
+        path,
+    ]
+    info = json.loads(subprocess.check_output(cmd, stderr=subprocess.DEVNULL))
+    streams = info.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+
+    rotation = video.get("tags", {}).get("rotate", 0)
+    for side_data in video.get("side_data_list", []):
+        rotation = side_data.get("rotation", rotation)
+
+    duration = info.get("format", {}).get("duration")
+    fps = parse_frame_rate(video.get("avg_frame_rate"))
+    return MediaInfo(
+        # Stills report no duration, or a single frame.
+        duration=float(duration) if duration is not None and fps else None,
+        width=video.get("width"),
+        height=video.get("height"),
+        r_frame_rate=video.get("r_frame_rate"),
+        avg_frame_rate=video.get("avg_frame_rate"),
+        fps=fps,
+        rotation=int(float(rotation)) % 360,
+        has_audio=any(s.get("codec_type") == "audio" for s in streams),
+    )
+
+
+class MediaIndex:
+    """
+    Persistent index of probed media metadata.
+
+    Entries are keyed by absolute path and invalidated when the file's size or
+    mtime changes, so each file is probed once across runs. ``probe_all`` probes
+    every missing file in one parallel batch and writes the index once.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir=None, workers=None):
+        self.cache_dir = cache_dir or get_cache_dir("media_index")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        self.workers = workers or min(8, (os.cpu_count() or 1) * 2)
+        self.lock = threading.Lock()
+        self.entries = self._load()
+        self.logger = logging.getLogger(__name__)
+
+    def _load(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _identity(path):
+        identity = file_identity(path)
+        return {"size": identity["size"], "mtime_ns": identity["mtime_ns"]}
+
+    def cached(self, path) -> MediaInfo | None:
+        """Return indexed metadata for ``path`` if the file is unchanged."""
+        path = os.path.abspath(path)
+        with self.lock:
+            entry = self.entries.get(path)
+        try:
+            if entry is None or entry["identity"] != self._identity(path):
+                return None
+        except OSError:
+            return None
+        return MediaInfo(**entry["info"])
+
+    def probe(self, path) -> MediaInfo:
+        """Return metadata for ``path``, or None when it cannot be probed."""
+        return self.probe_all([path]).get(os.path.abspath(path))
+
+    def probe_all(self, paths) -> dict[str, MediaInfo]:
+        """
+        Return ``{abspath: MediaInfo}`` for ``paths``, probing missing ones.
+
+        Files that cannot be probed are left out of the result.
+        """
+        paths = list(dict.fromkeys(os.path.abspath(path) for path in paths))
+        result = {}
+        missing = []
+        for path in paths:
+            info = self.cached(path)
+            if info is None:
+                missing.append(path)
+            else:
+                result[path] = info
+        if not missing:
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            probed = zip(missing, pool.map(self._probe_safe, missing))
+            probed = [(path, info) for path, info in probed if info is not None]
+
+        with self.lock:
+            # Merge with entries written by other processes since loading.
+            self.entries = {**self._load(), **self.entries}
+            for path, info in probed:
+                self.entries[path] = {
+                    "identity": self._identity(path),
+                    "info": asdict(info),
+                }
+                result[path] = info
+            write_json_atomic(self.index_path, self.entries)
+        return result
+
+    def _probe_safe(self, path):
+        try:
+            return probe_media_info(path)
+        except Exception as e:
+            self.logger.error(f"ffprobe failed on {path}: {e}")
+            return None
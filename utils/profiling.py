@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import cProfile
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from utils.cache_utils import write_json_atomic
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
+
+PROFILE_FORMATS = ("chrome", "json")
+PYTHON_PROFILERS = ("cprofile", "pyinstrument")
+
+
+def current_rss():
+    """Resident set size of this process in bytes, None where unknown."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Only the peak is portable, in KB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+class Profiler:
+    """
+    Spans, frame counters and memory samples for one pipeline run.
+
+    Disabled by default, spans and counters then cost one attribute check.
+    ``start`` resets the run and begins sampling the RSS in a background thread,
+    and optionally runs cProfile or pyinstrument alongside. Spans are recorded
+    from any thread of this process; work done inside worker processes only
+    shows as the span of whoever waited on it.
+    """
+
+    RSS_SAMPLE_SECONDS = 0.05
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.sampler = None
+        self.python_profiler = None
+        self.python_profiler_name = None
+        self.logger = logging.getLogger(__name__)
+        self.reset()
+
+    def reset(self):
+        self.origin = time.perf_counter()
+        self.wall_time = 0
+        self.spans = []  # (name, start, duration, thread id, args)
+        self.counters = Counter()
+        self.rss_samples = []  # (time, bytes)
+        self.peak_rss = 0
+
+    def start(self, python_profiler=None):
+        """Start a new run, ``python_profiler`` is 'cprofile' or 'pyinstrument'."""
+        self.reset()
+        if python_profiler == "cprofile":
+            self.python_profiler = cProfile.Profile()
+            self.python_profiler.enable()
+        elif python_profiler == "pyinstrument":
+            try:
+                from pyinstrument import Profiler as Pyinstrument
+            except ImportError as e:
+                raise ImportError(
+                    "pyinstrument is not installed, use 'pip install pyinstrument'."
+                ) from e
+            self.python_profiler = Pyinstrument()
+            self.python_profiler.start()
+        elif python_profiler is not None:
+            raise ValueError(f"Unknown Python profiler: {python_profiler}")
+        self.python_profiler_name = python_profiler
+
+        self.enabled = True
+        self.stopped.clear()
+        self.sampler = threading.Thread(target=self._sample_rss, daemon=True)
+        self.sampler.start()
+        return self
+
+    def stop(self):
+        if not self.enabled:
+            return self
+        self.enabled = False
+        self.stopped.set()
+        self.sampler.join()
+        self.wall_time = time.perf_counter() - self.origin
+        if self.python_profiler_name == "cprofile":
+            self.python_profiler.disable()
+        elif self.python_profiler_name == "pyinstrument":
+            self.python_profiler.stop()
+        return self
+
+    @contextmanager
+    def span(self, name, **args):
+        """Time the enclosed block as ``name``."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            with self.lock:
+                self.spans.append(
+                    (name, start - self.origin, duration, threading.get_ident(), args)
+                )
+
+    def timed(self, name=None):
+        """Decorator recording every call as a span."""
+
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] += value
+
+    def _sample_rss(self):
+        while True:
+            rss = current_rss()
+            if rss is not None:
+                with self.lock:
+                    self.rss_samples.append((time.perf_counter() - self.origin, rss))
+                    self.peak_rss = max(self.peak_rss, rss)
+            if self.stopped.wait(self.RSS_SAMPLE_SECONDS):
+                return
+
+    def summary(self):
+        """Per-span totals, counters and memory, slowest spans first."""
+        with self.lock:
+            totals = {}
+            for name, _, duration, _, _ in self.spans:
+                total = totals.setdefault(name, {"count": 0, "total": 0, "max": 0})
+                total["count"] += 1
+                total["total"] += duration
+                total["max"] = max(total["max"], duration)
+            counters = dict(sorted(self.counters.items()))
+            peak_rss = self.peak_rss
+        spans = {
+            name: {key: round(value, 4) for key, value in total.items()}
+            for name, total in sorted(totals.items(), key=lambda i: -i[1]["total"])
+        }
+        return {
+            "wall_time": round(self.wall_time, 4),
+            "peak_rss_mb": round(peak_rss / 1024**2, 1),
+            "spans": spans,
+            "counters": counters,
+        }
+
+    def chrome_trace(self):
+        """The run in Chrome trace event format, for chrome://tracing or Perfetto."""
+        pid = os.getpid()
+        with self.lock:
+            events = [
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": round(start * 1e6),
+                    "dur": round(duration * 1e6),
+                    "pid": pid,
+                    "tid": thread_id,
+                    "args": {key: str(value) for key, value in args.items()},
+                }
+                for name, start, duration, thread_id, args in self.spans
+            ]
+            events += [
+                {
+                    "name": "rss",
+                    "ph": "C",
+                    "ts": round(sample_time * 1e6),
+                    "pid": pid,
+                    "args": {"MB": round(rss / 1024**2, 1)},
+                }
+                for sample_time, rss in self.rss_samples
+            ]
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": self.summary(),
+        }
+
+    def export(self, path, trace_format="chrome"):
+        """
+        Write the run to ``path`` as a Chrome trace or a JSON summary with raw
+        spans. The Python profiler's output goes next to it.
+        """
+        if trace_format == "chrome":
+            data = self.chrome_trace()
+        elif trace_format == "json":
+            with self.lock:
+                spans = [
+                    {
+                        "name": name,
+                        "start": round(start, 6),
+                        "duration": round(duration, 6),
+                        "thread": thread_id,
+                        "args": {key: str(value) for key, value in args.items()},
+                    }
+                    for name, start, duration, thread_id, args in self.spans
+                ]
+            data = {**self.summary(), "trace": spans}
+        else:
+            raise ValueError(f"Unknown profile format: {trace_format}")
+        write_json_atomic(path, data)
+
+        root = os.path.splitext(path)[0]
+        if self.python_profiler_name == "cprofile":
+            self.python_profiler.dump_stats(f"{root}.prof")
+        elif self.python_profiler_name == "pyinstrument":
+            with open(f"{root}.html", "w") as f:
+                f.write(self.python_profiler.output_html())
+        return path
+
+    def log_summary(self, logger=None, top=15):
+        logger = logger or self.logger
+        summary = self.summary()
+        logger.info(
+            f"Profile: {summary['wall_time']:.2f}s wall, "
+            f"peak RSS {summary['peak_rss_mb']:.0f} MB"
+        )
+        for name, total in list(summary["spans"].items())[:top]:
+            logger.info(
+                f"  {name:<40} {total['total']:8.3f}s "
+                f"x{total['count']:<5} max {total['max']:.3f}s"
+            )
+        if summary["counters"]:
+            logger.info(f"  counters: {json.dumps(summary['counters'])}")
+
+
+profiler = Profiler()